@@ -1 +1,29 @@
-# __init__
\ No newline at end of file
+# __init__
+import importlib
+
+# submodules (imported on first attribute access so 'import gopfsrisk_toolbox' stays cheap)
+LIST_SUBMODULES = ['algorithms',
+				   'api',
+				   'api_serving',
+				   'api_testing',
+				   'artifact',
+				   'custom_metrics',
+				   'exploratory_data_analysis',
+				   'feature_engineering',
+				   'feature_selection',
+				   'final_model',
+				   'general',
+				   'instrumentation',
+				   'lazy',
+				   'leaky_features',
+				   'model_eval',
+				   'oblivious_trees',
+				   'optimal_learning_rate',
+				   'preprocessing']
+
+# define function for lazy submodule access
+def __getattr__(str_name):
+	# logic
+	if str_name in LIST_SUBMODULES:
+		return importlib.import_module(f'.{str_name}', __name__)
+	raise AttributeError(f"module '{__name__}' has no attribute '{str_name}'")
@@ -1,9 +1,12 @@
 import pandas as pd
 import numpy as np
 from numpy.linalg import inv
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.model_selection import train_test_split
 import catboost as cb
+from .lazy import LAZY_FROM
+
+# heavy imports (loaded on first use)
+(mean_absolute_error, mean_squared_error, r2_score) = LAZY_FROM(str_module='sklearn.metrics', list_str_attrs=['mean_absolute_error', 'mean_squared_error', 'r2_score'])
+(train_test_split,) = LAZY_FROM(str_module='sklearn.model_selection', list_str_attrs=['train_test_split'])
 
 # define function for pooling data
 def POOL_DATA(X, y, list_non_numeric, logger=None):
@@ -1,43 +1,172 @@
 # api
-from sklearn.base import BaseEstimator, TransformerMixin
-import numpy as np
-from io import StringIO
+from io import StringIO, BytesIO
 import xml.etree.ElementTree as ET
 import numpy as np
 import pandas as pd
 import catboost as cb
-import ast
+import json
+import sys
+import os
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
 from itertools import chain
 import time
+from .oblivious_trees import ObliviousTreeShap
+from .instrumentation import GET_INSTRUMENTATION, ThreadInstrumentation
+from .lazy import TransformerBase
 pd.set_option('mode.chained_assignment', None)
 
 # define generic transformer class
-class GenericTransformer(BaseEstimator, TransformerMixin):
+class GenericTransformer(TransformerBase):
 	# initialize
 	def __init__(self, list_transformers):
 		self.list_transformers = list_transformers
 	# fit
 	def fit(self, X, y=None):
 		return self
+	# define function for compiling a plan against a sample of the serving schema
+	def compile(self, X):
+		# save to object
+		self.plan = TransformPlan(list_transformers=self.list_transformers, X=X)
+		# return object
+		return self
 	# transform
 	def transform(self, X):
 		# loop through transformers
 		time_start = time.perf_counter()
-		for transformer in self.list_transformers:
-			# transform
+		# logic
+		if getattr(self, 'plan', None) is not None:
+			# compiled plan (falls back to the transformers if the cols are not the ones compiled for)
+			X = self.plan.transform(X)
+		else:
+			for transformer in self.list_transformers:
+				# transform
+				X = transformer.transform(X)
+		# record time
+		GET_INSTRUMENTATION().record(str_name='GenericTransformer.transform', flt_sec=time.perf_counter()-time_start)
+		# return
+		return X
+
+# define helper for checking a value is a plain number (not a bool)
+def IS_NUMBER(value):
+	# return
+	return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+# define compiled transform plan class (fillna, replace, and round steps fused into one pass per col)
+class TransformPlan:
+	# initialize
+	def __init__(self, list_transformers, X):
+		self.list_transformers = list_transformers
+		# cols the plan was compiled for
+		self.tpl_cols_in = tuple(X.columns)
+		# run the sample through to learn the cols after each step
+		X = X.copy()
+		# empty list of steps (kind, fused ops or transformer, index of first transformer, cols after)
+		self.list_tpl_step = []
+		self.int_n_dropped = 0
+		dict_list_ops, int_idx_fused = None, None
+		for int_idx, transformer in enumerate(list_transformers):
+			# ops if the transformer can be fused
+			list_tpl_op = transformer.get_ops(list_cols=list(X.columns)) if hasattr(transformer, 'get_ops') else None
+			X = transformer.transform(X)
+			# logic
+			if list_tpl_op is not None:
+				# no-op step
+				if not list_tpl_op:
+					self.int_n_dropped += 1
+					continue
+				# merge into the ops of each col (in order)
+				if dict_list_ops is None:
+					dict_list_ops, int_idx_fused = {}, int_idx
+				for col, str_op, arg in list_tpl_op:
+					dict_list_ops.setdefault(col, []).append((str_op, arg))
+				continue
+			# close the fused step before this one
+			if dict_list_ops is not None:
+				self.list_tpl_step.append(('fused', dict_list_ops, int_idx_fused, None))
+				dict_list_ops = None
+			# run as is
+			self.list_tpl_step.append(('call', transformer, int_idx, tuple(X.columns)))
+		# close the last fused step
+		if dict_list_ops is not None:
+			self.list_tpl_step.append(('fused', dict_list_ops, int_idx_fused, None))
+	# define helper for fillna on one col
+	def fillna(self, arr, value):
+		# logic
+		if (arr.dtype == np.float64) and IS_NUMBER(value):
+			return np.where(np.isnan(arr), value, arr)
+		# return
+		return pd.Series(arr).fillna(value).values
+	# define helper for replace on one col (every key replaced at once like pandas)
+	def replace(self, arr, dict_replace):
+		# logic
+		if (arr.dtype == np.float64) and all(IS_NUMBER(key) and IS_NUMBER(val) for key, val in dict_replace.items()):
+			arr_out = arr.copy()
+			for key, val in dict_replace.items():
+				arr_out[np.isnan(arr) if key != key else arr == key] = val
+			return arr_out
+		# return
+		return pd.Series(arr).replace(dict_replace).values
+	# define helper for round binning on one col
+	def round(self, arr, flt_round):
+		# logic
+		if arr.dtype == object:
+			arr = pd.to_numeric(arr)
+		# return
+		return flt_round * np.round(arr / flt_round)
+	# define helper for running the fused ops
+	def run_fused(self, X, dict_list_ops):
+		time_start = time.perf_counter()
+		# one pass over each col
+		for col, list_tpl_op in dict_list_ops.items():
+			arr = X[col].values
+			for str_op, arg in list_tpl_op:
+				arr = getattr(self, str_op)(arr, arg)
+			X[col] = arr
+		# record time
+		GET_INSTRUMENTATION().record(str_name='TransformPlan.fused', flt_sec=time.perf_counter()-time_start)
+		# return
+		return X
+	# define helper for running the transformers as is from one index on
+	def run_from(self, X, int_idx):
+		# iterate through transformers
+		for transformer in self.list_transformers[int_idx:]:
 			X = transformer.transform(X)
-		print(f'Time to transform: {(time.perf_counter()-time_start):0.5} sec.')
+		# return
+		return X
+	# transform
+	def transform(self, X):
+		# logic
+		if tuple(X.columns) != self.tpl_cols_in:
+			return self.run_from(X=X, int_idx=0)
+		# iterate through steps
+		for str_kind, step, int_idx, tpl_cols_after in self.list_tpl_step:
+			# logic
+			if str_kind == 'fused':
+				X = self.run_fused(X=X, dict_list_ops=step)
+			else:
+				X = step.transform(X)
+				# cols not what we compiled for (rest runs as is)
+				if tuple(X.columns) != tpl_cols_after:
+					return self.run_from(X=X, int_idx=int_idx+1)
 		# return
 		return X
 
 # define imputer class
-class FinalImputer(BaseEstimator, TransformerMixin):
+class FinalImputer(TransformerBase):
 	# initialize
 	def __init__(self, dict_imputations):
 		self.dict_imputations = dict_imputations
 	# fit
 	def fit(self, X, y=None):
 		return self
+	# define function for the fillna as ops a plan can fuse
+	def get_ops(self, list_cols):
+		set_cols = set(list_cols)
+		# return
+		return [(col, 'fillna', val) for col, val in self.dict_imputations.items() if col in set_cols]
 	# transform
 	def transform(self, X):
 		# fillna
@@ -52,12 +181,13 @@ class FinalImputer(BaseEstimator, TransformerMixin):
 				del dict_imputations_copy[col]
 		# fillna
 		X.fillna(dict_imputations_copy, inplace=True)
-		print(f'Time to impute: {(time.perf_counter()-time_start):0.5} sec.')
+		# record time
+		GET_INSTRUMENTATION().record(str_name='FinalImputer.transform', flt_sec=time.perf_counter()-time_start)
 		# return
 		return X
 
 # define subsetter class
-class Subsetter(BaseEstimator, TransformerMixin):
+class Subsetter(TransformerBase):
 	# initialize
 	def __init__(self, list_cols):
 		self.list_cols = list_cols
@@ -85,28 +215,1105 @@ class PipelineDataPrep:
 		for transformer in self.list_transformers:
 			# transform
 			X = transformer.transform(X)
-		print(f'Time to transform: {(time.perf_counter()-time_start):0.5} sec.')
+		# record time
+		GET_INSTRUMENTATION().record(str_name='PipelineDataPrep.transform', flt_sec=time.perf_counter()-time_start)
 		# logic
 		if bool_lower:
 			# make all cols lower
 			X.columns = X.columns.str.lower()
 		# save to object
 		self.X = X
-		# logic
+		# compile the prediction plan once (pipelines pickled before it existed build it here)
 		time_start = time.perf_counter()
-		if self.bool_classifier:
-			# make predictions
-			y_hat = self.model.predict_proba(X[self.model.feature_names_])[:,1]
-		else:
-			y_hat = self.model.predict(X[self.model.feature_names_])
+		if getattr(self, 'plan', None) is None:
+			self.plan = PredictionPlan(list_models=[self.model], list_bool_classifier=[self.bool_classifier])
+		# make predictions
+		y_hat = self.plan.predict(*self.plan.build(X=X))[0]
 		# save to object
 		self.y_hat = y_hat
 		# get mean
 		y_hat_mean = np.mean(y_hat)
-		print(f'Time to predict: {(time.perf_counter()-time_start):0.5} sec.')
+		# record time
+		GET_INSTRUMENTATION().record(str_name='PipelineDataPrep.predict', flt_sec=time.perf_counter()-time_start)
 		# return
 		return y_hat_mean
 
+# define compiled aggregation plan class (numpy version of groupby(uniqueid).agg(dict_agg) bottom row)
+class AggregationPlan:
+	# initialize
+	def __init__(self, str_suffix, dict_agg, list_int_pos):
+		self.str_suffix = str_suffix
+		self.dict_agg = dict_agg
+		# (col, agg, position) in the order agg returns them
+		self.list_tpl_agg = [(col, str_agg) for col, list_agg in dict_agg.items() for str_agg in list_agg]
+		self.list_tpl_agg = [(col, str_agg, int_pos) for (col, str_agg), int_pos in zip(self.list_tpl_agg, list_int_pos)]
+		self.arr_pos = np.array(list_int_pos, dtype=int)
+		# cols to reduce
+		self.list_cols = list(dict_agg.keys())
+		# only aggs with a numpy version can skip pandas
+		self.bool_numpy = all(isinstance(str_agg, str) and (str_agg in ['sum', 'mean', 'min', 'max', 'count', 'size', 'median', 'std', 'var', 'first', 'last', 'nunique']) for col, str_agg, int_pos in self.list_tpl_agg)
+	# define helper for one reduction (nan skipped like pandas)
+	def reduce(self, arr_values, str_agg):
+		# non-missing values
+		arr_valid = arr_values[~np.isnan(arr_values)]
+		int_n = len(arr_valid)
+		# logic
+		if str_agg == 'sum':
+			return arr_valid.sum()
+		if str_agg == 'count':
+			return float(int_n)
+		if str_agg == 'size':
+			return float(len(arr_values))
+		if str_agg == 'nunique':
+			return float(len(np.unique(arr_valid)))
+		if int_n == 0:
+			return np.nan
+		if str_agg == 'mean':
+			return arr_valid.sum() / int_n
+		if str_agg == 'min':
+			return arr_valid.min()
+		if str_agg == 'max':
+			return arr_valid.max()
+		if str_agg == 'median':
+			return np.median(arr_valid)
+		if str_agg == 'first':
+			return arr_valid[0]
+		if str_agg == 'last':
+			return arr_valid[-1]
+		if int_n < 2:
+			return np.nan
+		if str_agg == 'std':
+			return arr_valid.std(ddof=1)
+		# return var
+		return arr_valid.var(ddof=1)
+	# define function for getting the cols of a table as float arrays (None if any is not numeric)
+	def get_arrays(self, df):
+		# empty dict
+		dict_arr = {}
+		for col in self.list_cols:
+			try:
+				dict_arr[col] = df[col].to_numpy(dtype=float)
+			except (ValueError, TypeError):
+				return None
+		# return
+		return dict_arr
+	# define function for the aggregated values of the last unique id in a set of rows
+	def aggregate(self, arr_uniqueid, dict_arr, arr_idx=None):
+		# rows to use
+		if arr_idx is None:
+			arr_idx = np.arange(len(arr_uniqueid))
+		# drop missing ids (groupby drops them)
+		arr_idx = arr_idx[pd.notnull(arr_uniqueid[arr_idx])]
+		# logic
+		if len(arr_idx) == 0:
+			return None
+		# groupby sorts the ids so the bottom row is the largest id
+		arr_idx = arr_idx[arr_uniqueid[arr_idx] == max(arr_uniqueid[arr_idx])]
+		# return
+		return np.array([self.reduce(arr_values=dict_arr[col][arr_idx], str_agg=str_agg) for col, str_agg, int_pos in self.list_tpl_agg])
+
+# define compiled feature schema class
+class FeatureSchema:
+	# initialize
+	def __init__(self, df_empty,
+					   list_feats_raw_app,
+					   list_feats_raw_inc,
+					   dict_income_agg,
+					   list_feats_raw_ln,
+					   list_feats_raw_tuaccept,
+					   list_feats_raw_cvlink,
+					   list_feats_raw_debt=None,
+					   dict_debt_agg=None):
+		# start with df_empty cols
+		list_cols = list(df_empty.columns)
+		# numeric cols in df_empty
+		set_numeric = set(col for col in df_empty.columns if pd.api.types.is_numeric_dtype(df_empty[col]))
+		# empty dict {source: {raw col (lower): (col name, position)}}
+		dict_dict_raw = {'app': {}, 'inc': {}, 'debt': {}, 'ln': {}, 'tu': {}}
+		# empty dict {source: [positions of aggregated cols]}
+		dict_list_agg_pos = {'inc': [], 'debt': []}
+		# dict for col positions
+		dict_col_pos = dict(zip(list_cols, range(len(list_cols))))
+		# define helper for getting (or adding) a col position
+		def get_col_pos(col_name):
+			# add col if its not in df_empty
+			if col_name not in dict_col_pos:
+				dict_col_pos[col_name] = len(list_cols)
+				list_cols.append(col_name)
+			# return
+			return dict_col_pos[col_name]
+		# app, ln, and tu write straight into the final cols (cvlink after tuaccept so it wins)
+		for str_source, str_suffix, list_feats_raw in [('app', 'app', list_feats_raw_app),
+													   ('ln', 'ln', list_feats_raw_ln),
+													   ('tu', 'tuaccept', list_feats_raw_tuaccept),
+													   ('tu', 'tucvlink', list_feats_raw_cvlink)]:
+			for col in list_feats_raw:
+				# col name
+				col_name = f'{col.lower()}__{str_suffix}'
+				# add
+				dict_dict_raw[str_source][col.lower()] = (col_name, get_col_pos(col_name))
+		# income and debt are aggregated before they are written
+		for str_source, str_suffix, list_feats_raw, dict_agg in [('inc', 'income', list_feats_raw_inc, dict_income_agg),
+																 ('debt', 'debt', list_feats_raw_debt, dict_debt_agg)]:
+			# logic
+			if list_feats_raw is None:
+				continue
+			for col in list_feats_raw:
+				# add (no position until aggregated)
+				dict_dict_raw[str_source][col.lower()] = (f'{col.lower()}__{str_suffix}', None)
+			# positions of aggregated cols (in the order agg returns them)
+			for col, list_agg in dict_agg.items():
+				for str_agg in list_agg:
+					dict_list_agg_pos[str_source].append(get_col_pos(f'{col}_{str_agg}'))
+		# cols to cast to float and cols to infer
+		list_cols_numeric = [col for col in list_cols if col in set_numeric]
+		list_cols_infer = list_cols[len(df_empty.columns):]
+		# save to object
+		self.list_cols = list_cols
+		self.dict_col_pos = dict_col_pos
+		self.list_cols_numeric = list_cols_numeric
+		self.list_cols_infer = list_cols_infer
+		self.arr_bool_numeric = np.array([(col in set_numeric) or (col in list_cols_infer) for col in list_cols])
+		# typed blocks (float for numeric cols in df_empty, object for the rest) and the slot of each col in its block
+		self.arr_bool_float = np.array([col in set_numeric for col in list_cols])
+		self.list_cols_float = [col for col in list_cols if col in set_numeric]
+		self.list_cols_object = [col for col in list_cols if col not in set_numeric]
+		self.arr_slot = np.zeros(len(list_cols), dtype=int)
+		self.arr_slot[self.arr_bool_float] = np.arange(len(self.list_cols_float))
+		self.arr_slot[~self.arr_bool_float] = np.arange(len(self.list_cols_object))
+		self.dict_dict_raw = dict_dict_raw
+		self.dict_list_agg_pos = dict_list_agg_pos
+		# compiled aggregation plans
+		self.dict_plan = {}
+		for str_source, str_suffix, dict_agg in [('inc', 'income', dict_income_agg), ('debt', 'debt', dict_debt_agg)]:
+			if dict_agg is not None:
+				self.dict_plan[str_source] = AggregationPlan(str_suffix=str_suffix, dict_agg=dict_agg, list_int_pos=dict_list_agg_pos[str_source])
+		# cache of raw headers as they come in the payload
+		self.dict_dict_header = {str_source: {} for str_source in dict_dict_raw.keys()}
+	# define lookup for a raw col
+	def lookup(self, str_source, col):
+		# get cache
+		dict_header = self.dict_dict_header[str_source]
+		# try the cache first
+		try:
+			return dict_header[col]
+		# first time we see this header
+		except KeyError:
+			tpl_col = self.dict_dict_raw[str_source].get(col.lower())
+			dict_header[col] = tpl_col
+			# return
+			return tpl_col
+	# define function for allocating a block of rows
+	def create_block(self, int_n_rows):
+		# return
+		return RowBlock(schema=self, int_n_rows=int_n_rows)
+	# define function for putting a block into a df
+	def to_frame(self, block):
+		# float block straight in (one float64 block for pandas)
+		X_float = pd.DataFrame(block.arr_float, columns=self.list_cols_float)
+		# numeric cols with values that are not numbers stay object
+		for (int_row, int_pos), value in block.dict_overflow.items():
+			col = self.list_cols[int_pos]
+			if X_float[col].dtype != object:
+				X_float[col] = X_float[col].astype(object)
+			X_float.iat[int_row, self.arr_slot[int_pos]] = value
+		# object block
+		X_object = pd.DataFrame(block.arr_object, columns=self.list_cols_object)
+		# let pandas infer the cols that are not in df_empty
+		if self.list_cols_infer:
+			X_object[self.list_cols_infer] = X_object[self.list_cols_infer].infer_objects()
+		# put back in schema order
+		X = pd.concat([X_float, X_object], axis=1)[self.list_cols]
+		# return
+		return X
+
+# define view of one row of a block (parsers write into it like a numpy row)
+class RowView:
+	# initialize
+	def __init__(self, block, int_row):
+		self.block = block
+		self.int_row = int_row
+	# define function for writing one or more slots
+	def __setitem__(self, pos, value):
+		# logic
+		if np.ndim(pos) == 0:
+			self.block.set(arr_rows=[self.int_row], list_pos=[pos], arr_values=[[value]])
+		else:
+			self.block.set(arr_rows=[self.int_row], list_pos=pos, arr_values=[value])
+	# define function for the slots written so far and their values
+	def written(self):
+		# return
+		return self.block.written(int_row=self.int_row)
+
+# define typed block of rows filled in place as sources are parsed
+class RowBlock:
+	# initialize
+	def __init__(self, schema, int_n_rows):
+		self.schema = schema
+		self.int_n_rows = int_n_rows
+		# nan defaults
+		self.arr_float = np.full((int_n_rows, len(schema.list_cols_float)), np.nan)
+		self.arr_object = np.full((int_n_rows, len(schema.list_cols_object)), np.nan, dtype=object)
+		# {(row, position): value} for values in numeric cols that are not numbers
+		self.dict_overflow = {}
+	# define length
+	def __len__(self):
+		# return
+		return self.int_n_rows
+	# define function for getting a row
+	def __getitem__(self, int_row):
+		# return
+		return RowView(block=self, int_row=int_row)
+	# define function for iterating through rows
+	def __iter__(self):
+		# return
+		return (RowView(block=self, int_row=int_row) for int_row in range(self.int_n_rows))
+	# define function for writing a 2d block of values (rows x positions)
+	def set(self, arr_rows, list_pos, arr_values):
+		arr_rows = np.asarray(arr_rows, dtype=int)
+		arr_pos = np.asarray(list_pos, dtype=int)
+		arr_values = np.asarray(arr_values, dtype=object).reshape(len(arr_rows), len(arr_pos))
+		# split by block
+		arr_bool_float = self.schema.arr_bool_float[arr_pos]
+		arr_slot = self.schema.arr_slot[arr_pos]
+		# object slots as is
+		if not arr_bool_float.all():
+			self.arr_object[np.ix_(arr_rows, arr_slot[~arr_bool_float])] = arr_values[:, ~arr_bool_float]
+		# logic
+		if not arr_bool_float.any():
+			return self
+		arr_values_float = arr_values[:, arr_bool_float]
+		arr_pos_float = arr_pos[arr_bool_float]
+		# drop anything an earlier write put in overflow
+		if self.dict_overflow:
+			for int_row in arr_rows:
+				for int_pos in arr_pos_float:
+					self.dict_overflow.pop((int_row, int_pos), None)
+		try:
+			# float slots in one cast
+			self.arr_float[np.ix_(arr_rows, arr_slot[arr_bool_float])] = arr_values_float.astype(float)
+		except (ValueError, TypeError):
+			# cell by cell if a value is not a number
+			for int_i, int_row in enumerate(arr_rows):
+				for int_j, int_pos in enumerate(arr_pos_float):
+					value = arr_values_float[int_i, int_j]
+					try:
+						self.arr_float[int_row, self.schema.arr_slot[int_pos]] = np.nan if value is None else float(value)
+					except (ValueError, TypeError):
+						self.arr_float[int_row, self.schema.arr_slot[int_pos]] = np.nan
+						self.dict_overflow[(int_row, int_pos)] = value
+		# return object
+		return self
+	# define function for the positions written in a row (not null) and their values
+	def written(self, int_row):
+		# values of the row in schema order
+		arr_values = np.empty(len(self.schema.list_cols), dtype=object)
+		arr_values[self.schema.arr_bool_float] = self.arr_float[int_row]
+		arr_values[~self.schema.arr_bool_float] = self.arr_object[int_row]
+		for (int_row_overflow, int_pos), value in self.dict_overflow.items():
+			if int_row_overflow == int_row:
+				arr_values[int_pos] = value
+		# not null
+		arr_pos = np.flatnonzero(pd.notnull(arr_values))
+		# return
+		return arr_pos, arr_values[arr_pos]
+	# define function for missing counts by col (from the typed blocks, no df needed)
+	def count_missing(self):
+		# float block (values in overflow are not missing)
+		arr_n_miss = np.zeros(len(self.schema.list_cols), dtype=np.int64)
+		arr_n_miss[self.schema.arr_bool_float] = np.isnan(self.arr_float).sum(axis=0)
+		for (int_row, int_pos) in self.dict_overflow.keys():
+			arr_n_miss[int_pos] -= 1
+		# object block
+		arr_n_miss[~self.schema.arr_bool_float] = pd.isnull(self.arr_object).sum(axis=0)
+		# return {col: n missing} for cols with any missing
+		return {self.schema.list_cols[int_pos]: arr_n_miss[int_pos] for int_pos in np.flatnonzero(arr_n_miss)}
+
+# define fused prediction plan class (one feature matrix scored by several catboost models)
+class PredictionPlan:
+	# initialize
+	def __init__(self, list_models, list_bool_classifier, int_thread_count=-1):
+		self.list_models = list_models
+		self.list_bool_classifier = list_bool_classifier
+		self.int_thread_count = int_thread_count
+		# union of the feats of every model (in order of first use)
+		list_cols = []
+		set_cat = set()
+		for model in list_models:
+			list_cols.extend([col for col in model.feature_names_ if col not in list_cols])
+			set_cat.update(model.feature_names_[int_idx] for int_idx in model.get_cat_feature_indices())
+		# numeric and categorical blocks of the matrix
+		self.list_cols_num = [col for col in list_cols if col not in set_cat]
+		self.list_cols_cat = [col for col in list_cols if col in set_cat]
+		dict_pos_num = dict(zip(self.list_cols_num, range(len(self.list_cols_num))))
+		dict_pos_cat = dict(zip(self.list_cols_cat, range(len(self.list_cols_cat))))
+		# column index maps for each model
+		self.list_dict_map = []
+		for model in list_models:
+			list_x_feats = list(model.feature_names_)
+			set_cat_model = set(list_x_feats[int_idx] for int_idx in model.get_cat_feature_indices())
+			list_cols_num = [col for col in list_x_feats if col not in set_cat_model]
+			list_cols_cat = [col for col in list_x_feats if col in set_cat_model]
+			self.list_dict_map.append({'tpl_key': (tuple(list_x_feats), tuple(sorted(set_cat_model))),
+									   'list_cols_num': list_cols_num,
+									   'list_cols_cat': list_cols_cat,
+									   'arr_idx_num': np.array([dict_pos_num[col] for col in list_cols_num], dtype=int),
+									   'arr_idx_cat': np.array([dict_pos_cat[col] for col in list_cols_cat], dtype=int),
+									   # features data can be used if the model has its numeric feats before its categorical feats
+									   'bool_features_data': list_x_feats == list_cols_num + list_cols_cat,
+									   'list_bool_cat': [col in set_cat_model for col in list_x_feats]})
+	# define function for building the matrix (original rows on top, then rows of X overwritten by a grid)
+	def build(self, X, arr_idx_rows=None, df_grid=None):
+		# numeric block (contiguous float32, what catboost scores on)
+		arr_num = np.empty((X.shape[0], len(self.list_cols_num)), dtype=np.float32)
+		for int_col, col in enumerate(self.list_cols_num):
+			arr_num[:, int_col] = X[col].values
+		# categorical block (encoded to str once)
+		arr_cat = np.empty((X.shape[0], len(self.list_cols_cat)), dtype=object)
+		for int_col, col in enumerate(self.list_cols_cat):
+			arr_cat[:, int_col] = X[col].values.astype(str)
+		# logic
+		if arr_idx_rows is not None:
+			# tile to the grid and put original rows on top
+			int_n_rows = X.shape[0]
+			arr_num = np.concatenate([arr_num, arr_num[arr_idx_rows]], axis=0)
+			arr_cat = np.concatenate([arr_cat, arr_cat[arr_idx_rows]], axis=0)
+			# overwrite only the feats in the grid
+			for list_cols, arr_block, bool_cat in [(self.list_cols_num, arr_num, False), (self.list_cols_cat, arr_cat, True)]:
+				for int_col, col in enumerate(list_cols):
+					if col in df_grid.columns:
+						arr_block[int_n_rows:, int_col] = df_grid[col].values.astype(str) if bool_cat else df_grid[col].values
+		# return
+		return arr_num, arr_cat
+	# define helper for a pool for one model
+	def get_pool(self, dict_map, arr_num, arr_cat):
+		# logic
+		if dict_map['bool_features_data']:
+			# numeric and categorical blocks straight in
+			return cb.Pool(cb.FeaturesData(num_feature_data=np.ascontiguousarray(arr_num[:, dict_map['arr_idx_num']]),
+										   cat_feature_data=arr_cat[:, dict_map['arr_idx_cat']] if dict_map['list_cols_cat'] else None,
+										   num_feature_names=dict_map['list_cols_num'],
+										   cat_feature_names=dict_map['list_cols_cat'] if dict_map['list_cols_cat'] else None))
+		# otherwise interleave in the order of the model
+		arr_x = np.empty((arr_num.shape[0], len(dict_map['list_bool_cat'])), dtype=object)
+		int_num, int_cat = 0, 0
+		for int_col, bool_cat in enumerate(dict_map['list_bool_cat']):
+			if bool_cat:
+				arr_x[:, int_col] = arr_cat[:, dict_map['arr_idx_cat'][int_cat]]
+				int_cat += 1
+			else:
+				arr_x[:, int_col] = arr_num[:, dict_map['arr_idx_num'][int_num]]
+				int_num += 1
+		# return
+		return cb.Pool(arr_x, cat_features=[int_col for int_col, bool_cat in enumerate(dict_map['list_bool_cat']) if bool_cat])
+	# define function for predicting with every model
+	def predict(self, arr_num, arr_cat):
+		# pools by feature map (models with the same feats share one)
+		dict_pool = {}
+		# empty list of predictions
+		list_arr_y_hat = []
+		# threads per call (plans pickled before it existed use every core)
+		int_thread_count = getattr(self, 'int_thread_count', -1)
+		for model, bool_classifier, dict_map in zip(self.list_models, self.list_bool_classifier, self.list_dict_map):
+			# get pool
+			if dict_map['tpl_key'] not in dict_pool:
+				dict_pool[dict_map['tpl_key']] = self.get_pool(dict_map=dict_map, arr_num=arr_num, arr_cat=arr_cat)
+			pool = dict_pool[dict_map['tpl_key']]
+			# predict
+			if bool_classifier:
+				arr_y_hat = model.predict_proba(pool, thread_count=int_thread_count)[:,1]
+			else:
+				arr_y_hat = np.array(model.predict(pool, thread_count=int_thread_count))
+			# append
+			list_arr_y_hat.append(arr_y_hat)
+		# return
+		return list_arr_y_hat
+
+# define counter-offer engine class
+class CounterOfferEngine:
+	# initialize
+	def __init__(self, list_transformers, model_pd, model_lgd, flt_ltv_min=0.5, flt_ltv_max=1.6, list_cols_context=None, int_thread_count=-1):
+		self.list_transformers = list_transformers
+		self.model_pd = model_pd
+		self.model_lgd = model_lgd
+		self.flt_ltv_min = flt_ltv_min
+		self.flt_ltv_max = flt_ltv_max
+		self.list_cols_context = list_cols_context if list_cols_context is not None else []
+		# fused prediction plan for both models
+		self.plan = PredictionPlan(list_models=[model_pd, model_lgd], list_bool_classifier=[True, False], int_thread_count=int_thread_count)
+	# define helper for predicting from a block of rows
+	def predict(self, X, arr_idx_rows, df_grid):
+		# one matrix for both models
+		arr_num, arr_cat = self.plan.build(X=X, arr_idx_rows=arr_idx_rows, df_grid=df_grid)
+		# predict (one call per model)
+		arr_y_hat_pd, arr_y_hat_lgd = self.plan.predict(arr_num=arr_num, arr_cat=arr_cat)
+		# return
+		return [arr_y_hat_pd, np.clip(a=arr_y_hat_lgd, a_min=0, a_max=1)]
+	# define function for scoring a set of ltv values for several requests at once
+	def evaluate_batch(self, list_X, list_arr_ltv):
+		# empty lists for the grid of every request
+		list_arr_idx_rows = []
+		list_arr_key = []
+		list_df_grid = []
+		# first row and first key of every request
+		list_int_row_start = []
+		list_int_key_start = []
+		int_row_start, int_key_start = 0, 0
+		for X, arr_ltv in zip(list_X, list_arr_ltv):
+			list_int_row_start.append(int_row_start)
+			list_int_key_start.append(int_key_start)
+			# get n debtors and n samples
+			int_n_debtors = X.shape[0]
+			int_n_samples = len(arr_ltv)
+			# get amt financed (original)
+			flt_amt_financed = X['fltamountfinanced__app'].iloc[0]
+			# get down total (original)
+			flt_down_total = X['fltapproveddowntotal__app'].iloc[0]
+			# rows of X for each grid row (sample major)
+			arr_idx_rows = np.tile(np.arange(int_n_debtors), int_n_samples)
+			# sample for each grid row (start at 1 because the original is 0)
+			arr_sample = np.repeat(np.arange(1, int_n_samples+1), int_n_debtors)
+			# ltv for each grid row
+			arr_ltv_rows = np.repeat(np.asarray(arr_ltv, dtype=float), int_n_debtors)
+			# calculate amount financed
+			arr_wholesale = X['fltapprovedpricewholesale__app'].values.astype(float)[arr_idx_rows]
+			arr_financed = arr_ltv_rows * arr_wholesale
+			# calculate down pmt
+			arr_down = flt_amt_financed - arr_financed + flt_down_total
+			# keep rows where down pmt > flt_down_total
+			arr_bool_keep = arr_down > flt_down_total
+			# narrow frame with only the ltv inputs (and any context cols)
+			df_grid = pd.DataFrame({'fltamountfinanced__app': arr_financed[arr_bool_keep],
+									'fltapproveddowntotal__app': arr_down[arr_bool_keep],
+									'fltapprovedpricewholesale__app': arr_wholesale[arr_bool_keep],
+									'eng_loan_to_value': arr_ltv_rows[arr_bool_keep]})
+			for col in self.list_cols_context:
+				df_grid[col] = X[col].values[arr_idx_rows[arr_bool_keep]]
+			# append (rows and keys offset by the requests before)
+			list_arr_idx_rows.append(arr_idx_rows[arr_bool_keep] + int_row_start)
+			list_arr_key.append(arr_sample[arr_bool_keep] + int_key_start)
+			list_df_grid.append(df_grid)
+			# move to the next request
+			int_row_start += int_n_debtors
+			int_key_start += int_n_samples + 1
+		# stack requests
+		X_all = pd.concat(list_X, axis=0, ignore_index=True) if len(list_X) > 1 else list_X[0]
+		arr_idx_rows = np.concatenate(list_arr_idx_rows)
+		arr_key = np.concatenate(list_arr_key)
+		df_grid = pd.concat(list_df_grid, axis=0, ignore_index=True) if len(list_df_grid) > 1 else list_df_grid[0]
+		# recompute ltv dependent feats (bin, replace, FE)
+		for transformer in self.list_transformers:
+			df_grid = transformer.transform(df_grid)
+		# subset to LTV bounds
+		arr_ltv_fe = df_grid['eng_loan_to_value'].values.astype(float)
+		arr_bool_keep = (arr_ltv_fe > 0) & (arr_ltv_fe <= self.flt_ltv_max)
+		df_grid = df_grid[arr_bool_keep]
+		arr_idx_rows, arr_key = arr_idx_rows[arr_bool_keep], arr_key[arr_bool_keep]
+		# predict (one call per model for every request)
+		arr_y_hat_pd, arr_y_hat_lgd = self.predict(X=X_all, arr_idx_rows=arr_idx_rows, df_grid=df_grid)
+		# key for every row scored (original rows are sample 0 of their request)
+		arr_key_original = np.repeat(np.array(list_int_key_start, dtype=int), [X.shape[0] for X in list_X])
+		arr_key_all = np.concatenate([arr_key_original, arr_key])
+		# mean by key
+		arr_n = np.bincount(arr_key_all, minlength=int_key_start)
+		dict_arr_mean = {}
+		for col, arr_values in [('fltapproveddowntotal__app', np.concatenate([X_all['fltapproveddowntotal__app'].values.astype(float), df_grid['fltapproveddowntotal__app'].values.astype(float)])),
+								('fltamountfinanced__app', np.concatenate([X_all['fltamountfinanced__app'].values.astype(float), df_grid['fltamountfinanced__app'].values.astype(float)])),
+								('fltapprovedpricewholesale__app', np.concatenate([X_all['fltapprovedpricewholesale__app'].values.astype(float), df_grid['fltapprovedpricewholesale__app'].values.astype(float)])),
+								('y_hat_pd', arr_y_hat_pd),
+								('y_hat_lgd', arr_y_hat_lgd)]:
+			dict_arr_mean[col] = np.bincount(arr_key_all, weights=arr_values, minlength=int_key_start)
+		# split back into requests
+		list_tpl_results = []
+		for X, arr_ltv, int_row_start, int_key_start in zip(list_X, list_arr_ltv, list_int_row_start, list_int_key_start):
+			# keys of this request
+			arr_slice = np.arange(int_key_start, int_key_start+len(arr_ltv)+1)
+			arr_bool_sample = arr_n[arr_slice] > 0
+			arr_slice = arr_slice[arr_bool_sample]
+			# put into df
+			df_grouped = pd.DataFrame({'sample': np.flatnonzero(arr_bool_sample).astype(float),
+									   **{col: arr_sum[arr_slice] / arr_n[arr_slice] for col, arr_sum in dict_arr_mean.items()}})
+			# calculate ecnl
+			df_grouped['ecnl'] = df_grouped['y_hat_pd'] * df_grouped['y_hat_lgd']
+			# calculate modified ecnl
+			df_grouped['ecnl_mod'] = (1.95553 * df_grouped['ecnl']) - 0.03281
+			# original predictions
+			int_row_end = int_row_start + X.shape[0]
+			list_tpl_results.append((list(arr_y_hat_pd[int_row_start:int_row_end]), list(arr_y_hat_lgd[int_row_start:int_row_end]), df_grouped))
+		# return original predictions and grouped samples for every request
+		return list_tpl_results
+	# define function for scoring a set of ltv values
+	def evaluate(self, X, arr_ltv):
+		# return original predictions and grouped samples
+		return self.evaluate_batch(list_X=[X], list_arr_ltv=[arr_ltv])[0]
+	# define helper for subsetting the grouped samples to the offers
+	def summarize(self, X, list_y_hat_pd, list_y_hat_lgd, df_grouped):
+		# get down total (original)
+		flt_down_total = X['fltapproveddowntotal__app'].iloc[0]
+		# get ecnl and modified ecnl (original)
+		flt_ecnl = df_grouped['ecnl'].iloc[0]
+		flt_ecnl_mod = df_grouped['ecnl_mod'].iloc[0]
+		# subset ecnl to < original
+		df_grouped_sub = df_grouped[(df_grouped['ecnl'] < flt_ecnl) & (df_grouped['fltapproveddowntotal__app'] >= flt_down_total)]
+		# sort by ecnl
+		df_grouped_sub = df_grouped_sub.sort_values(by='ecnl_mod', ascending=True)
+		# return
+		return {'y_hat_pd': list_y_hat_pd,
+				'y_hat_lgd': list_y_hat_lgd,
+				'y_hat_pd_x_lgd': flt_ecnl,
+				'y_hat_pd_x_lgd_mod': flt_ecnl_mod,
+				'df_grouped': df_grouped,
+				'df_grouped_sub': df_grouped_sub}
+	# define function for generating counter-offers for several requests at once
+	def generate_batch(self, list_X, int_n_samples=100):
+		# make array of loan to value
+		arr_ltv = np.linspace(self.flt_ltv_min, self.flt_ltv_max, int_n_samples)
+		# score
+		list_tpl_results = self.evaluate_batch(list_X=list_X, list_arr_ltv=[arr_ltv]*len(list_X))
+		# return
+		return [self.summarize(X, *tpl_results) for X, tpl_results in zip(list_X, list_tpl_results)]
+	# define function for generating counter-offers
+	def generate(self, X, int_n_samples=100):
+		# return
+		return self.generate_batch(list_X=[X], int_n_samples=int_n_samples)[0]
+	# define function for scoring only the original rows of several requests (no counter-offers)
+	def original_batch(self, list_X):
+		# stack requests
+		X_all = pd.concat(list_X, axis=0, ignore_index=True) if len(list_X) > 1 else list_X[0]
+		# predict (one call per model for every request)
+		arr_y_hat_pd, arr_y_hat_lgd = self.predict(X=X_all, arr_idx_rows=None, df_grid=None)
+		# empty list of results
+		list_dict_counter = []
+		int_row_start = 0
+		for X in list_X:
+			int_row_end = int_row_start + X.shape[0]
+			# original row only (mean of the debtors)
+			df_grouped = pd.DataFrame({'sample': [0.0],
+									   'fltapproveddowntotal__app': [np.mean(X['fltapproveddowntotal__app'].values.astype(float))],
+									   'fltamountfinanced__app': [np.mean(X['fltamountfinanced__app'].values.astype(float))],
+									   'fltapprovedpricewholesale__app': [np.mean(X['fltapprovedpricewholesale__app'].values.astype(float))],
+									   'y_hat_pd': [np.mean(arr_y_hat_pd[int_row_start:int_row_end])],
+									   'y_hat_lgd': [np.mean(arr_y_hat_lgd[int_row_start:int_row_end])]})
+			# calculate ecnl
+			df_grouped['ecnl'] = df_grouped['y_hat_pd'] * df_grouped['y_hat_lgd']
+			# calculate modified ecnl
+			df_grouped['ecnl_mod'] = (1.95553 * df_grouped['ecnl']) - 0.03281
+			# append
+			list_dict_counter.append(self.summarize(X, list(arr_y_hat_pd[int_row_start:int_row_end]), list(arr_y_hat_lgd[int_row_start:int_row_end]), df_grouped))
+			int_row_start = int_row_end
+		# return
+		return list_dict_counter
+	# define function for searching counter-offers for several requests at once (coarse grid then refine where ecnl crosses the original)
+	def search_batch(self, list_X, int_n_coarse=25, int_n_refine=4, int_n_rounds=2, int_n_best=3):
+		# make coarse array of loan to value
+		arr_ltv = np.linspace(self.flt_ltv_min, self.flt_ltv_max, int_n_coarse)
+		# score
+		list_tpl_results = self.evaluate_batch(list_X=list_X, list_arr_ltv=[arr_ltv]*len(list_X))
+		# empty lists for the state of every request
+		list_flt_down_total, list_flt_ecnl, list_df_original, list_df_samples, list_arr_ltv_all = [], [], [], [], []
+		for X, (list_y_hat_pd, list_y_hat_lgd, df_grouped) in zip(list_X, list_tpl_results):
+			# get down total (original)
+			list_flt_down_total.append(X['fltapproveddowntotal__app'].iloc[0])
+			# get ecnl (original)
+			list_flt_ecnl.append(df_grouped['ecnl'].iloc[0])
+			# keep the original row
+			list_df_original.append(df_grouped.iloc[:1])
+			# put ltv on each sample
+			df_samples = df_grouped.iloc[1:].copy()
+			df_samples['ltv'] = arr_ltv[df_samples['sample'].values.astype(int)-1]
+			list_df_samples.append(df_samples)
+			# every ltv evaluated so far
+			list_arr_ltv_all.append(arr_ltv)
+		# refine
+		for int_round in range(int_n_rounds):
+			# empty lists of requests to refine and their ltv
+			list_int_refine = []
+			list_arr_ltv_refine = []
+			for int_idx in range(len(list_X)):
+				# offer or not for every ltv evaluated (ltv filtered out of the grid are not offers)
+				df_samples = list_df_samples[int_idx]
+				arr_bool_offer_samples = ((df_samples['ecnl'] < list_flt_ecnl[int_idx]) & (df_samples['fltapproveddowntotal__app'] >= list_flt_down_total[int_idx])).values
+				dict_bool_offer = dict(zip(df_samples['ltv'], arr_bool_offer_samples))
+				dict_ecnl_mod = dict(zip(df_samples['ltv'], df_samples['ecnl_mod']))
+				arr_ltv_all = list_arr_ltv_all[int_idx]
+				arr_bool_offer = np.array([dict_bool_offer.get(flt_ltv, False) for flt_ltv in arr_ltv_all])
+				# intervals where the offer status changes
+				set_idx_interval = set(np.flatnonzero(arr_bool_offer[:-1] != arr_bool_offer[1:]))
+				# intervals on both sides of the best offers (the lowest ecnl can sit between grid points away from any crossing)
+				arr_ecnl_mod = np.array([dict_ecnl_mod.get(flt_ltv, np.inf) if bool_offer else np.inf for flt_ltv, bool_offer in zip(arr_ltv_all, arr_bool_offer)])
+				for int_best in np.argsort(arr_ecnl_mod, kind='stable')[:int_n_best]:
+					# logic
+					if not np.isfinite(arr_ecnl_mod[int_best]):
+						break
+					set_idx_interval.update(int_interval for int_interval in [int_best-1, int_best] if 0 <= int_interval < len(arr_ltv_all)-1)
+				# logic
+				if len(set_idx_interval) == 0:
+					continue
+				# refine inside each interval
+				list_int_refine.append(int_idx)
+				list_arr_ltv_refine.append(np.concatenate([np.linspace(arr_ltv_all[int_interval], arr_ltv_all[int_interval+1], int_n_refine+2)[1:-1] for int_interval in sorted(set_idx_interval)]))
+			# logic
+			if len(list_int_refine) == 0:
+				break
+			# score
+			list_tpl_refine = self.evaluate_batch(list_X=[list_X[int_idx] for int_idx in list_int_refine], list_arr_ltv=list_arr_ltv_refine)
+			for int_idx, arr_ltv, (list_y_hat_pd, list_y_hat_lgd, df_grouped) in zip(list_int_refine, list_arr_ltv_refine, list_tpl_refine):
+				# put ltv on each sample
+				df_grouped = df_grouped.iloc[1:].copy()
+				df_grouped['ltv'] = arr_ltv[df_grouped['sample'].values.astype(int)-1]
+				# append
+				list_df_samples[int_idx] = pd.concat([list_df_samples[int_idx], df_grouped], axis=0, sort=False)
+				list_arr_ltv_all[int_idx] = np.sort(np.concatenate([list_arr_ltv_all[int_idx], arr_ltv]))
+		# empty list of results
+		list_dict_counter = []
+		for X, (list_y_hat_pd, list_y_hat_lgd, df_grouped), df_original, df_samples in zip(list_X, list_tpl_results, list_df_original, list_df_samples):
+			# order by ltv and renumber samples
+			df_samples = df_samples.sort_values(by='ltv', ascending=True)
+			df_samples['sample'] = np.arange(1, df_samples.shape[0]+1, dtype=float)
+			# put original back on top
+			df_grouped = pd.concat([df_original, df_samples.drop('ltv', axis=1)], axis=0, sort=False, ignore_index=True)
+			# append
+			list_dict_counter.append(self.summarize(X, list_y_hat_pd, list_y_hat_lgd, df_grouped))
+		# return
+		return list_dict_counter
+	# define function for searching counter-offers
+	def search(self, X, int_n_coarse=25, int_n_refine=4, int_n_rounds=2, int_n_best=3):
+		# return
+		return self.search_batch(list_X=[X], int_n_coarse=int_n_coarse, int_n_refine=int_n_refine, int_n_rounds=int_n_rounds, int_n_best=int_n_best)[0]
+
+# define top-k adverse action reason extractor
+class AdverseActionReasons:
+	# initialize
+	def __init__(self, list_x_feats, dict_aa_pd, int_n_reasons=5):
+		self.list_x_feats = list_x_feats
+		self.dict_aa_pd = dict_aa_pd
+		self.int_n_reasons = int_n_reasons
+		# unique reasons (features not in dict_aa_pd each get their own nan reason)
+		list_reasons = []
+		dict_reason_code = {}
+		list_code = []
+		for col in list_x_feats:
+			# logic
+			if col in dict_aa_pd:
+				# add the reason the first time we see it
+				if dict_aa_pd[col] not in dict_reason_code:
+					dict_reason_code[dict_aa_pd[col]] = len(list_reasons)
+					list_reasons.append(dict_aa_pd[col])
+				list_code.append(dict_reason_code[dict_aa_pd[col]])
+			else:
+				# unmapped feature
+				list_code.append(len(list_reasons))
+				list_reasons.append(np.nan)
+		# feature index to reason code
+		self.arr_code = np.array(list_code, dtype=int)
+		# reason code to reason
+		self.arr_reasons = np.array(list_reasons, dtype=object)
+		# n candidates so we still have int_n_reasons after dropping repeated reasons
+		self.int_n_candidates = min(len(list_x_feats), int_n_reasons + (len(list_x_feats) - len(list_reasons)))
+	# transform
+	def transform(self, arr_shap):
+		# get n rows and n feats
+		int_n_rows, int_n_feats = arr_shap.shape
+		int_n_candidates = self.int_n_candidates
+		# top candidates for each row (unordered)
+		if int_n_candidates < int_n_feats:
+			arr_idx = np.argpartition(-arr_shap, int_n_candidates-1, axis=1)[:, :int_n_candidates]
+		else:
+			arr_idx = np.tile(np.arange(int_n_feats), (int_n_rows, 1))
+		# ties at the cutoff go to the feature that comes first in the model
+		flt_cutoff = np.take_along_axis(arr_shap, arr_idx, axis=1).min(axis=1, keepdims=True)
+		for int_row in np.flatnonzero((arr_shap == flt_cutoff).sum(axis=1) > (np.take_along_axis(arr_shap, arr_idx, axis=1) == flt_cutoff).sum(axis=1)):
+			# redo this row with a stable sort
+			arr_idx[int_row] = np.argsort(-arr_shap[int_row], kind='stable')[:int_n_candidates]
+		# order candidates by shap descending then by feature position
+		arr_shap_candidates = np.take_along_axis(arr_shap, arr_idx, axis=1)
+		arr_order = np.lexsort((arr_idx, -arr_shap_candidates), axis=1)
+		arr_idx = np.take_along_axis(arr_idx, arr_order, axis=1)
+		# reason codes of the candidates
+		arr_code = self.arr_code[arr_idx]
+		# keep the first time each reason code shows up in a row
+		arr_bool_first = ~np.tril(arr_code[:, :, None] == arr_code[:, None, :], k=-1).any(axis=2)
+		# keep the top int_n_reasons of those
+		arr_bool_keep = arr_bool_first & (np.cumsum(arr_bool_first, axis=1) <= self.int_n_reasons)
+		# map to reasons
+		list_list_reasons = [list(self.arr_reasons[arr_code_row[arr_bool_row]]) for arr_code_row, arr_bool_row in zip(arr_code, arr_bool_keep)]
+		# return
+		return list_list_reasons
+
+# define response builder class
+class ResponseBuilder:
+	# initialize
+	def __init__(self, str_model_name='prestige-GenXI', str_model_version='v2', int_double_precision=10):
+		self.str_model_name = str_model_name
+		self.str_model_version = str_model_version
+		self.int_double_precision = int_double_precision
+	# define helper for cleaning a score (rounded like to_json, nan to None)
+	def clean_score(self, flt_value):
+		# logic
+		if (flt_value is None) or (flt_value != flt_value):
+			return None
+		# return
+		return round(float(flt_value), self.int_double_precision)
+	# define helper for cleaning a reason (nan to None)
+	def clean_reason(self, reason):
+		# logic
+		if isinstance(reason, float) and (reason != reason):
+			return None
+		# return
+		return reason
+	# define function for building the output
+	def build(self, list_unique_id, y_hat_pd, y_hat_lgd, y_hat_pd_x_lgd, y_hat_pd_x_lgd_mod, list_list_reasons, list_list_errors, df_counter, list_degraded=None):
+		# ecnl and modified ecnl are the same for every debtor
+		flt_ecnl = self.clean_score(y_hat_pd_x_lgd)
+		flt_ecnl_mod = self.clean_score(y_hat_pd_x_lgd_mod)
+		# results for each debtor
+		list_output = [{'Row_id': unique_id,
+						'Score_pd': self.clean_score(flt_pd),
+						'Score_lgd': self.clean_score(flt_lgd),
+						'Score_ecnl': flt_ecnl,
+						'Score_ecnl_mod': flt_ecnl_mod,
+						'Key_factors': [self.clean_reason(reason) for reason in list_reasons],
+						'Outlier_score': 0.0} for unique_id, flt_pd, flt_lgd, list_reasons in zip(list_unique_id, y_hat_pd, y_hat_lgd, list_list_reasons)]
+		# combine list of errors (without empty strings)
+		list_errors_final = [err for err in chain(*list_list_errors) if err != '']
+		# counter-offers straight from the arrays
+		arr_counter = df_counter[['fltapproveddowntotal__app',
+								  'fltamountfinanced__app',
+								  'fltapprovedpricewholesale__app',
+								  'ecnl_mod']].values.astype(float)
+		list_counter = [{'Cash Down': flt_down,
+						 'Amount Financed': flt_financed,
+						 'Price Wholesale': flt_wholesale,
+						 'ECNL Modified': flt_ecnl_mod_counter} for flt_down, flt_financed, flt_wholesale, flt_ecnl_mod_counter in arr_counter.tolist()]
+		# create final output
+		output_final = {"Request_id": "",
+						"Zaml_processing_id": "",
+						"Response": [{"Model_name": self.str_model_name,
+									  "Model_version": self.str_model_version,
+									  "Results": list_output,
+									  "Errors": list_errors_final,
+									  "Counter-Offers": list_counter}]}
+		# logic
+		if list_degraded is not None:
+			# stages that fell back to a cheaper mode to meet the deadline
+			output_final['Response'][0]['Degraded_stages'] = list_degraded
+		# return
+		return output_final
+	# define function for serializing the output
+	def to_bytes(self, output_final):
+		# return
+		return json.dumps(output_final, separators=(',', ':')).encode('utf-8')
+
+# define lru cache class with a byte budget, ttl, and model version
+class LRUCache:
+	# initialize
+	def __init__(self, int_max_bytes, flt_ttl_sec=None, str_version=None):
+		self.int_max_bytes = int_max_bytes
+		self.flt_ttl_sec = flt_ttl_sec
+		self.str_version = str_version
+		self.dict_entry = OrderedDict()
+		self.int_bytes = 0
+		self.int_hits = 0
+		self.int_misses = 0
+		self.lock = threading.Lock()
+	# define helper for estimating the bytes held by an entry
+	def size_of(self, obj):
+		# logic
+		if isinstance(obj, np.ndarray):
+			return obj.nbytes + (sum(sys.getsizeof(val) for val in obj.ravel()) if obj.dtype == object else 0)
+		if isinstance(obj, pd.DataFrame):
+			return int(obj.memory_usage(index=True, deep=True).sum())
+		if isinstance(obj, dict):
+			return sys.getsizeof(obj) + sum(self.size_of(key) + self.size_of(val) for key, val in obj.items())
+		if isinstance(obj, (list, tuple)):
+			return sys.getsizeof(obj) + sum(self.size_of(val) for val in obj)
+		# return
+		return sys.getsizeof(obj)
+	# define function for dropping everything
+	def clear(self):
+		with self.lock:
+			self.dict_entry.clear()
+			self.int_bytes = 0
+		# return object
+		return self
+	# define function for invalidating on a new model version
+	def set_version(self, str_version):
+		# logic
+		if str_version != self.str_version:
+			self.clear()
+			self.str_version = str_version
+		# return object
+		return self
+	# define function for getting an entry (None if missing or expired)
+	def get(self, str_key):
+		with self.lock:
+			tpl_entry = self.dict_entry.get(str_key)
+			# logic
+			if tpl_entry is None:
+				self.int_misses += 1
+				return None
+			value, int_bytes, flt_expires = tpl_entry
+			if (flt_expires is not None) and (time.monotonic() > flt_expires):
+				# expired
+				del self.dict_entry[str_key]
+				self.int_bytes -= int_bytes
+				self.int_misses += 1
+				return None
+			# most recently used
+			self.dict_entry.move_to_end(str_key)
+			self.int_hits += 1
+		# return
+		return value
+	# define function for setting an entry
+	def set(self, str_key, value):
+		# get size
+		int_bytes = self.size_of(value)
+		# logic
+		if int_bytes > self.int_max_bytes:
+			return self
+		flt_expires = time.monotonic() + self.flt_ttl_sec if self.flt_ttl_sec is not None else None
+		with self.lock:
+			# replace any old entry
+			tpl_entry = self.dict_entry.pop(str_key, None)
+			if tpl_entry is not None:
+				self.int_bytes -= tpl_entry[1]
+			self.dict_entry[str_key] = (value, int_bytes, flt_expires)
+			self.int_bytes += int_bytes
+			# evict least recently used until under budget
+			while self.int_bytes > self.int_max_bytes:
+				_, (_, int_bytes_old, _) = self.dict_entry.popitem(last=False)
+				self.int_bytes -= int_bytes_old
+		# return object
+		return self
+
+# define class for choosing the mode of each stage from a latency budget
+class StageScheduler:
+	# initialize
+	def __init__(self, flt_alpha=0.2, flt_margin=1.2, dict_flt_sec_prior=None):
+		self.flt_alpha = flt_alpha
+		self.flt_margin = flt_margin
+		# seconds assumed by stage and mode until observed (e.g. {'counter_offers.full': 0.05}), others are assumed not to fit
+		self.dict_flt_sec_prior = dict_flt_sec_prior if dict_flt_sec_prior is not None else {}
+		# moving average of seconds by stage and mode
+		self.dict_flt_sec = {}
+	# define function for observing how long a stage took in a mode
+	def observe(self, str_stage, str_mode, flt_sec):
+		str_key = f'{str_stage}.{str_mode}'
+		flt_sec_old = self.dict_flt_sec.get(str_key)
+		# exponential moving average
+		self.dict_flt_sec[str_key] = flt_sec if flt_sec_old is None else (1 - self.flt_alpha) * flt_sec_old + self.flt_alpha * flt_sec
+		# return object
+		return self
+	# define function for the expected seconds of a stage in a mode (the prior, or inf, until observed)
+	def estimate(self, str_stage, str_mode):
+		str_key = f'{str_stage}.{str_mode}'
+		# return
+		return self.dict_flt_sec.get(str_key, self.dict_flt_sec_prior.get(str_key, np.inf)) * self.flt_margin
+	# define function for choosing the most expensive mode that fits (modes ordered most to least expensive)
+	def choose(self, str_stage, list_str_modes, flt_sec_left, flt_sec_reserve=0.0):
+		# iterate through modes
+		for str_mode in list_str_modes:
+			# logic
+			if self.estimate(str_stage=str_stage, str_mode=str_mode) + flt_sec_reserve <= flt_sec_left:
+				return str_mode
+		# return cheapest
+		return list_str_modes[-1]
+
+# define class for a challenger model set (scored on the champion's preprocessed X)
+class ModelSet:
+	# initialize (str_mode is none for the original rows only, full for the counter-offer grid too)
+	def __init__(self, str_name, pipeline_pd, pipeline_lgd, dict_aa_pd=None, list_non_numeric_pd=None, list_counter_transformers=None, str_mode='none', int_n_samples=100, int_thread_count=1):
+		self.str_name = str_name
+		self.pipeline_pd = pipeline_pd
+		self.pipeline_lgd = pipeline_lgd
+		self.dict_aa_pd = dict_aa_pd
+		self.list_non_numeric_pd = list_non_numeric_pd
+		self.list_counter_transformers = list_counter_transformers
+		self.str_mode = str_mode
+		self.int_n_samples = int_n_samples
+		self.int_thread_count = int_thread_count
+		self.counter_offer_engine = None
+		self.aa_reasons = None
+	# define function for building the engines next to a champion (its counter transformers and cat feats by default)
+	def attach(self, parse_payload):
+		# logic
+		if self.list_counter_transformers is None:
+			self.list_counter_transformers = parse_payload.counter_offer_engine.list_transformers
+		if self.list_non_numeric_pd is None:
+			self.list_non_numeric_pd = parse_payload.list_non_numeric_pd
+		# counter-offer engine (few threads so the champion keeps the cores)
+		self.counter_offer_engine = CounterOfferEngine(list_transformers=self.list_counter_transformers,
+													   model_pd=self.pipeline_pd.model,
+													   model_lgd=self.pipeline_lgd.model,
+													   int_thread_count=self.int_thread_count)
+		# adverse action reason extractor (no reasons without a reason map)
+		if self.dict_aa_pd is not None:
+			self.aa_reasons = AdverseActionReasons(list_x_feats=self.pipeline_pd.model.feature_names_, dict_aa_pd=self.dict_aa_pd)
+		# return object
+		return self
+	# define function for scoring several preprocessed requests at once
+	def score_batch(self, list_X):
+		# logic
+		if self.str_mode == 'full':
+			list_dict_counter = self.counter_offer_engine.generate_batch(list_X=list_X, int_n_samples=self.int_n_samples)
+		else:
+			list_dict_counter = self.counter_offer_engine.original_batch(list_X=list_X)
+		# reasons
+		list_list_list_reasons = [None] * len(list_X)
+		if self.aa_reasons is not None:
+			# stack the rows of every request
+			list_x_feats = self.pipeline_pd.model.feature_names_
+			X = pd.concat([X[list_x_feats] for X in list_X], axis=0, ignore_index=True)
+			# generate shap vals (drop the bias column)
+			arr_shap_vals = self.pipeline_pd.model.get_feature_importance(data=cb.Pool(X, cat_features=self.list_non_numeric_pd),
+																		  type='ShapValues',
+																		  prettified=False,
+																		  thread_count=self.int_thread_count,
+																		  verbose=False)[:, :-1]
+			list_list_reasons = self.aa_reasons.transform(arr_shap=arr_shap_vals)
+			# split back into each request
+			list_int_row = np.cumsum([0] + [X.shape[0] for X in list_X])
+			list_list_list_reasons = [list_list_reasons[int_start:int_end] for int_start, int_end in zip(list_int_row[:-1], list_int_row[1:])]
+		# return
+		return [{'pd': [float(flt_pd) for flt_pd in dict_counter['y_hat_pd']],
+				 'lgd': [float(flt_lgd) for flt_lgd in dict_counter['y_hat_lgd']],
+				 'ecnl': float(dict_counter['y_hat_pd_x_lgd']),
+				 'ecnl_mod': float(dict_counter['y_hat_pd_x_lgd_mod']),
+				 'n_counter_offers': int(dict_counter['df_grouped_sub'].shape[0]) if self.str_mode == 'full' else None,
+				 'reasons': list_list_reasons} for dict_counter, list_list_reasons in zip(list_dict_counter, list_list_list_reasons)]
+
+# define class for a local sink of shadow results (one json line per request and model set, {pid} in the name gives each worker its own file)
+class JsonLinesSink:
+	# initialize
+	def __init__(self, str_filename):
+		self.str_filename = str_filename
+		self.lock = threading.Lock()
+	# define function for writing records
+	def write(self, list_dict_record):
+		# serialize outside the lock
+		str_lines = ''.join(json.dumps(dict_record) + '\n' for dict_record in list_dict_record)
+		with self.lock:
+			with open(self.str_filename.format(pid=os.getpid()), 'a') as file_out:
+				file_out.write(str_lines)
+		# return object
+		return self
+
+# define class for scoring challengers off the response path (any sink with write(list_dict_record) works)
+class ShadowScorer:
+	# initialize
+	def __init__(self, list_model_sets, sink, int_max_queue=1000):
+		self.list_model_sets = list_model_sets
+		self.sink = sink
+		self.int_max_queue = int_max_queue
+		self.queue = None
+		self.thread = None
+		self.int_pid = None
+	# define function for starting the background thread
+	def start(self):
+		# new queue and thread (threads do not survive a fork, so each process starts its own)
+		self.queue = queue.Queue(maxsize=self.int_max_queue)
+		self.thread = threading.Thread(target=self.run, daemon=True)
+		self.thread.start()
+		self.int_pid = os.getpid()
+		# return object
+		return self
+	# define function for queueing scored requests (never blocks, drops when full)
+	def submit(self, str_champion, list_ctx):
+		# logic
+		if self.int_pid != os.getpid():
+			self.start()
+		# what the challengers need (the champion is done with these, so they are only read)
+		tpl_job = (time.time(), str_champion, [(ctx.list_unique_id, ctx.X, ctx.y_hat_pd, ctx.y_hat_lgd, ctx.y_hat_pd_x_lgd, ctx.y_hat_pd_x_lgd_mod) for ctx in list_ctx])
+		try:
+			self.queue.put_nowait(tpl_job)
+			GET_INSTRUMENTATION().count(str_name='shadow.submitted', int_n=len(list_ctx))
+		except queue.Full:
+			GET_INSTRUMENTATION().count(str_name='shadow.dropped', int_n=len(list_ctx))
+		# return object
+		return self
+	# define worker loop
+	def run(self):
+		# iterate until stopped
+		while True:
+			tpl_job = self.queue.get()
+			try:
+				# logic
+				if tpl_job is None:
+					break
+				self.score(tpl_job=tpl_job)
+			finally:
+				self.queue.task_done()
+	# define function for scoring one job with every challenger and writing it to the sink
+	def score(self, tpl_job):
+		flt_timestamp, str_champion, list_tpl_request = tpl_job
+		list_X = [tpl_request[1] for tpl_request in list_tpl_request]
+		# empty list of records
+		list_dict_record = []
+		for model_set in self.list_model_sets:
+			time_start = time.perf_counter()
+			# a failing challenger only fails its own records
+			try:
+				list_dict_challenger = model_set.score_batch(list_X=list_X)
+				str_error = None
+			except Exception as e:
+				list_dict_challenger = [None] * len(list_X)
+				str_error = repr(e)
+			flt_sec = time.perf_counter()-time_start
+			GET_INSTRUMENTATION().record(str_name=f'shadow.{model_set.str_name}', flt_sec=flt_sec)
+			# one record per request
+			for (list_unique_id, X, y_hat_pd, y_hat_lgd, y_hat_pd_x_lgd, y_hat_pd_x_lgd_mod), dict_challenger in zip(list_tpl_request, list_dict_challenger):
+				list_dict_record.append({'timestamp': flt_timestamp,
+										 'row_ids': list(list_unique_id),
+										 'champion': {'name': str_champion,
+													  'pd': [float(flt_pd) for flt_pd in y_hat_pd],
+													  'lgd': [float(flt_lgd) for flt_lgd in y_hat_lgd],
+													  'ecnl': float(y_hat_pd_x_lgd),
+													  'ecnl_mod': float(y_hat_pd_x_lgd_mod)},
+										 'challenger': dict(name=model_set.str_name, **dict_challenger) if dict_challenger is not None else {'name': model_set.str_name},
+										 'sec': flt_sec / len(list_X),
+										 'error': str_error})
+		# write (a broken sink must not kill the thread)
+		try:
+			self.sink.write(list_dict_record)
+		except Exception:
+			GET_INSTRUMENTATION().count(str_name='shadow.sink_error')
+		# return object
+		return self
+	# define function for waiting until every queued job is written
+	def flush(self):
+		# logic
+		if (self.queue is not None) and (self.int_pid == os.getpid()):
+			self.queue.join()
+		# return object
+		return self
+	# define function for stopping the background thread (after queued jobs)
+	def stop(self):
+		# logic
+		if (self.thread is not None) and (self.int_pid == os.getpid()):
+			self.queue.put(None)
+			self.thread.join()
+		self.queue, self.thread, self.int_pid = None, None, None
+		# return object
+		return self
+
+# define class for holding the state of a single request
+class RequestContext:
+	# initialize
+	def __init__(self, json_str_request=None):
+		self.json_str_request = json_str_request
+		# filled in as the request moves through the stages
+		self.list_unique_id = []
+		self.list_payload = []
+		self.list_list_errors = []
+		self.list_list_reasons = []
+		self.output_final = None
+		# set if the request could not be parsed
+		self.exception = None
+		# set if the result came from the cache
+		self.bool_cache_hit = False
+		# stages that ran in a cheaper mode (None if scored without a budget)
+		self.list_degraded = None
+
 # define function for payload parsing and generating output
 class ParsePayload:
 	# initialize
@@ -127,7 +1334,17 @@ class ParsePayload:
 					   bool_debt=False,
 					   list_feats_raw_debt=None,
 					   list_feats_agg_debt=None,
-					   dict_debt_agg=None):
+					   dict_debt_agg=None,
+					   bool_batch_parse=False,
+					   list_counter_transformers=None,
+					   bool_counter_search=False,
+					   bool_fast_shap=False,
+					   int_cache_bytes=0,
+					   flt_cache_ttl_sec=None,
+					   int_n_samples_degraded=12,
+					   int_n_reason_bands=10,
+					   bool_compile_shared=True,
+					   dict_flt_sec_prior=None):
 		# args
 		self.list_feats_raw_app = list_feats_raw_app
 		self.list_feats_raw_inc = list_feats_raw_inc
@@ -147,8 +1364,170 @@ class ParsePayload:
 		self.list_non_numeric_pd = list_non_numeric_pd
 		self.dict_aa_pd = dict_aa_pd
 		self.bool_debt = bool_debt
+		self.bool_batch_parse = bool_batch_parse
+		self.bool_counter_search = bool_counter_search
+		self.bool_fast_shap = bool_fast_shap
+		self.int_n_samples_degraded = int_n_samples_degraded
+		self.int_n_reason_bands = int_n_reason_bands
+		# compile the feature schema once
+		self.schema = FeatureSchema(df_empty=df_empty,
+									list_feats_raw_app=list_feats_raw_app,
+									list_feats_raw_inc=list_feats_raw_inc,
+									dict_income_agg=dict_income_agg,
+									list_feats_raw_ln=list_feats_raw_ln,
+									list_feats_raw_tuaccept=list_feats_raw_tuaccept,
+									list_feats_raw_cvlink=list_feats_raw_cvlink,
+									list_feats_raw_debt=list_feats_raw_debt if bool_debt else None,
+									dict_debt_agg=dict_debt_agg if bool_debt else None)
+		# compile the shared pipeline against the serving schema (an empty row)
+		if bool_compile_shared and hasattr(pipeline_shared, 'compile'):
+			pipeline_shared.compile(X=self.schema.to_frame(block=self.schema.create_block(1)))
+		# counter-offer engine (binner, val replacer, and FE from the shared pipeline by default)
+		if list_counter_transformers is None:
+			list_counter_transformers = pipeline_shared.list_transformers[5:8]
+		self.counter_offer_engine = CounterOfferEngine(list_transformers=list_counter_transformers,
+													   model_pd=pipeline_pd.model,
+													   model_lgd=pipeline_lgd.model)
+		# response builder
+		self.response_builder = ResponseBuilder()
+		# adverse action reason extractor
+		self.aa_reasons = AdverseActionReasons(list_x_feats=pipeline_pd.model.feature_names_, dict_aa_pd=dict_aa_pd)
+		# stage scheduler for scoring under a latency budget (stages not yet timed fall back to the cheapest mode, see warm_up)
+		self.scheduler = StageScheduler(dict_flt_sec_prior=dict_flt_sec_prior)
+		# reason templates by pd band (filled from fully explained rows, global importance until then)
+		self.dict_reason_template = {}
+		self.list_reasons_template = self.aa_reasons.transform(arr_shap=np.array([pipeline_pd.model.get_feature_importance()]))[0]
+		# precompute tree shap tables for the feats that map to reasons
+		if bool_fast_shap:
+			self.tree_shap = ObliviousTreeShap(model=pipeline_pd.model,
+											   list_feats_keep=[col for col in pipeline_pd.model.feature_names_ if col in dict_aa_pd])
+		# result and parsed source caches (budget split between them, off by default)
+		self.cache_result, self.cache_source = None, None
+		if int_cache_bytes > 0:
+			str_version = f'{self.response_builder.str_model_name}-{self.response_builder.str_model_version}'
+			self.cache_result = LRUCache(int_max_bytes=int_cache_bytes//2, flt_ttl_sec=flt_cache_ttl_sec, str_version=str_version)
+			self.cache_source = LRUCache(int_max_bytes=int_cache_bytes//2, flt_ttl_sec=flt_cache_ttl_sec, str_version=str_version)
+		# challengers scored off the response path (off until set_challengers)
+		self.shadow = None
+	# define function for changing the model version (invalidates the caches)
+	def set_model_version(self, str_model_version):
+		self.response_builder.str_model_version = str_model_version
+		# logic
+		if self.cache_result is not None:
+			str_version = f'{self.response_builder.str_model_name}-{str_model_version}'
+			self.cache_result.set_version(str_version)
+			self.cache_source.set_version(str_version)
+		# return object
+		return self
+	# define function for scoring challenger model sets on every request the champion scores (results go to the sink)
+	def set_challengers(self, list_model_sets, sink, int_max_queue=1000):
+		# stop the old challengers
+		if getattr(self, 'shadow', None) is not None:
+			self.shadow.stop()
+		# build each model set next to the champion
+		for model_set in list_model_sets:
+			model_set.attach(parse_payload=self)
+		# save to object
+		self.shadow = ShadowScorer(list_model_sets=list_model_sets, sink=sink, int_max_queue=int_max_queue)
+		# return object
+		return self
+	# define helper for handing scored requests to the challengers
+	def shadow_score(self, list_ctx):
+		# logic
+		if (getattr(self, 'shadow', None) is not None) and list_ctx:
+			self.shadow.submit(str_champion=f'{self.response_builder.str_model_name}-{self.response_builder.str_model_version}', list_ctx=list_ctx)
+		# return object
+		return self
+	# define helper for hashing a source table
+	def hash_source(self, str_name, str_values):
+		# return
+		return hashlib.blake2b(f'{str_name}\x00{str_values}'.encode('utf-8'), digest_size=16).hexdigest()
+	# define helper for hashing the sources of every applicant and the counter-offer grid (row ids are not part of the key)
+	def hash_request(self, list_payload, int_n_samples=100):
+		# hash of the counter-offer grid and the source hashes in order
+		hash_request = hashlib.blake2b(digest_size=16)
+		hash_request.update(('search|' if self.bool_counter_search else f'grid:{int_n_samples}|').encode('utf-8'))
+		for payload in list_payload:
+			for dict_data in payload:
+				hash_request.update(self.hash_source(str_name=dict_data['name'], str_values=dict_data['values']).encode('utf-8'))
+			# end of applicant
+			hash_request.update(b'|')
+		# return
+		return hash_request.hexdigest()
+	# define function for restoring a cached result into the context
+	def load_cached(self, json_str_request, ctx, int_n_samples=100):
+		ctx.bool_cache_hit = False
+		# get payloads
+		self.get_payload_df(json_str_request=json_str_request, ctx=ctx)
+		# look up
+		ctx.str_cache_key = self.hash_request(list_payload=ctx.list_payload, int_n_samples=int_n_samples)
+		dict_cached = self.cache_result.get(ctx.str_cache_key)
+		# logic
+		if dict_cached is None:
+			GET_INSTRUMENTATION().count(str_name='cache.result.miss')
+			return False
+		GET_INSTRUMENTATION().count(str_name='cache.result.hit')
+		# restore
+		for str_attr, value in dict_cached.items():
+			setattr(ctx, str_attr, value)
+		ctx.bool_cache_hit = True
+		# return
+		return True
+	# define function for saving a scored result from the context
+	def save_cached(self, ctx):
+		# save everything but the row ids
+		self.cache_result.set(ctx.str_cache_key, {str_attr: getattr(ctx, str_attr) for str_attr in ['list_list_errors',
+																									 'X',
+																									 'dict_n_miss',
+																									 'y_hat_pd',
+																									 'y_hat_lgd',
+																									 'y_hat_pd_x_lgd',
+																									 'y_hat_pd_x_lgd_mod',
+																									 'X_lg_grouped_pre_sub',
+																									 'X_lg_grouped',
+																									 'list_list_reasons']})
+		# return object
+		return self
+	# define helper for parsing one source table (through the source cache if on)
+	def parse_source(self, str_name, str_values, arr_row, ctx):
+		# parser, error, and array for each source
+		str_parser, str_error, str_arr = {'Application': ('parse_application', 'error_app', 'arr_app'),
+										  'Incomes': ('parse_income', 'error_inc', 'arr_inc'),
+										  'Debts': ('parse_debt', 'error_debt', 'arr_debt'),
+										  'Lexis Nexis Risk View 5': ('parse_ln', 'error_ln', 'arr_ln'),
+										  'TUXML': ('parse_tuxml', 'error_tuxml', 'arr_tuxml')}[str_name]
+		# logic
+		if self.cache_source is None:
+			# parse straight into the row
+			getattr(self, str_parser)(str_values=str_values, arr_row=arr_row, ctx=ctx)
+			# return error
+			return getattr(ctx, str_error)
+		# look up
+		str_key = self.hash_source(str_name=str_name, str_values=str_values)
+		tpl_cached = self.cache_source.get(str_key)
+		# logic
+		if tpl_cached is None:
+			GET_INSTRUMENTATION().count(str_name='cache.source.miss')
+			# parse into a blank row and keep only the slots written
+			arr_row_source = self.schema.create_block(1)[0]
+			getattr(self, str_parser)(str_values=str_values, arr_row=arr_row_source, ctx=ctx)
+			arr_pos, arr_values = arr_row_source.written()
+			tpl_cached = (arr_pos, arr_values, getattr(ctx, str_error))
+			self.cache_source.set(str_key, tpl_cached)
+		else:
+			GET_INSTRUMENTATION().count(str_name='cache.source.hit')
+		# write slots into the row
+		arr_pos, arr_values, error = tpl_cached
+		arr_row[arr_pos] = arr_values
+		# save to object
+		setattr(ctx, str_error, error)
+		setattr(ctx, str_arr, arr_row)
+		# return error
+		return error
 	# payload for each applicant
-	def get_payload_df(self, json_str_request):
+	def get_payload_df(self, json_str_request, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
 		# get the payload for each applicant
 		time_start = time.perf_counter()
 		list_unique_id = []
@@ -161,326 +1540,444 @@ class ParsePayload:
 			payload = applicant['sources']
 			list_payload.append(payload)
 		# save output to self
-		self.list_unique_id = list_unique_id
-		self.list_payload = list_payload
+		ctx.list_unique_id = list_unique_id
+		ctx.list_payload = list_payload
 		# time to get payloads
 		flt_sec_get_payloads = time.perf_counter()-time_start
-		self.flt_sec_get_payloads = flt_sec_get_payloads
-		print(f'Time to get payloads: {flt_sec_get_payloads:0.5} sec.')
+		ctx.flt_sec_get_payloads = flt_sec_get_payloads
+		GET_INSTRUMENTATION().record(str_name='get_payload_df', flt_sec=flt_sec_get_payloads)
 		# return object
 		return self
+	# define helper for reading a csv table with the schema
+	def read_csv_schema(self, str_values, str_source):
+		# put into df
+		df = pd.read_csv(StringIO(str_values), delimiter=',', usecols=lambda col: self.schema.lookup(str_source, col) is not None)
+		# get (col name, position) for each col
+		list_tpl_col = [self.schema.lookup(str_source, col) for col in df.columns]
+		# return
+		return df, list_tpl_col
 	# define parse_application
-	def parse_application(self, str_values):
+	def parse_application(self, str_values, arr_row=None, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
 		# create error
-		self.error_app = ''
+		ctx.error_app = ''
+		# allocate row if not given one
+		if arr_row is None:
+			arr_row = self.schema.create_block(1)[0]
 		# put into df
-		df_app = pd.read_csv(StringIO(str_values), delimiter=',', usecols=lambda col: col.lower() in self.list_feats_raw_app)
-		# convert to lower
-		df_app.columns = df_app.columns.str.lower()
-		# append __app to each column name except ApplicationDate
-		df_app.columns = [f'{col}__app' for col in df_app.columns]
+		df_app, list_tpl_col = self.read_csv_schema(str_values=str_values, str_source='app')
 		# if df_app is all na append an error
 		if df_app.isnull().all().all():
-			self.error_app = 'No application data'
-		# reset index
-		df_app.reset_index(drop=True, inplace=True)
-		# save df_app to self
-		self.df_app = df_app
+			ctx.error_app = 'No application data'
+		# logic
+		if not df_app.empty:
+			# write bottom row into its slots
+			arr_row[[int_pos for col_name, int_pos in list_tpl_col]] = df_app.values[-1]
+		# save to object
+		ctx.arr_app = arr_row
 		# return object
 		return self
 	# define parse_income
-	def parse_income(self, str_values):
+	def parse_income(self, str_values, arr_row=None, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
 		# create error
-		self.error_inc = ''
+		ctx.error_inc = ''
+		# allocate row if not given one
+		if arr_row is None:
+			arr_row = self.schema.create_block(1)[0]
 		# put into df
-		df_inc = pd.read_csv(StringIO(str_values), delimiter=',', usecols=lambda col: col.lower() in self.list_feats_raw_inc)
-		# convert to lower
-		df_inc.columns = df_inc.columns.str.lower()
+		df_inc, list_tpl_col = self.read_csv_schema(str_values=str_values, str_source='inc')
 		# check if df is empty
 		if df_inc.empty:
 			# create error
-			self.error_inc = 'No income data'
-			# create empty df with list_feats_inc_agg as cols
-			df_inc = pd.DataFrame(columns=self.list_feats_agg_inc)
-			# create row with nan
-			df_inc = df_inc.append(pd.Series(), ignore_index=True)
+			ctx.error_inc = 'No income data'
 		else:
-			# filter rows
-			df_inc = df_inc[(df_inc['bitinvalid']==False) & (df_inc['bituse']==True)]
-			# if df_inc is empty after filtering on bit cols
-			if df_inc.empty:
+			# rename columns (__income)
+			df_inc.columns = [col_name for col_name, int_pos in list_tpl_col]
+			# rows that pass the bit filter
+			arr_bool_keep = (df_inc['bitinvalid__income'].values==False) & (df_inc['bituse__income'].values==True)
+			# if no rows are left after filtering on bit cols
+			if not arr_bool_keep.any():
 				# create error
-				self.error_inc = 'No income data due to bit filter'
-				# create empty df with list_feats_inc_agg as cols
-				df_inc = pd.DataFrame(columns=self.list_feats_agg_inc)
-				# create row with nan
-				df_inc = df_inc.append(pd.Series(), ignore_index=True)
+				ctx.error_inc = 'No income data due to bit filter'
 			else:
-				# append __income to each column name
-				df_inc.columns = [f'{col}__income' for col in df_inc.columns]
-				# aggregate
-				df_inc = df_inc.groupby('uniqueid__income', as_index=False).agg(self.dict_income_agg)
-				# rename columns
-				df_inc.columns = [f'{tpl_col[0]}_{tpl_col[1]}' for tpl_col in list(df_inc.columns)]
-		# make sure bottom row is selected
-		df_inc = pd.DataFrame(df_inc.iloc[-1, :]).T
-		# reset index
-		df_inc.reset_index(drop=True, inplace=True)
+				# aggregate with the compiled plan if every col is numeric
+				plan = self.schema.dict_plan['inc']
+				dict_arr = plan.get_arrays(df=df_inc) if plan.bool_numpy else None
+				if dict_arr is not None:
+					arr_agg = plan.aggregate(arr_uniqueid=df_inc['uniqueid__income'].values, dict_arr=dict_arr, arr_idx=np.flatnonzero(arr_bool_keep))
+				else:
+					arr_agg = df_inc[arr_bool_keep].groupby('uniqueid__income').agg(self.dict_income_agg).values[-1]
+				# write bottom row into its slots
+				if arr_agg is not None:
+					arr_row[plan.arr_pos] = arr_agg
 		# save to object
-		self.df_inc = df_inc
+		ctx.arr_inc = arr_row
 		# return object
 		return self	
 	# define parse_debt
-	def parse_debt(self, str_values):
+	def parse_debt(self, str_values, arr_row=None, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
 		# create error
-		self.error_debt = ''
+		ctx.error_debt = ''
+		# allocate row if not given one
+		if arr_row is None:
+			arr_row = self.schema.create_block(1)[0]
 		# put into df
-		df_debt = pd.read_csv(StringIO(str_values), delimiter=',', usecols=lambda col: col.lower() in self.list_feats_raw_debt)
-		# convert to lower
-		df_debt.columns = df_debt.columns.str.lower()
+		df_debt, list_tpl_col = self.read_csv_schema(str_values=str_values, str_source='debt')
 		# check if df is empty
 		if df_debt.empty:
 			# create error
-			self.error_debt = 'No debt data'
-			# create empty df with list_feats_debt_agg as cols
-			df_debt = pd.DataFrame(columns=self.list_feats_agg_debt)
-			# create row with nan
-			df_debt = df_debt.append(pd.Series(), ignore_index=True)
+			ctx.error_debt = 'No debt data'
 		else:
-			# filter rows
-			df_debt = df_debt[(df_debt['bitinvalid']==False) & (df_debt['bituse']==True)]
-			# if df_debt is empty after filtering on bit cols
-			if df_debt.empty:
-				# create errors
-				self.error_debt = 'No debt data due to bit filter'
-				# create empty df with list_feats_debt_agg as cols
-				df_debt = pd.DataFrame(columns=self.list_feats_agg_debt)
-				# create row with nan
-				df_debt = df_debt.append(pd.Series(), ignore_index=True)
+			# rename columns (__debt)
+			df_debt.columns = [col_name for col_name, int_pos in list_tpl_col]
+			# rows that pass the bit filter
+			arr_bool_keep = (df_debt['bitinvalid__debt'].values==False) & (df_debt['bituse__debt'].values==True)
+			# if no rows are left after filtering on bit cols
+			if not arr_bool_keep.any():
+				# create error
+				ctx.error_debt = 'No debt data due to bit filter'
 			else:
-				# append __debt to each column name
-				df_debt.columns = [f'{col}__debt' for col in df_debt.columns]
-				# aggregate
-				df_debt = df_debt.groupby('uniqueid__debt', as_index=False).agg(self.dict_debt_agg)
-				# rename columns
-				df_debt.columns = [f'{tpl_col[0]}_{tpl_col[1]}' for tpl_col in list(df_debt.columns)]
-		# make sure bottom row is selected
-		df_debt = pd.DataFrame(df_debt.iloc[-1, :]).T
-		# reset index
-		df_debt.reset_index(drop=True, inplace=True)
+				# aggregate with the compiled plan if every col is numeric
+				plan = self.schema.dict_plan['debt']
+				dict_arr = plan.get_arrays(df=df_debt) if plan.bool_numpy else None
+				if dict_arr is not None:
+					arr_agg = plan.aggregate(arr_uniqueid=df_debt['uniqueid__debt'].values, dict_arr=dict_arr, arr_idx=np.flatnonzero(arr_bool_keep))
+				else:
+					arr_agg = df_debt[arr_bool_keep].groupby('uniqueid__debt').agg(self.dict_debt_agg).values[-1]
+				# write bottom row into its slots
+				if arr_agg is not None:
+					arr_row[plan.arr_pos] = arr_agg
 		# save to object
-		self.df_debt = df_debt
+		ctx.arr_debt = arr_row
 		# return object
 		return self
 	# define parse_ln
-	def parse_ln(self, str_values):
+	def parse_ln(self, str_values, arr_row=None, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
 		# create error
-		self.error_ln = ''
+		ctx.error_ln = ''
+		# allocate row if not given one
+		if arr_row is None:
+			arr_row = self.schema.create_block(1)[0]
 		# put into df
-		df_ln = pd.read_csv(StringIO(str_values), delimiter=',', usecols=lambda col: col.lower() in self.list_feats_raw_ln)
-		# convert to lower
-		df_ln.columns = df_ln.columns.str.lower()
-		# append __ln to each column name
-		df_ln.columns = [f'{col}__ln' for col in df_ln.columns]
+		df_ln, list_tpl_col = self.read_csv_schema(str_values=str_values, str_source='ln')
 		# check if df is empty
 		if df_ln.empty:
 			# create error
-			self.error_ln = 'No Lexis Nexis data'
-			# create row with nan
-			df_ln = df_ln.append(pd.Series(), ignore_index=True)
-		# make sure bottom row is selected
-		df_ln = pd.DataFrame(df_ln.iloc[-1, :]).T
-		# reset index
-		df_ln.reset_index(drop=True, inplace=True)
+			ctx.error_ln = 'No Lexis Nexis data'
+		else:
+			# write bottom row into its slots
+			arr_row[[int_pos for col_name, int_pos in list_tpl_col]] = df_ln.values[-1]
 		# save to object
-		self.df_ln = df_ln
+		ctx.arr_ln = arr_row
 		# return object
 		return self
 	# define parse_tuxml
-	def parse_tuxml(self, str_values):
+	def parse_tuxml(self, str_values, arr_row=None, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
 		# create error
-		self.error_tuxml = ''
-		# define helper function for parsing XML
-		def parse_xml(root, list_feats_raw_tuaccept, list_feats_raw_cvlink):
-			# save child table vals so we don't have to write it a bunch
-			str_child_table_vals = '{http://www.transunion.com/namespace}value'
-			# get col names and values
-			list_col_name = []
-			list_col_value = []
-			# iterate through child branches
-			for child in root.iter(tag='{http://www.transunion.com/namespace}characteristic'): # child table
-				# get col name
-				col_name = child.find('{http://www.transunion.com/namespace}id').text # child table cols
-				# if col in cv link
-				if col_name.lower() in list_feats_raw_cvlink:
-					# append __cvlink
-					col_name = f'{col_name.lower()}__tucvlink'
-					bool_in_payload = True
-				# if col in tuaccept
-				elif col_name.lower() in list_feats_raw_tuaccept:
-					# append __tuaccept
-					col_name = f'{col_name.lower()}__tuaccept'
-					bool_in_payload = True
-				# if not in either
-				else:
-					bool_in_payload = False
+		ctx.error_tuxml = ''
+		# allocate row if not given one
+		if arr_row is None:
+			arr_row = self.schema.create_block(1)[0]
+		# save tags so we don't have to write them a bunch
+		str_tag_characteristic = '{http://www.transunion.com/namespace}characteristic'
+		str_tag_id = '{http://www.transunion.com/namespace}id'
+		str_tag_value = '{http://www.transunion.com/namespace}value'
+		# get numeric flags
+		arr_bool_numeric = self.schema.arr_bool_numeric
+		# n characteristics found
+		int_n_found = 0
+		# stream through the characteristic nodes
+		for event, child in ET.iterparse(BytesIO(str_values.encode('utf-8')), events=('end',)):
+			# logic
+			if child.tag != str_tag_characteristic:
+				continue
+			# get col name
+			elem_id = child.find(str_tag_id)
+			# look it up
+			tpl_col = self.schema.lookup('tu', elem_id.text) if (elem_id is not None) and (elem_id.text is not None) else None
+			# logic
+			if tpl_col is not None:
+				# unpack
+				col_name, int_pos = tpl_col
+				# count
+				int_n_found += 1
+				# get col value
+				elem_value = child.find(str_tag_value)
+				str_value = elem_value.text if elem_value is not None else None
 				# logic
-				if bool_in_payload:
-					# append col_name
-					list_col_name.append(col_name)
-					# try getting the value
-					try:
-						# get col value
-						col_value = child.find(str_child_table_vals).text # child table vals
-					# if its None
-					except AttributeError:
-						# set col value to np.nan
-						col_value = np.nan
-					# append col_value to list_col_value
-					list_col_value.append(col_value)
-			# define helper for helper function for converting to proper data type
-			def convert_proper_dtype(str_value):
-				# try converting to integer
-				try:
-					col_val = int(str_value)
-				# if it cannot be converted to integer
-				except:
+				if str_value is None:
+					# nan
+					arr_row[int_pos] = np.nan
+				elif arr_bool_numeric[int_pos]:
 					# try converting to float
 					try:
-						col_val = float(str_value)
-					# if it cannot be converted to float
-					except:
-						col_val = str_value
-				# return
-				return col_val
-			# convert each string value in list_col_value to appropriate value
-			list_col_value = list(pd.Series(list_col_value).apply(lambda x: convert_proper_dtype(str_value=x)))
-			# zip into dictionary
-			dict_ = dict(zip(list_col_name, list_col_value))
-			# put into df
-			return pd.DataFrame(dict_, index=[0])
-		# read data from string
-		root = ET.fromstring(str_values)
-		# parse xml
-		df_tuxml = parse_xml(root=root, 
-							 list_feats_raw_tuaccept=self.list_feats_raw_tuaccept,
-							 list_feats_raw_cvlink=self.list_feats_raw_cvlink)
-		# if df_tuxml is empty
-		if df_tuxml.empty:
+						arr_row[int_pos] = float(str_value)
+					# if it cannot be converted keep the string
+					except ValueError:
+						arr_row[int_pos] = str_value
+				else:
+					# keep the string
+					arr_row[int_pos] = str_value
+			# free the node
+			child.clear()
+		# logic
+		if int_n_found == 0:
 			# create error
-			self.error_tu = 'No TU data'
-			# create a row with nan
-			df_tuxml = df_tuxml.append(pd.Series(), ignore_index=True)
-		# make sure bottom row is selected
-		df_tuxml = pd.DataFrame(df_tuxml.iloc[-1, :]).T
-		# reset index
-		df_tuxml.reset_index(drop=True, inplace=True)
+			ctx.error_tuxml = 'No TU data'
 		# save to object
-		self.df_tuxml = df_tuxml
+		ctx.arr_tuxml = arr_row
 		# return object
 		return self
 	# define parse all
-	def parse_all(self, json_str_request):
+	def parse_all(self, json_str_request, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
 		# get payload df
-		self.get_payload_df(json_str_request=json_str_request)
-		# empty lists of lists
+		self.get_payload_df(json_str_request=json_str_request, ctx=ctx)
+		# allocate one row per applicant
 		time_start = time.perf_counter()
+		arr_x = self.schema.create_block(len(ctx.list_payload))
+		# empty list of lists
 		list_list_errors = []
-		list_list_df = []
 		# iterate through payloads
-		for payload in self.list_payload:
-			# empty lists
+		for arr_row, payload in zip(arr_x, ctx.list_payload):
+			# empty list
 			list_errors = []
-			list_df = []
 			# iterate through the tables
 			for dict_data in payload:
 				# get values
 				str_values = dict_data['values']
-				# application
-				if dict_data['name'] == 'Application':
-					self.parse_application(str_values=str_values)
-					# append
-					list_errors.append(self.error_app)
-					list_df.append(self.df_app)
-				# income
-				if dict_data['name'] == 'Incomes':
-					# parse income
-					self.parse_income(str_values=str_values)
-					# append 
-					list_errors.append(self.error_inc)
-					list_df.append(self.df_inc)
-				# debt
-				if (dict_data['name'] == 'Debts') and (self.bool_debt):
-					# parse debt
-					self.parse_debt(str_values=str_values)
-					# append 
-					list_errors.append(self.error_debt)
-					list_df.append(self.df_debt)
-				# ln
-				if dict_data['name'] == 'Lexis Nexis Risk View 5':
-					# parse ln
-					self.parse_ln(str_values=str_values)
-					# append
-					list_errors.append(self.error_ln)
-					list_df.append(self.df_ln)
-				# tu
-				if dict_data['name'] == 'TUXML':
-					# parse xml
-					self.parse_tuxml(str_values=str_values)
-					# append
-					list_errors.append(self.error_tuxml)
-					list_df.append(self.df_tuxml)
+				# skip tables we do not parse
+				if (dict_data['name'] not in ['Application', 'Incomes', 'Debts', 'Lexis Nexis Risk View 5', 'TUXML']) or ((dict_data['name'] == 'Debts') and (not self.bool_debt)):
+					continue
+				# parse and append error
+				list_errors.append(self.parse_source(str_name=dict_data['name'], str_values=str_values, arr_row=arr_row, ctx=ctx))
 			# append list_errors to list_list_errors
 			list_list_errors.append(list_errors)
-			# append list_df to list_list_df
-			list_list_df.append(list_df)
-		# save lists to object
-		self.list_list_errors = list_list_errors
-		self.list_list_df = list_list_df
+		# save to object
+		ctx.list_list_errors = list_list_errors
+		ctx.arr_x = arr_x
 		# time
 		flt_sec_parse = time.perf_counter()-time_start
-		self.flt_sec_parse = flt_sec_parse
-		print(f'Time to parse data: {flt_sec_parse:0.5} sec.')
+		ctx.flt_sec_parse = flt_sec_parse
+		GET_INSTRUMENTATION().record(str_name='parse_all', flt_sec=flt_sec_parse)
+		# return object
+		return self
+	# define helper for reading every table of one source in a single read_csv
+	def read_csv_batch(self, list_tpl_idx_values, str_source):
+		# split each table into header and body
+		list_list_lines = [str_values.splitlines() for int_idx, str_values in list_tpl_idx_values]
+		# get the headers
+		list_headers = [list_lines[0] if list_lines else '' for list_lines in list_list_lines]
+		# we can only stitch tables together if headers match and no quoted fields could span lines
+		bool_stitch = (len(set(list_headers)) == 1) and all('"' not in str_values for int_idx, str_values in list_tpl_idx_values)
+		# logic
+		if bool_stitch and list_headers[0]:
+			# prefix each row with the applicant index
+			list_lines_stitched = [f'__applicant,{list_headers[0]}']
+			for (int_idx, str_values), list_lines in zip(list_tpl_idx_values, list_list_lines):
+				list_lines_stitched.extend([f'{int_idx},{str_line}' for str_line in list_lines[1:] if str_line != ''])
+			# put into df
+			df = pd.read_csv(StringIO('\n'.join(list_lines_stitched)), delimiter=',', usecols=lambda col: (col == '__applicant') or (self.schema.lookup(str_source, col) is not None))
+		else:
+			# read each table separately and tag it
+			list_df = []
+			for int_idx, str_values in list_tpl_idx_values:
+				# put into df
+				df_tmp = pd.read_csv(StringIO(str_values), delimiter=',', usecols=lambda col: self.schema.lookup(str_source, col) is not None) if str_values.strip() else pd.DataFrame()
+				# tag
+				df_tmp['__applicant'] = int_idx
+				# append
+				list_df.append(df_tmp)
+			# one concat for the whole source
+			df = pd.concat(list_df, axis=0, sort=False, ignore_index=True)
+		# get (col name, position) for each col
+		list_tpl_col = [self.schema.lookup(str_source, col) for col in df.columns if col != '__applicant']
+		# move __applicant to the index
+		df = df.set_index('__applicant')
+		# rename columns
+		df.columns = [col_name for col_name, int_pos in list_tpl_col]
+		# return
+		return df, list_tpl_col
+	# define helper for aggregating a batch of income or debt tables
+	def aggregate_batch(self, df, str_source, str_suffix, dict_agg, str_error):
+		# empty dicts for errors
+		dict_errors = {}
+		# applicants with any rows
+		set_idx_any = set(df.index)
+		# logic
+		if df.empty:
+			return [], np.zeros((0, len(self.schema.dict_list_agg_pos[str_source]))), set_idx_any, dict_errors
+		# rows that pass the bit filter
+		arr_bool_keep = (df[f'bitinvalid__{str_suffix}'].values==False) & (df[f'bituse__{str_suffix}'].values==True)
+		# applicant of each row
+		arr_applicant = df.index.values
+		# errors for applicants with no rows after the bit filter
+		for int_idx in set_idx_any - set(arr_applicant[arr_bool_keep]):
+			dict_errors[int_idx] = f'{str_error} due to bit filter'
+		# aggregate with the compiled plan if every col is numeric
+		plan = self.schema.dict_plan[str_source]
+		dict_arr = plan.get_arrays(df=df) if plan.bool_numpy else None
+		if dict_arr is not None:
+			# rows of each applicant (after the bit filter)
+			arr_idx_keep = np.flatnonzero(arr_bool_keep)
+			arr_idx_applicant, arr_inverse = np.unique(arr_applicant[arr_idx_keep], return_inverse=True)
+			arr_uniqueid = df[f'uniqueid__{str_suffix}'].values
+			list_idx, list_arr_agg = [], []
+			for int_group, int_idx in enumerate(arr_idx_applicant):
+				arr_agg = plan.aggregate(arr_uniqueid=arr_uniqueid, dict_arr=dict_arr, arr_idx=arr_idx_keep[arr_inverse==int_group])
+				# logic
+				if arr_agg is not None:
+					list_idx.append(int_idx)
+					list_arr_agg.append(arr_agg)
+			# return
+			return list_idx, np.array(list_arr_agg).reshape(-1, len(plan.arr_pos)), set_idx_any, dict_errors
+		# filter rows
+		df = df[arr_bool_keep]
+		# logic
+		if not df.empty:
+			# aggregate (tagged by applicant)
+			df = df.groupby(['__applicant', f'uniqueid__{str_suffix}']).agg(dict_agg)
+			# make sure bottom row is selected for each applicant
+			df = df[~df.index.get_level_values(0).duplicated(keep='last')]
+		# return
+		return df.index.get_level_values(0).values if not df.empty else [], df.values, set_idx_any, dict_errors
+	# define parse all (batch mode)
+	def parse_all_batch(self, json_str_request, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
+		# get payload df
+		self.get_payload_df(json_str_request=json_str_request, ctx=ctx)
+		# gather all tables of the same source across applicants
+		time_start = time.perf_counter()
+		arr_x = self.schema.create_block(len(ctx.list_payload))
+		dict_list_tpl_idx_values = {'Application': [], 'Incomes': [], 'Debts': [], 'Lexis Nexis Risk View 5': [], 'TUXML': []}
+		list_list_names = []
+		for int_idx, payload in enumerate(ctx.list_payload):
+			# keep the order of the tables for the errors
+			list_names = []
+			for dict_data in payload:
+				# skip debts if not in use and anything we do not parse
+				if (dict_data['name'] not in dict_list_tpl_idx_values) or ((dict_data['name'] == 'Debts') and (not self.bool_debt)):
+					continue
+				# append
+				dict_list_tpl_idx_values[dict_data['name']].append((int_idx, dict_data['values']))
+				list_names.append(dict_data['name'])
+			# append
+			list_list_names.append(list_names)
+		# empty dict for errors by (applicant, table)
+		dict_errors = {}
+		# application and ln (bottom row for each applicant goes straight into its slots)
+		for str_name, str_source, str_error in [('Application', 'app', 'No application data'), ('Lexis Nexis Risk View 5', 'ln', 'No Lexis Nexis data')]:
+			# logic
+			if not dict_list_tpl_idx_values[str_name]:
+				continue
+			# read
+			df, list_tpl_col = self.read_csv_batch(list_tpl_idx_values=dict_list_tpl_idx_values[str_name], str_source=str_source)
+			# make sure bottom row is selected for each applicant
+			df = df[~df.index.duplicated(keep='last')]
+			# write into slots
+			arr_x.set(arr_rows=df.index.values.astype(int), list_pos=[int_pos for col_name, int_pos in list_tpl_col], arr_values=df.values)
+			# applicants with data (application needs at least one non-null)
+			set_idx_data = set(df.index[df.notnull().any(axis=1)]) if str_source == 'app' else set(df.index)
+			# errors
+			for int_idx, str_values in dict_list_tpl_idx_values[str_name]:
+				if int_idx not in set_idx_data:
+					dict_errors[(int_idx, str_name)] = str_error
+		# income and debt
+		for str_name, str_source, str_suffix, dict_agg, str_error in [('Incomes', 'inc', 'income', self.dict_income_agg, 'No income data'),
+																	  ('Debts', 'debt', 'debt', self.dict_debt_agg, 'No debt data')]:
+			# logic
+			if not dict_list_tpl_idx_values[str_name]:
+				continue
+			# read
+			df, list_tpl_col = self.read_csv_batch(list_tpl_idx_values=dict_list_tpl_idx_values[str_name], str_source=str_source)
+			# aggregate
+			arr_idx, arr_values, set_idx_any, dict_errors_agg = self.aggregate_batch(df=df,
+																					 str_source=str_source,
+																					 str_suffix=str_suffix,
+																					 dict_agg=dict_agg,
+																					 str_error=str_error)
+			# write into slots
+			if len(arr_idx) > 0:
+				arr_x.set(arr_rows=np.asarray(arr_idx, dtype=int), list_pos=self.schema.dict_list_agg_pos[str_source], arr_values=arr_values)
+			# errors
+			for int_idx, str_values in dict_list_tpl_idx_values[str_name]:
+				if int_idx not in set_idx_any:
+					dict_errors[(int_idx, str_name)] = str_error
+				elif int_idx in dict_errors_agg:
+					dict_errors[(int_idx, str_name)] = dict_errors_agg[int_idx]
+		# tu (xml cannot be stitched so parse each straight into its row)
+		for int_idx, str_values in dict_list_tpl_idx_values['TUXML']:
+			# parse xml
+			self.parse_tuxml(str_values=str_values, arr_row=arr_x[int_idx], ctx=ctx)
+			# errors
+			dict_errors[(int_idx, 'TUXML')] = ctx.error_tuxml
+		# errors for each applicant in the order of the tables
+		list_list_errors = [[dict_errors.get((int_idx, str_name), '') for str_name in list_names] for int_idx, list_names in enumerate(list_list_names)]
+		# save to object
+		ctx.list_list_errors = list_list_errors
+		ctx.arr_x = arr_x
+		# time
+		flt_sec_parse = time.perf_counter()-time_start
+		ctx.flt_sec_parse = flt_sec_parse
+		GET_INSTRUMENTATION().record(str_name='parse_all_batch', flt_sec=flt_sec_parse)
 		# return object
 		return self
 	# define create_x
-	def create_x(self, json_str_request):
-		# parse all
-		self.parse_all(json_str_request=json_str_request)
-		# concatenate columns of each df in each list (horizontally i.e., axis=1)
+	def create_x(self, json_str_request, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
+		# logic
+		if self.bool_batch_parse:
+			# parse all (batch)
+			self.parse_all_batch(json_str_request=json_str_request, ctx=ctx)
+		else:
+			# parse all
+			self.parse_all(json_str_request=json_str_request, ctx=ctx)
+		# count tables by source and errors by type
+		instrumentation = GET_INSTRUMENTATION()
+		if instrumentation.bool_enabled:
+			instrumentation.count(str_name='requests')
+			instrumentation.count(str_name='applicants', int_n=len(ctx.list_payload))
+			for payload in ctx.list_payload:
+				for dict_data in payload:
+					instrumentation.count(str_name=f"source.{dict_data['name']}")
+			for err in chain(*ctx.list_list_errors):
+				if err != '':
+					instrumentation.count(str_name=f'error.{err}')
+		# put the block into a df (every feature already has a field)
 		time_start = time.perf_counter()
-		list_df_concat = []
-		for list_dfs in self.list_list_df:
-			# concatenate columns (i.e., column bind)
-			df_concat = pd.concat(list_dfs, axis=1, sort=False) # WORKING PROPERLY		
-			# append to list
-			list_df_concat.append(df_concat)
-		# concatenate rows (vertically)
-		X = pd.concat(list_df_concat, axis=0, sort=False)
-		# ensure there is a field for every feature
-		X = pd.concat([self.df_empty, X], axis=0, sort=False) # WORKING PROPERLY
-		# get list of feats missing
-		ser_na = X.isnull().sum()
-		# get those missing
-		ser_na = ser_na[ser_na>0]
-		# zip into dictionary
-		dict_n_miss = dict(zip(ser_na.index, ser_na.values))
+		X = self.schema.to_frame(block=ctx.arr_x)
+		# missing counts straight from the typed blocks
+		dict_n_miss = ctx.arr_x.count_missing()
 		# save to object
-		self.X = X
-		self.dict_n_miss = dict_n_miss
+		ctx.X = X
+		ctx.dict_n_miss = dict_n_miss
 		# time
 		flt_sec_create_x = time.perf_counter()-time_start
-		self.flt_sec_create_x = flt_sec_create_x
-		print(f'Time to create X: {flt_sec_create_x:0.5} sec.')
+		ctx.flt_sec_create_x = flt_sec_create_x
+		GET_INSTRUMENTATION().record(str_name='create_x', flt_sec=flt_sec_create_x)
 		# return object
 		return self
 	# define shared preprocessing
-	def shared_preprocessing(self, json_str_request):
+	def shared_preprocessing(self, json_str_request, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
 		# create X
-		self.create_x(json_str_request=json_str_request)
+		self.create_x(json_str_request=json_str_request, ctx=ctx)
 		time_start = time.perf_counter()
 		# transform
-		X = self.pipeline_shared.transform(X=self.X)
+		X = self.pipeline_shared.transform(X=ctx.X)
 		# lowercase cols names
 		X.columns = [col.lower() for col in X.columns]
 
@@ -488,206 +1985,394 @@ class ParsePayload:
 		X[self.list_string_cols] = X[self.list_string_cols].astype(str)
 
 		# save to object
-		self.X = X
+		ctx.X = X
 		# time
 		flt_sec_preprocessing = time.perf_counter()-time_start
-		self.flt_sec_preprocessing = flt_sec_preprocessing
-		print(f'Time to complete shared preprocessing: {flt_sec_preprocessing:0.5} sec.')
+		ctx.flt_sec_preprocessing = flt_sec_preprocessing
+		GET_INSTRUMENTATION().record(str_name='shared_preprocessing', flt_sec=flt_sec_preprocessing)
 		# return object
 		return self
-	# define counter_offers
-	def counter_offers(self, json_str_request, int_n_samples=100):
-		# shared preprocessing
-		self.shared_preprocessing(json_str_request=json_str_request)
+	# define counter_offers for several preprocessed requests at once (mode is full, coarse, or none)
+	def counter_offers_batch(self, list_ctx, int_n_samples=100, str_mode='full'):
 		time_start = time.perf_counter()
-		# create large df
-		X_lg = self.X.iloc[np.tile(np.arange(len(self.X)), int_n_samples)] # int_n_samples rows
-		# make arry for keeping samples straight
-		list_sample = list(np.repeat(list(range(1, (int_n_samples+1))), self.X.shape[0])) # start at 1 because we assign original to 0 below
-		# set as sample
-		X_lg['sample'] = list_sample
-
-		# make array of loan to value
-		list_ltv = list(np.linspace(0.5, 1.6, int_n_samples))
-		# get n debtors
-		int_n_debtors = self.X.shape[0]
-		# duplicate each value
-		list_ltv = np.repeat(list_ltv, int_n_debtors)
-		# put into X
-		X_lg['eng_loan_to_value'] = list_ltv
-
-		# get amt financed (original)
-		flt_amt_financed = X_lg['fltamountfinanced__app'].iloc[0]
-		# get down total (original)
-		flt_down_total = X_lg['fltapproveddowntotal__app'].iloc[0]
-
-		# calculate amount financed
-		X_lg['fltamountfinanced__app'] = X_lg['eng_loan_to_value'] * X_lg['fltapprovedpricewholesale__app']
-
-		# calculate down pmt
-		X_lg['fltapproveddowntotal__app'] = flt_amt_financed - X_lg['fltamountfinanced__app'] + flt_down_total
-
-		# filter X_lg where fltapproveddowntotal__app > flt_down_total
-		X_lg = X_lg[X_lg['fltapproveddowntotal__app'] > flt_down_total]
-
-		# get list_transformers
-		list_transformers = self.pipeline_shared.list_transformers
-
-		# get binner
-		cls_binner = list_transformers[5]
-		# bin
-		X_lg = cls_binner.transform(X_lg)
-
-		# get val replacer
-		cls_val_replacer = list_transformers[6]
-		# replace in case things are binned to 0
-		X_lg = cls_val_replacer.transform(X_lg)
-
-		# get feature engineering class
-		cls_feat_eng = list_transformers[7]
-		# FE
-		X_lg = cls_feat_eng.transform(X_lg)
-
-		# subset to LTV bounds
-		X_lg = X_lg[(X_lg['eng_loan_to_value']>0) & (X_lg['eng_loan_to_value']<=1.6)]
-
-		# concatenate original X
-		X_lg = pd.concat([self.X, X_lg])
-		# fill na (sample)
-		X_lg['sample'].fillna(0, inplace=True)
-
-		# get pd model
-		model_pd = self.pipeline_pd.model
-		# predict
-		X_lg['y_hat_pd'] = list(model_pd.predict_proba(X_lg[model_pd.feature_names_])[:,1])
-
-		# get lgd model
-		model_lgd = self.pipeline_lgd.model
-		# predictions pd and clip to make sure no values <0 or >1
-		X_lg['y_hat_lgd'] = list(np.clip(a=np.array(model_lgd.predict(X_lg[model_lgd.feature_names_])),
-										 a_min=0,
-										 a_max=1))
-		# get original y_hat_pd (for all debtors)
-		self.y_hat_pd = list(X_lg[X_lg['sample']==0]['y_hat_pd'])
-		# get original y_hat_lgd (for all debtors)
-		self.y_hat_lgd = list(X_lg[X_lg['sample']==0]['y_hat_lgd'])
-
-		# group by sample so we cn get mean by account
-		X_lg_grouped = X_lg[['fltapproveddowntotal__app',
-							 'fltamountfinanced__app',
-							 'fltapprovedpricewholesale__app',
-							 'y_hat_pd',
-							 'y_hat_lgd',
-							 'sample']].groupby('sample', as_index=False).mean()
-
-		# calculate ecnl
-		X_lg_grouped['ecnl'] = X_lg_grouped['y_hat_pd'] * X_lg_grouped['y_hat_lgd']
-		# calculate modified ecnl
-		X_lg_grouped['ecnl_mod'] = (1.95553 * X_lg_grouped['ecnl']) - 0.03281
-
-		# get ecnl
-		self.y_hat_pd_x_lgd = list(X_lg_grouped[X_lg_grouped['sample']==0]['ecnl'])[0]
-		# get modified cnl
-		self.y_hat_pd_x_lgd_mod = list(X_lg_grouped[X_lg_grouped['sample']==0]['ecnl_mod'])[0]
-
-		# save to object at this point for testing
-		self.X_lg_grouped_pre_sub = X_lg_grouped.copy()
-
-		# subset ecnl to < original
-		X_lg_grouped = X_lg_grouped[(X_lg_grouped['ecnl'] < self.y_hat_pd_x_lgd) & (X_lg_grouped['fltapproveddowntotal__app'] >= flt_down_total)]
-
-		# sort by ecnl
-		X_lg_grouped.sort_values(by='ecnl_mod', ascending=True, inplace=True)
-
-		# save to object
-		self.X_lg_grouped = X_lg_grouped
+		# generate counter-offers
+		if str_mode == 'none':
+			# original predictions only
+			list_dict_counter = self.counter_offer_engine.original_batch(list_X=[ctx.X for ctx in list_ctx])
+		elif str_mode == 'coarse':
+			# small fixed grid
+			list_dict_counter = self.counter_offer_engine.generate_batch(list_X=[ctx.X for ctx in list_ctx], int_n_samples=self.int_n_samples_degraded)
+		elif self.bool_counter_search:
+			# coarse grid refined where ecnl crosses the original
+			list_dict_counter = self.counter_offer_engine.search_batch(list_X=[ctx.X for ctx in list_ctx])
+		else:
+			# fixed grid
+			list_dict_counter = self.counter_offer_engine.generate_batch(list_X=[ctx.X for ctx in list_ctx], int_n_samples=int_n_samples)
 		# time
 		flt_sec_counter = time.perf_counter()-time_start
-		self.flt_sec_counter = flt_sec_counter
-		print(f'Time to generate counter-offers: {flt_sec_counter:0.5} sec.')
+		# split back into each request
+		for ctx, dict_counter in zip(list_ctx, list_dict_counter):
+			# get original predictions (for all debtors)
+			ctx.y_hat_pd = dict_counter['y_hat_pd']
+			ctx.y_hat_lgd = dict_counter['y_hat_lgd']
+			# get ecnl and modified ecnl
+			ctx.y_hat_pd_x_lgd = dict_counter['y_hat_pd_x_lgd']
+			ctx.y_hat_pd_x_lgd_mod = dict_counter['y_hat_pd_x_lgd_mod']
+			# save to object at this point for testing
+			ctx.X_lg_grouped_pre_sub = dict_counter['df_grouped']
+			ctx.X_lg_grouped = dict_counter['df_grouped_sub']
+			# time (shared by the batch)
+			ctx.flt_sec_counter = flt_sec_counter
+		GET_INSTRUMENTATION().record(str_name='counter_offers', flt_sec=flt_sec_counter)
+		self.scheduler.observe(str_stage='counter_offers', str_mode=str_mode, flt_sec=flt_sec_counter/len(list_ctx))
 		# return object
 		return self
-	# define adverse_action
-	def adverse_action(self, json_str_request):
-		# generate predictions
-		self.counter_offers(json_str_request=json_str_request, int_n_samples=100)
+	# define counter_offers
+	def counter_offers(self, json_str_request, int_n_samples=100, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
+		# shared preprocessing
+		self.shared_preprocessing(json_str_request=json_str_request, ctx=ctx)
+		# generate counter-offers
+		self.counter_offers_batch(list_ctx=[ctx], int_n_samples=int_n_samples)
+		# return object
+		return self
+	# define helper for reasons from the templates of each row's pd band
+	def reasons_from_templates(self, list_ctx):
+		# iterate through requests
+		for ctx in list_ctx:
+			# band of each debtor
+			list_int_band = [min(int(flt_pd * self.int_n_reason_bands), self.int_n_reason_bands-1) for flt_pd in ctx.y_hat_pd]
+			# save to object
+			ctx.list_list_reasons = [list(self.dict_reason_template.get(int_band, self.list_reasons_template)) for int_band in list_int_band]
+		# return object
+		return self
+	# define adverse_action for several scored requests at once (mode is full or template)
+	def adverse_action_batch(self, list_ctx, str_mode='full'):
 		time_start = time.perf_counter()
+		# logic
+		if str_mode == 'template':
+			# cached reasons instead of shap
+			self.reasons_from_templates(list_ctx=list_ctx)
+			# time
+			flt_sec_adv_act = time.perf_counter()-time_start
+			for ctx in list_ctx:
+				ctx.flt_sec_adv_act = flt_sec_adv_act
+			GET_INSTRUMENTATION().record(str_name='adverse_action', flt_sec=flt_sec_adv_act)
+			self.scheduler.observe(str_stage='adverse_action', str_mode=str_mode, flt_sec=flt_sec_adv_act/len(list_ctx))
+			# return object
+			return self
 		# get list of feats in model
 		list_x_feats = self.pipeline_pd.model.feature_names_
+		# stack the rows of every request
+		list_X = [ctx.X[list_x_feats] for ctx in list_ctx]
+		X = pd.concat(list_X, axis=0, ignore_index=True) if len(list_X) > 1 else list_X[0]
 		# pool X for readability
-		X_pooled = cb.Pool(self.X[list_x_feats], cat_features=self.list_non_numeric_pd)
-		# generate shap vals
-		df_shap_vals = pd.DataFrame(self.pipeline_pd.model.get_feature_importance(data=X_pooled,
-																			      type='ShapValues',
-																			      prettified=False,
-																				  thread_count=-1,
-																			      verbose=False)).iloc[:, :-1]
-		# set col names in df_shap_vals (setting to adverse actions could be faster)
-		df_shap_vals.columns = list_x_feats
-		# get reasons
-		list_list_reasons = []
-		for a, row in df_shap_vals.iterrows():
-			# sort descending
-			row_sorted = row.sort_values(ascending=False, inplace=False)
-			# get top 5 features
-			list_reasons = list(row_sorted[:5].index)
-			# append to list_list_reasons
-			list_list_reasons.append(list_reasons)
-		# map features to reasons
-		list_list_reasons = [list(pd.Series(list_reasons).map(self.dict_aa_pd)) for list_reasons in list_list_reasons]
-		# save to object
-		self.list_list_reasons = list_list_reasons
+		X_pooled = cb.Pool(X, cat_features=self.list_non_numeric_pd)
+		# logic
+		if self.bool_fast_shap:
+			# generate shap vals for the reason feats only (single thread)
+			arr_shap_vals = self.tree_shap.shap_values(data=X_pooled)
+			# never pick feats we did not explain
+			arr_shap_vals[:, ~self.tree_shap.arr_bool_keep] = -np.inf
+		else:
+			# generate shap vals (drop the bias column)
+			arr_shap_vals = self.pipeline_pd.model.get_feature_importance(data=X_pooled,
+																		  type='ShapValues',
+																		  prettified=False,
+																		  thread_count=-1,
+																		  verbose=False)[:, :-1]
+		# get top reasons for every row at once
+		list_list_reasons = self.aa_reasons.transform(arr_shap=arr_shap_vals)
 		# time
 		flt_sec_adv_act = time.perf_counter()-time_start
-		self.flt_sec_adv_act = flt_sec_adv_act
-		print(f'Time to get adverse action: {flt_sec_adv_act:0.5} sec.')
+		# split back into each request
+		int_row_start = 0
+		for ctx, X_ctx in zip(list_ctx, list_X):
+			# save to object
+			ctx.list_list_reasons = list_list_reasons[int_row_start:int_row_start+X_ctx.shape[0]]
+			int_row_start += X_ctx.shape[0]
+			# time (shared by the batch)
+			ctx.flt_sec_adv_act = flt_sec_adv_act
+			# latest reasons of each pd band become its template
+			for flt_pd, list_reasons in zip(ctx.y_hat_pd, ctx.list_list_reasons):
+				self.dict_reason_template[min(int(flt_pd * self.int_n_reason_bands), self.int_n_reason_bands-1)] = list_reasons
+		GET_INSTRUMENTATION().record(str_name='adverse_action', flt_sec=flt_sec_adv_act)
+		self.scheduler.observe(str_stage='adverse_action', str_mode=str_mode, flt_sec=flt_sec_adv_act/len(list_ctx))
 		# return object
 		return self
-	# define generate output
-	def generate_output(self, json_str_request):
+	# define adverse_action
+	def adverse_action(self, json_str_request, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
+		# generate predictions
+		self.counter_offers(json_str_request=json_str_request, int_n_samples=100, ctx=ctx)
 		# get adverse action
-		self.adverse_action(json_str_request=json_str_request)
-		# create df
-		time_start = time.perf_counter()
-		# create df
-		df_output = pd.DataFrame({'Row_id': self.list_unique_id,
-								  'Score_pd': self.y_hat_pd,
-								  'Score_lgd': self.y_hat_lgd,
-							      'Score_ecnl': [self.y_hat_pd_x_lgd for id_ in self.list_unique_id],
-							      'Score_ecnl_mod': [self.y_hat_pd_x_lgd_mod for id_ in self.list_unique_id],
-								  'Key_factors': self.list_list_reasons,
-								  'Outlier_score': [0.0 for id_ in self.list_unique_id]})
-		# convert to json
-		str_output_ = df_output.to_json(orient='records')
-		# convert to list
-		list_output = ast.literal_eval(str_output_)
-		# combine list of errors
-		list_errors_final = list(chain(*self.list_list_errors))
-		# remove empty strings from list_errors_final
-		list_errors_final = [err for err in list_errors_final if err != '']
-		# subset to cols we want
-		X_lg_grouped_sub = self.X_lg_grouped[['fltapproveddowntotal__app',
-										 	  'fltamountfinanced__app',
-										 	  'fltapprovedpricewholesale__app',
-										 	  'ecnl_mod']]
-		# rename columns
-		X_lg_grouped_sub.columns = ['Cash Down',
-									'Amount Financed',
-									'Price Wholesale',
-									'ECNL Modified']
-		# create final output
-		output_final = {"Request_id": "",
-				        "Zaml_processing_id": "",
-						"Response": [{"Model_name":"prestige-GenXI",
-					                  "Model_version":"v2",
-									  "Results":list_output,
-									  "Errors":list_errors_final,
-									  "Counter-Offers":X_lg_grouped_sub.to_dict('records')}]}
-		# save to object
-		self.output_final = output_final
-		# time
-		flt_sec_gen_output = time.perf_counter()-time_start
-		self.flt_sec_gen_output = flt_sec_gen_output
-		print(f'Time to generate output: {flt_sec_gen_output:0.5} sec.')
+		self.adverse_action_batch(list_ctx=[ctx])
+		# return object
+		return self
+	# define adverse_action under a deadline (counter-offers and reasons fall back to cheaper modes)
+	def adverse_action_deadline(self, json_str_request, flt_deadline, int_n_samples=100, ctx=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
+		# shared preprocessing (always needed for pd, lgd, and ecnl)
+		self.shared_preprocessing(json_str_request=json_str_request, ctx=ctx)
+		# counter-offers (leave time for the cheapest reasons and the output), the coarse grid at least so there are always offers
+		# full reasons bound the template ones until those are timed
+		flt_sec_reserve = min(self.scheduler.estimate(str_stage='adverse_action', str_mode='template'), self.scheduler.estimate(str_stage='adverse_action', str_mode='full')) + self.scheduler.estimate(str_stage='generate_output', str_mode='full')
+		str_mode_counter = self.scheduler.choose(str_stage='counter_offers',
+												 list_str_modes=['full', 'coarse'],
+												 flt_sec_left=flt_deadline-time.perf_counter(),
+												 flt_sec_reserve=flt_sec_reserve)
+		self.counter_offers_batch(list_ctx=[ctx], int_n_samples=int_n_samples, str_mode=str_mode_counter)
+		# reasons (leave time for the output)
+		str_mode_reasons = self.scheduler.choose(str_stage='adverse_action',
+												 list_str_modes=['full', 'template'],
+												 flt_sec_left=flt_deadline-time.perf_counter(),
+												 flt_sec_reserve=self.scheduler.estimate(str_stage='generate_output', str_mode='full'))
+		self.adverse_action_batch(list_ctx=[ctx], str_mode=str_mode_reasons)
+		# record degraded stages
+		ctx.list_degraded = [f'{str_stage}:{str_mode}' for str_stage, str_mode in [('counter_offers', str_mode_counter), ('adverse_action', str_mode_reasons)] if str_mode != 'full']
+		for str_degraded in ctx.list_degraded:
+			GET_INSTRUMENTATION().count(str_name=f"degraded.{str_degraded.replace(':', '.')}")
+		# return object
+		return self
+	# define build output for scored and explained requests
+	def build_output(self, list_ctx, bool_bytes=False):
+		# iterate through requests
+		for ctx in list_ctx:
+			# build output straight from the scores, reasons, and counter-offers
+			time_start = time.perf_counter()
+			output_final = self.response_builder.build(list_unique_id=ctx.list_unique_id,
+													   y_hat_pd=ctx.y_hat_pd,
+													   y_hat_lgd=ctx.y_hat_lgd,
+													   y_hat_pd_x_lgd=ctx.y_hat_pd_x_lgd,
+													   y_hat_pd_x_lgd_mod=ctx.y_hat_pd_x_lgd_mod,
+													   list_list_reasons=ctx.list_list_reasons,
+													   list_list_errors=ctx.list_list_errors,
+													   df_counter=ctx.X_lg_grouped,
+													   list_degraded=getattr(ctx, 'list_degraded', None))
+			# save to object
+			ctx.output_final = output_final
+			# logic
+			if bool_bytes:
+				# pre-serialized json
+				ctx.bytes_output_final = self.response_builder.to_bytes(output_final=output_final)
+			# time
+			flt_sec_gen_output = time.perf_counter()-time_start
+			ctx.flt_sec_gen_output = flt_sec_gen_output
+			GET_INSTRUMENTATION().record(str_name='generate_output', flt_sec=flt_sec_gen_output)
+			self.scheduler.observe(str_stage='generate_output', str_mode='full', flt_sec=flt_sec_gen_output)
 		# return object
 		return self
+	# define generate output (flt_budget_sec is the latency budget, None runs every stage in full)
+	def generate_output(self, json_str_request, bool_bytes=False, ctx=None, flt_budget_sec=None):
+		# use the object as the context if not given one
+		ctx = self if ctx is None else ctx
+		# deadline starts now
+		flt_deadline = time.perf_counter() + flt_budget_sec if flt_budget_sec is not None else None
+		ctx.list_degraded = [] if flt_deadline is not None else None
+		# logic
+		if (self.cache_result is not None) and self.load_cached(json_str_request=json_str_request, ctx=ctx):
+			# rebuild output with this request's row ids
+			self.build_output(list_ctx=[ctx], bool_bytes=bool_bytes)
+			# challengers
+			self.shadow_score(list_ctx=[ctx])
+			# return object
+			return self
+		# logic
+		if flt_deadline is None:
+			# get adverse action
+			self.adverse_action(json_str_request=json_str_request, ctx=ctx)
+		else:
+			# get adverse action within the deadline
+			self.adverse_action_deadline(json_str_request=json_str_request, flt_deadline=flt_deadline, ctx=ctx)
+		# logic (degraded results are not cached)
+		if (self.cache_result is not None) and not ctx.list_degraded:
+			self.save_cached(ctx=ctx)
+		# build output
+		self.build_output(list_ctx=[ctx], bool_bytes=bool_bytes)
+		# challengers
+		self.shadow_score(list_ctx=[ctx])
+		# return object
+		return self
+	# define function for scoring a request without touching the object
+	def score(self, json_str_request, bool_bytes=False, flt_budget_sec=None):
+		# new context for this request (models and pipelines are only read)
+		ctx = RequestContext(json_str_request=json_str_request)
+		# generate output into the context
+		self.generate_output(json_str_request=json_str_request, bool_bytes=bool_bytes, ctx=ctx, flt_budget_sec=flt_budget_sec)
+		# return context
+		return ctx
+	# define function for scoring several requests with one batched model call per stage
+	def score_batch(self, list_json_str_request, bool_bytes=False, int_n_samples=100):
+		# new context for each request
+		list_ctx = [RequestContext(json_str_request=json_str_request) for json_str_request in list_json_str_request]
+		# parse and preprocess each request on its own (a bad payload only fails its own request)
+		list_ctx_ok = []
+		list_ctx_cached = []
+		for ctx in list_ctx:
+			try:
+				# logic
+				if (self.cache_result is not None) and self.load_cached(json_str_request=ctx.json_str_request, ctx=ctx, int_n_samples=int_n_samples):
+					list_ctx_cached.append(ctx)
+					continue
+				self.shared_preprocessing(json_str_request=ctx.json_str_request, ctx=ctx)
+			except Exception as e:
+				ctx.exception = e
+			else:
+				list_ctx_ok.append(ctx)
+		# logic
+		if list_ctx_ok:
+			# counter-offers and adverse action for every request at once
+			self.counter_offers_batch(list_ctx=list_ctx_ok, int_n_samples=int_n_samples)
+			self.adverse_action_batch(list_ctx=list_ctx_ok)
+			# logic
+			if self.cache_result is not None:
+				for ctx in list_ctx_ok:
+					self.save_cached(ctx=ctx)
+		# output for every request scored or cached
+		self.build_output(list_ctx=list_ctx_ok+list_ctx_cached, bool_bytes=bool_bytes)
+		# challengers
+		self.shadow_score(list_ctx=list_ctx_ok+list_ctx_cached)
+		# return contexts (in the order of the requests)
+		return list_ctx
+	# define helper for the range of values each model feature was split on ({feat: (min border, max border)})
+	def get_value_ranges(self):
+		dict_tpl_range = {}
+		# iterate through models
+		for model in [self.pipeline_pd.model, self.pipeline_lgd.model]:
+			# logic (older catboost has no get_borders)
+			if not hasattr(model, 'get_borders'):
+				continue
+			for int_feat, list_flt_border in model.get_borders().items():
+				# logic
+				if list_flt_border:
+					dict_tpl_range.setdefault(model.feature_names_[int_feat], (min(list_flt_border), max(list_flt_border)))
+		# return
+		return dict_tpl_range
+	# define function for synthesizing representative requests from df_empty and the raw feature lists
+	def synthesize_requests(self, int_n_requests=8, int_n_rows=2, int_seed=42):
+		# random state
+		rng = np.random.RandomState(int_seed)
+		# value ranges from the model borders
+		dict_tpl_range = self.get_value_ranges()
+		# define helper for one value of a col (col name as in the schema)
+		def get_value(col_name):
+			# logic (string cols, cols that only exist aggregated count as numeric)
+			int_pos = self.schema.dict_col_pos.get(col_name)
+			if (int_pos is not None) and not self.schema.arr_bool_numeric[int_pos]:
+				return rng.choice(['A', 'B', 'C'])
+			# range of the col (or of the first model feat built from it)
+			tpl_range = dict_tpl_range.get(col_name)
+			if tpl_range is None:
+				tpl_range = next((tpl for feat, tpl in dict_tpl_range.items() if feat.startswith(col_name)), (0.0, 100.0))
+			flt_pad = max(tpl_range[1]-tpl_range[0], 1.0) * 0.1
+			# return
+			return round(rng.uniform(tpl_range[0]-flt_pad, tpl_range[1]+flt_pad), 4)
+		# define helper for one csv table (header and rows)
+		def get_csv(list_feats_raw, list_list_values):
+			# return
+			return '\n'.join([','.join(list_feats_raw)] + [','.join(str(value) for value in list_values) for list_values in list_list_values]) + '\n'
+		# define helper for one income or debt table (rows that pass the bit filter)
+		def get_agg_csv(list_feats_raw, str_suffix, int_n_table_rows):
+			# one applicant whose rows are all valid
+			dict_fixed = {'uniqueid': 1, 'bitinvalid': False, 'bituse': True}
+			# iterate through rows
+			list_list_values = []
+			for int_row in range(int_n_table_rows):
+				list_values = []
+				for col in list_feats_raw:
+					# logic (raw cols are only named by their aggregates, e.g. fltgrossmonthly__income_sum)
+					if col.lower() in dict_fixed:
+						list_values.append(dict_fixed[col.lower()])
+					else:
+						list_values.append(get_value(col_name=f'{col.lower()}__{str_suffix}'))
+				list_list_values.append(list_values)
+			# return
+			return get_csv(list_feats_raw=list_feats_raw, list_list_values=list_list_values)
+		# empty list
+		list_json_str_request = []
+		for int_request in range(int_n_requests):
+			list_dict_row = []
+			for int_row in range(int_n_rows):
+				# every fourth request has empty income and lexis nexis tables (error paths)
+				bool_sparse = (int_request % 4) == 3
+				# application
+				list_sources = [{'name': 'Application', 'values': get_csv(list_feats_raw=self.list_feats_raw_app, list_list_values=[[get_value(col_name=f'{col.lower()}__app') for col in self.list_feats_raw_app]])}]
+				# income
+				list_sources.append({'name': 'Incomes', 'values': get_agg_csv(list_feats_raw=self.list_feats_raw_inc, str_suffix='income', int_n_table_rows=0 if bool_sparse else 3)})
+				# debt
+				if self.bool_debt:
+					list_sources.append({'name': 'Debts', 'values': get_agg_csv(list_feats_raw=self.list_feats_raw_debt, str_suffix='debt', int_n_table_rows=2)})
+				# lexis nexis
+				list_sources.append({'name': 'Lexis Nexis Risk View 5', 'values': get_csv(list_feats_raw=self.list_feats_raw_ln, list_list_values=[] if bool_sparse else [[get_value(col_name=f'{col.lower()}__ln') for col in self.list_feats_raw_ln]])})
+				# tu (characteristics of tuaccept and cvlink)
+				str_characteristics = ''.join(f'<characteristic><id>{col}</id><value>{get_value(col_name=f"{col.lower()}__{str_suffix}")}</value></characteristic>' for str_suffix, list_feats_raw in [('tuaccept', self.list_feats_raw_tuaccept), ('tucvlink', self.list_feats_raw_cvlink)] for col in list_feats_raw)
+				list_sources.append({'name': 'TUXML', 'values': f'<?xml version="1.0" encoding="UTF-8"?><creditBureau xmlns="http://www.transunion.com/namespace"><product><subject>{str_characteristics}</subject></product></creditBureau>'})
+				# append
+				list_dict_row.append({'row_id': f'warmup-{int_request}-{int_row}', 'sources': list_sources})
+			list_json_str_request.append({'rows': list_dict_row})
+		# return
+		return list_json_str_request
+	# define function for warming up a freshly loaded object (run before the worker reports ready)
+	def warm_up(self, int_n_requests=8, int_n_rows=2, int_n_rounds=3, list_json_str_request=None, int_seed=42, logger=None):
+		time_start = time.perf_counter()
+		# synthesize requests if not given any
+		if list_json_str_request is None:
+			list_json_str_request = self.synthesize_requests(int_n_requests=int_n_requests, int_n_rows=int_n_rows, int_seed=int_seed)
+		# keep state that fake requests should not leave behind (caches off so every round runs every stage)
+		dict_reason_template = dict(self.dict_reason_template)
+		cache_result, cache_source = self.cache_result, self.cache_source
+		self.cache_result, self.cache_source = None, None
+		# no fake requests in the challenger sink
+		shadow, self.shadow = getattr(self, 'shadow', None), None
+		# time the warm-up on its own scheduler and (this thread only) instrumentation so live counters and estimates are kept
+		scheduler = self.scheduler
+		list_dict_round = []
+		try:
+			with ThreadInstrumentation() as instrumentation_warm:
+				for int_round in range(int_n_rounds):
+					# own scheduler, stage estimates from the last (warm) round only
+					if int_round in [0, int_n_rounds-1]:
+						self.scheduler = StageScheduler(flt_alpha=scheduler.flt_alpha, flt_margin=scheduler.flt_margin)
+					time_round = time.perf_counter()
+					# every stage in full (counter-offers, adverse action, output as bytes)
+					list_flt_sec = []
+					for json_str_request in list_json_str_request:
+						time_request = time.perf_counter()
+						ctx = self.score(json_str_request=json_str_request, bool_bytes=True)
+						list_flt_sec.append(time.perf_counter()-time_request)
+					# degraded modes (a budget of 0 takes the cheapest mode of each stage, then the coarse grid)
+					self.score(json_str_request=list_json_str_request[0], flt_budget_sec=0.0)
+					self.counter_offers_batch(list_ctx=[ctx], str_mode='coarse')
+					# batched path
+					self.score_batch(list_json_str_request=list_json_str_request, bool_bytes=True)
+					# append
+					list_dict_round.append({'round': int_round,
+											'sec': time.perf_counter()-time_round,
+											'sec_request_max': max(list_flt_sec),
+											'sec_request_median': float(np.median(list_flt_sec))})
+		finally:
+			# put back
+			scheduler_warm, self.scheduler = self.scheduler, scheduler
+			self.dict_reason_template = dict_reason_template
+			self.cache_result, self.cache_source = cache_result, cache_source
+			self.shadow = shadow
+		# feed the warm stage timings into the scheduler in use
+		for str_key, flt_sec in scheduler_warm.dict_flt_sec.items():
+			str_stage, str_mode = str_key.split('.', 1)
+			self.scheduler.observe(str_stage=str_stage, str_mode=str_mode, flt_sec=flt_sec)
+		# report
+		dict_warm_up = {'sec_total': time.perf_counter()-time_start,
+						'n_requests': len(list_json_str_request),
+						'n_rounds': int_n_rounds,
+						'rounds': list_dict_round,
+						'spans': instrumentation_warm.snapshot()['spans']}
+		# save to object
+		self.dict_warm_up = dict_warm_up
+		# if using logger
+		if logger:
+			logger.warning(f"Warm-up done in {dict_warm_up['sec_total']:0.4} sec (median request {list_dict_round[0]['sec_request_median']:0.4} sec cold, {list_dict_round[-1]['sec_request_median']:0.4} sec warm)")
+		# return
+		return dict_warm_up
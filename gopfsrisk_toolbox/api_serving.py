@@ -0,0 +1,368 @@
+# api serving
+import os
+import gc
+import time
+import queue
+import asyncio
+import threading
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor, Future
+
+# define class for micro-batching requests in front of ParsePayload
+class MicroBatcher:
+	# initialize
+	def __init__(self, cls_parse_payload, flt_window_sec=0.005, int_max_batch=32, bool_bytes=False, int_n_samples=100, executor=None):
+		self.cls_parse_payload = cls_parse_payload
+		self.flt_window_sec = flt_window_sec
+		self.int_max_batch = int_max_batch
+		self.bool_bytes = bool_bytes
+		self.int_n_samples = int_n_samples
+		# score off the event loop (one thread is enough, batches run one at a time)
+		self.executor = executor if executor is not None else ThreadPoolExecutor(max_workers=1)
+		self.queue = None
+		self.task = None
+		# batch being collected or scored
+		self.list_tpl_batch = []
+	# define function for starting the batching loop
+	async def start(self):
+		# queue of (request, future)
+		self.queue = asyncio.Queue()
+		# run loop in the background
+		self.task = asyncio.ensure_future(self.run())
+		# return object
+		return self
+	# define function for stopping the batching loop (callers still waiting get an error)
+	async def stop(self):
+		# cancel loop
+		if self.task is not None:
+			self.task.cancel()
+			try:
+				await self.task
+			except asyncio.CancelledError:
+				pass
+			self.task = None
+		# callers in the batch that was running and callers still queued
+		list_tpl_pending = self.list_tpl_batch
+		self.list_tpl_batch = []
+		if self.queue is not None:
+			while not self.queue.empty():
+				list_tpl_pending.append(self.queue.get_nowait())
+		# fail them
+		for json_str_request, future in list_tpl_pending:
+			if not future.done():
+				future.set_exception(RuntimeError('MicroBatcher stopped'))
+		# return object
+		return self
+	# define function for collecting one batch
+	async def collect(self):
+		# get event loop
+		loop = asyncio.get_running_loop()
+		# wait for the first request (batch kept on the object so stop can fail it)
+		self.list_tpl_batch = [await self.queue.get()]
+		# window starts at the first request
+		flt_deadline = loop.time() + self.flt_window_sec
+		# collect until the window closes or the batch is full
+		while len(self.list_tpl_batch) < self.int_max_batch:
+			flt_timeout = flt_deadline - loop.time()
+			# logic
+			if flt_timeout <= 0:
+				break
+			try:
+				self.list_tpl_batch.append(await asyncio.wait_for(self.queue.get(), timeout=flt_timeout))
+			except asyncio.TimeoutError:
+				break
+		# return
+		return self.list_tpl_batch
+	# define batching loop
+	async def run(self):
+		# get event loop
+		loop = asyncio.get_running_loop()
+		# iterate forever
+		while True:
+			# collect a batch (requests arriving while it scores make up the next one)
+			list_tpl_batch = await self.collect()
+			# drop callers that gave up
+			list_tpl_batch = self.list_tpl_batch = [tpl_batch for tpl_batch in list_tpl_batch if not tpl_batch[1].done()]
+			# logic
+			if not list_tpl_batch:
+				continue
+			# score the batch
+			try:
+				list_ctx = await loop.run_in_executor(self.executor,
+													  self.cls_parse_payload.score_batch,
+													  [json_str_request for json_str_request, future in list_tpl_batch],
+													  self.bool_bytes,
+													  self.int_n_samples)
+			except Exception as e:
+				# every caller in the batch gets the error
+				for json_str_request, future in list_tpl_batch:
+					if not future.done():
+						future.set_exception(e)
+				self.list_tpl_batch = []
+				continue
+			# split results back to each caller
+			for (json_str_request, future), ctx in zip(list_tpl_batch, list_ctx):
+				# logic
+				if future.done():
+					continue
+				if ctx.exception is not None:
+					future.set_exception(ctx.exception)
+				else:
+					future.set_result(ctx)
+			# batch done
+			self.list_tpl_batch = []
+	# define function for scoring a request through the batcher
+	async def generate_output(self, json_str_request):
+		# start if not started
+		if self.task is None:
+			await self.start()
+		# future for this request
+		future = asyncio.get_running_loop().create_future()
+		# queue
+		await self.queue.put((json_str_request, future))
+		# return context once the batch is done
+		return await future
+
+# define worker loop for the pre-forked scoring server
+def PREFORK_WORKER(cls_parse_payload, queue_task, queue_result, int_max_requests, json_str_warmup, bool_bytes, bool_warm_up=False):
+	# warm up (first call pays for lazy init in catboost and pandas)
+	if json_str_warmup is not None:
+		cls_parse_payload.score(json_str_request=json_str_warmup)
+	# warm up every stage on synthesized requests
+	dict_warm_up = cls_parse_payload.warm_up() if bool_warm_up else None
+	# tell the parent this worker is ready (with its warm-up timing)
+	queue_result.put(('ready', mp.current_process().pid, dict_warm_up))
+	# iterate until told to stop or recycled
+	int_n_requests = 0
+	bool_stopped = False
+	while (int_max_requests is None) or (int_n_requests < int_max_requests):
+		# get task
+		tpl_task = queue_task.get()
+		# logic
+		if tpl_task is None:
+			bool_stopped = True
+			break
+		int_id, json_str_request = tpl_task
+		# tell the parent which request this worker holds (failed if the worker dies with it)
+		queue_result.put(('start', mp.current_process().pid, int_id))
+		# score
+		try:
+			ctx = cls_parse_payload.score(json_str_request=json_str_request, bool_bytes=bool_bytes)
+			queue_result.put((int_id, 'ok', ctx.bytes_output_final if bool_bytes else ctx.output_final))
+		except Exception as e:
+			queue_result.put((int_id, 'error', repr(e)))
+		int_n_requests += 1
+	# tell the parent this worker exited (so it can be replaced if recycled)
+	queue_result.put(('exit', mp.current_process().pid, bool_stopped))
+
+# define pre-forked process pool scoring server
+class PreforkServer:
+	# initialize
+	def __init__(self, cls_parse_payload, int_n_workers=None, int_max_requests=1000, json_str_warmup=None, bool_bytes=False, bool_warm_up=False):
+		self.cls_parse_payload = cls_parse_payload
+		self.int_n_workers = int_n_workers if int_n_workers is not None else os.cpu_count()
+		self.int_max_requests = int_max_requests
+		self.json_str_warmup = json_str_warmup
+		self.bool_bytes = bool_bytes
+		self.bool_warm_up = bool_warm_up
+		# fork so workers share the loaded pipelines, df_empty, and models copy-on-write
+		self.mp_context = mp.get_context('fork')
+		self.queue_task = self.mp_context.Queue()
+		self.queue_result = self.mp_context.Queue()
+		self.dict_process = {}
+		self.dict_future = {}
+		# request each worker is scoring {pid: id}
+		self.dict_inflight = {}
+		self.int_id = 0
+		self.int_n_recycled = 0
+		# warm-up timing reported by each worker {pid: dict}
+		self.dict_warm_up = {}
+		self.bool_running = False
+		self.lock = threading.Lock()
+		self.thread_result = None
+	# define helper for forking one worker
+	def fork_worker(self):
+		# new process
+		process = self.mp_context.Process(target=PREFORK_WORKER,
+										  args=(self.cls_parse_payload,
+												self.queue_task,
+												self.queue_result,
+												self.int_max_requests,
+												self.json_str_warmup,
+												self.bool_bytes,
+												self.bool_warm_up),
+										  daemon=True)
+		process.start()
+		# save to object
+		with self.lock:
+			self.dict_process[process.pid] = process
+		# return
+		return process
+	# define function for starting the server (raises if a worker dies or is not ready within flt_timeout_ready)
+	def start(self, flt_timeout_ready=300.0):
+		# move loaded objects out of the collector so refcounting does not touch their pages
+		gc.collect()
+		if hasattr(gc, 'freeze'):
+			gc.freeze()
+		# fork workers
+		for int_worker in range(self.int_n_workers):
+			self.fork_worker()
+		# wait for every worker to warm up
+		flt_deadline = time.perf_counter() + flt_timeout_ready if flt_timeout_ready is not None else None
+		int_n_ready = 0
+		while int_n_ready < self.int_n_workers:
+			try:
+				str_status, int_pid, dict_warm_up = self.queue_result.get(timeout=0.1)[:3]
+			except queue.Empty:
+				# workers that died during warm-up (they never get ready)
+				with self.lock:
+					list_int_exitcode = [process.exitcode for process in self.dict_process.values() if process.exitcode is not None]
+				# logic
+				if list_int_exitcode:
+					self.stop(flt_timeout=0.0)
+					raise RuntimeError(f'Worker exited during warm-up (exitcode {list_int_exitcode[0]})')
+				if (flt_deadline is not None) and (time.perf_counter() > flt_deadline):
+					self.stop(flt_timeout=0.0)
+					raise RuntimeError(f'{self.int_n_workers-int_n_ready} worker(s) not ready after {flt_timeout_ready} sec')
+				continue
+			if str_status == 'ready':
+				int_n_ready += 1
+				self.dict_warm_up[int_pid] = dict_warm_up
+		# collect results in the background
+		self.bool_running = True
+		self.thread_result = threading.Thread(target=self.collect_results, daemon=True)
+		self.thread_result.start()
+		# return object
+		return self
+	# define helper for failing a future (no-op if already resolved)
+	def fail_future(self, int_id, str_error):
+		with self.lock:
+			future = self.dict_future.pop(int_id, None)
+		# logic
+		if (future is not None) and not future.done():
+			future.set_exception(RuntimeError(str_error))
+		# return object
+		return self
+	# define helper for handling workers that died without exiting (their request fails, the worker is replaced)
+	def reap_workers(self):
+		with self.lock:
+			# nonzero exitcode (exception or signal); recycled workers exit 0 and are dropped on their 'exit' message
+			list_int_pid_dead = [int_pid for int_pid, process in self.dict_process.items() if process.exitcode not in [None, 0]]
+			list_process_dead = [self.dict_process.pop(int_pid) for int_pid in list_int_pid_dead]
+			list_int_id_dead = [self.dict_inflight.pop(int_pid) for int_pid in list_int_pid_dead if int_pid in self.dict_inflight]
+		# fail the requests they held
+		for int_id in list_int_id_dead:
+			self.fail_future(int_id=int_id, str_error='Worker died while scoring')
+		# replace them
+		for process in list_process_dead:
+			process.join()
+			if self.bool_running:
+				self.fork_worker()
+		# return object
+		return self
+	# define result collector
+	def collect_results(self):
+		# iterate while running
+		while self.bool_running or self.dict_future:
+			# workers that died without exiting (once the messages they sent are read)
+			if self.queue_result.empty():
+				self.reap_workers()
+			try:
+				tpl_result = self.queue_result.get(timeout=0.1)
+			except queue.Empty:
+				continue
+			# logic
+			if tpl_result[0] == 'ready':
+				# replacement worker
+				self.dict_warm_up[tpl_result[1]] = tpl_result[2]
+				continue
+			if tpl_result[0] == 'start':
+				int_pid, int_id = tpl_result[1], tpl_result[2]
+				with self.lock:
+					bool_alive = int_pid in self.dict_process
+					if bool_alive:
+						self.dict_inflight[int_pid] = int_id
+				# worker already reaped (died right after taking the request)
+				if not bool_alive:
+					self.fail_future(int_id=int_id, str_error='Worker died while scoring')
+				continue
+			if tpl_result[0] == 'exit':
+				# drop the exited worker
+				int_pid, bool_stopped = tpl_result[1], tpl_result[2]
+				with self.lock:
+					process = self.dict_process.pop(int_pid, None)
+					self.dict_inflight.pop(int_pid, None)
+				# logic (None if already reaped and replaced)
+				if process is None:
+					continue
+				process.join()
+				# replace it if it was recycled
+				if self.bool_running and not bool_stopped:
+					self.int_n_recycled += 1
+					self.fork_worker()
+				continue
+			# resolve the future
+			int_id, str_status, result = tpl_result
+			with self.lock:
+				future = self.dict_future.pop(int_id, None)
+				# no longer in flight
+				for int_pid in [int_pid for int_pid, int_id_inflight in self.dict_inflight.items() if int_id_inflight == int_id]:
+					del self.dict_inflight[int_pid]
+			# logic
+			if future is None:
+				continue
+			if str_status == 'ok':
+				future.set_result(result)
+			else:
+				future.set_exception(RuntimeError(result))
+	# define function for submitting a request
+	def submit(self, json_str_request):
+		# new future
+		future = Future()
+		with self.lock:
+			self.int_id += 1
+			int_id = self.int_id
+			self.dict_future[int_id] = future
+		# queue
+		self.queue_task.put((int_id, json_str_request))
+		# return
+		return future
+	# define function for scoring a request
+	def generate_output(self, json_str_request, flt_timeout=None):
+		# return output once a worker has scored it
+		return self.submit(json_str_request=json_str_request).result(timeout=flt_timeout)
+	# define function for stopping the server (requests still outstanding after flt_timeout fail)
+	def stop(self, flt_timeout=None):
+		# no more replacements
+		self.bool_running = False
+		# one deadline for the collector and the workers
+		flt_deadline = time.perf_counter() + flt_timeout if flt_timeout is not None else None
+		# one stop per worker (after any queued requests)
+		with self.lock:
+			int_n_workers = len(self.dict_process)
+		for int_worker in range(int_n_workers):
+			self.queue_task.put(None)
+		# wait for the collector to drain outstanding requests
+		if self.thread_result is not None:
+			self.thread_result.join(timeout=flt_timeout)
+			# logic
+			if self.thread_result.is_alive():
+				# fail whatever is left (the collector stops once nothing is outstanding)
+				with self.lock:
+					list_int_id = list(self.dict_future.keys())
+				for int_id in list_int_id:
+					self.fail_future(int_id=int_id, str_error='PreforkServer stopped')
+				self.thread_result.join()
+			self.thread_result = None
+		# wait for workers (stuck ones are terminated)
+		with self.lock:
+			list_process = list(self.dict_process.values())
+			self.dict_process = {}
+			self.dict_inflight = {}
+		for process in list_process:
+			process.join(timeout=max(flt_deadline-time.perf_counter(), 0.0) if flt_deadline is not None else None)
+			if process.is_alive():
+				process.terminate()
+				process.join()
+		# return object
+		return self
@@ -1,9 +1,24 @@
+import os
 import ast
+import json
 import time
+import sys
+import platform
+import threading
+import urllib.request
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+from itertools import chain
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+from .api import RequestContext
+from .api_serving import PreforkServer
+from .instrumentation import GET_INSTRUMENTATION
+from .lazy import LazyModule
+
+# heavy imports (loaded on first use)
+plt = LazyModule(str_name='matplotlib.pyplot')
+sns = LazyModule(str_name='seaborn')
 
 # define class
 class TimeParsing:
@@ -173,4 +188,457 @@ class TimeParsing:
 		self.df_output_2 = df_output_2
 		#self.fig = fig
 		# return
-		return self
\ No newline at end of file
+		return self
+
+# parse payload used by bulk re-scoring workers (set once per worker)
+BULK_PARSE_PAYLOAD = None
+
+# define initializer for bulk re-scoring workers
+def BULK_INIT_WORKER(cls_parse_payload):
+	global BULK_PARSE_PAYLOAD
+	BULK_PARSE_PAYLOAD = cls_parse_payload
+
+# define function for decoding a stored request (json first, python literal as a fallback)
+def DECODE_REQUEST(str_request):
+	# logic
+	if isinstance(str_request, dict):
+		return str_request
+	try:
+		return json.loads(str_request)
+	except ValueError:
+		return ast.literal_eval(str_request)
+
+# define function for re-scoring one chunk of payload rows into a flat df (one row per debtor)
+def BULK_RESCORE_CHUNK(df_chunk, str_col_request, list_cols_id, int_batch_size, int_n_reasons, cls_parse_payload=None):
+	# use the worker's parse payload if not given one
+	cls_parse_payload = BULK_PARSE_PAYLOAD if cls_parse_payload is None else cls_parse_payload
+	# empty dict of output cols
+	dict_list_output = {col: [] for col in ['idx_payload'] + list_cols_id + ['row_id', 'n_debtors', 'y_hat_pd', 'y_hat_lgd', 'y_hat_pd_x_lgd', 'y_hat_pd_x_lgd_mod', 'n_counter_offers', 'errors', 'exception',
+																			   'sec', 'sec_get_payloads', 'sec_parse', 'sec_create_x', 'sec_preprocessing', 'sec_counter', 'sec_adv_act', 'sec_gen_output']}
+	for int_reason in range(int_n_reasons):
+		dict_list_output[f'reason_{int_reason+1}'] = []
+	# iterate through batches of the chunk
+	for int_start in range(0, df_chunk.shape[0], int_batch_size):
+		df_batch = df_chunk.iloc[int_start:int_start+int_batch_size]
+		# decode requests (a bad request only fails its own row)
+		list_ctx = []
+		for str_request in df_batch[str_col_request]:
+			ctx = RequestContext()
+			try:
+				ctx.json_str_request = DECODE_REQUEST(str_request)
+			except (ValueError, SyntaxError) as e:
+				ctx.exception = e
+			list_ctx.append(ctx)
+		# score the batch (seconds per request are the batch seconds split evenly)
+		list_int_ok = [int_idx for int_idx, ctx in enumerate(list_ctx) if ctx.exception is None]
+		time_start = time.perf_counter()
+		for int_idx, ctx in zip(list_int_ok, cls_parse_payload.score_batch(list_json_str_request=[list_ctx[int_idx].json_str_request for int_idx in list_int_ok])):
+			list_ctx[int_idx] = ctx
+		flt_sec = (time.perf_counter()-time_start) / max(len(list_int_ok), 1)
+		# one row per debtor (one row with the exception if the request failed)
+		for idx_payload, (_, ser_row), ctx in zip(df_batch.index, df_batch.iterrows(), list_ctx):
+			# logic
+			if ctx.exception is not None:
+				list_tpl_debtor = [(None, np.nan, np.nan, [])]
+				str_exception = repr(ctx.exception)
+			else:
+				list_tpl_debtor = list(zip(ctx.list_unique_id, ctx.y_hat_pd, ctx.y_hat_lgd, ctx.list_list_reasons))
+				str_exception = None
+			for row_id, flt_pd, flt_lgd, list_reasons in list_tpl_debtor:
+				dict_list_output['idx_payload'].append(idx_payload)
+				for col in list_cols_id:
+					dict_list_output[col].append(ser_row[col])
+				dict_list_output['row_id'].append(row_id)
+				dict_list_output['n_debtors'].append(len(list_tpl_debtor) if str_exception is None else 0)
+				dict_list_output['y_hat_pd'].append(flt_pd)
+				dict_list_output['y_hat_lgd'].append(flt_lgd)
+				dict_list_output['y_hat_pd_x_lgd'].append(getattr(ctx, 'y_hat_pd_x_lgd', np.nan))
+				dict_list_output['y_hat_pd_x_lgd_mod'].append(getattr(ctx, 'y_hat_pd_x_lgd_mod', np.nan))
+				dict_list_output['n_counter_offers'].append(ctx.X_lg_grouped.shape[0] if str_exception is None else 0)
+				dict_list_output['errors'].append('|'.join(err for err in chain(*ctx.list_list_errors) if err != ''))
+				dict_list_output['exception'].append(str_exception)
+				# reasons (missing reasons are None)
+				list_reasons = [reason if isinstance(reason, str) else None for reason in list_reasons]
+				for int_reason in range(int_n_reasons):
+					dict_list_output[f'reason_{int_reason+1}'].append(list_reasons[int_reason] if int_reason < len(list_reasons) else None)
+				# times
+				dict_list_output['sec'].append(flt_sec)
+				for col, str_attr in [('sec_get_payloads', 'flt_sec_get_payloads'),
+									  ('sec_parse', 'flt_sec_parse'),
+									  ('sec_create_x', 'flt_sec_create_x'),
+									  ('sec_preprocessing', 'flt_sec_preprocessing'),
+									  ('sec_counter', 'flt_sec_counter'),
+									  ('sec_adv_act', 'flt_sec_adv_act'),
+									  ('sec_gen_output', 'flt_sec_gen_output')]:
+					dict_list_output[col].append(getattr(ctx, str_attr, np.nan))
+	# return
+	return pd.DataFrame(dict_list_output)
+
+# define class for re-scoring historical payload tables in bulk
+class BulkRescoring:
+	# initialize
+	def __init__(self, cls_parse_payload, str_dir_output, int_chunk_rows=10000, int_n_workers=None, int_batch_size=32, int_n_reasons=5,
+				 str_format='csv', str_col_request='strZestRequest', list_cols_id=['bigAccountId','bigZestV2Id','dtmCreatedDate'], bool_resume=True):
+		self.cls_parse_payload = cls_parse_payload
+		self.str_dir_output = str_dir_output
+		self.int_chunk_rows = int_chunk_rows
+		self.int_n_workers = int_n_workers if int_n_workers is not None else os.cpu_count()
+		self.int_batch_size = int_batch_size
+		self.int_n_reasons = int_n_reasons
+		self.str_format = str_format
+		self.str_col_request = str_col_request
+		self.list_cols_id = list_cols_id
+		self.bool_resume = bool_resume
+	# define helper for streaming chunks of payload rows (csv filename or df)
+	def iter_chunks(self, payloads):
+		# logic
+		if isinstance(payloads, pd.DataFrame):
+			for int_start in range(0, payloads.shape[0], self.int_chunk_rows):
+				yield payloads.iloc[int_start:int_start+self.int_chunk_rows]
+		else:
+			# only the cols we need, read a chunk at a time
+			for df_chunk in pd.read_csv(payloads, usecols=self.list_cols_id+[self.str_col_request], chunksize=self.int_chunk_rows):
+				yield df_chunk
+	# define helper for the filename of a chunk
+	def get_filename(self, int_chunk):
+		# return
+		return os.path.join(self.str_dir_output, f'part-{int_chunk:05d}.{self.str_format}')
+	# define helper for writing a chunk (to a temp file first so a partial file never looks done)
+	def write_chunk(self, df_output, int_chunk):
+		str_filename = self.get_filename(int_chunk=int_chunk)
+		str_filename_tmp = f'{str_filename}.tmp'
+		# logic
+		if self.str_format == 'parquet':
+			df_output.to_parquet(str_filename_tmp, index=False)
+		else:
+			df_output.to_csv(str_filename_tmp, index=False)
+		os.replace(str_filename_tmp, str_filename)
+		# return
+		return str_filename
+	# define function for re-scoring every payload row
+	def rescore(self, payloads):
+		# make output dir
+		os.makedirs(self.str_dir_output, exist_ok=True)
+		# args for every chunk
+		tpl_args = (self.str_col_request, self.list_cols_id, self.int_batch_size, self.int_n_reasons)
+		# empty list of chunk summaries
+		list_dict_chunk = []
+		instrumentation = GET_INSTRUMENTATION()
+		time_start = time.perf_counter()
+		# logic
+		if self.int_n_workers <= 1:
+			executor = None
+		else:
+			# fork so workers share the loaded pipelines and models copy-on-write
+			executor = ProcessPoolExecutor(max_workers=self.int_n_workers,
+										   mp_context=mp.get_context('fork'),
+										   initializer=BULK_INIT_WORKER,
+										   initargs=(self.cls_parse_payload,))
+		# chunks in flight (bounded so memory does not grow with the table)
+		list_tpl_pending = []
+		# define helper for writing the oldest chunk in flight
+		def write_oldest():
+			int_chunk, int_n_payloads, future = list_tpl_pending.pop(0)
+			# time waiting on the workers and writing
+			with instrumentation.span(str_name='bulk_rescore.wait'):
+				df_output = future.result()
+			with instrumentation.span(str_name='bulk_rescore.write'):
+				str_filename = self.write_chunk(df_output=df_output, int_chunk=int_chunk)
+			int_n_exceptions = int(df_output['exception'].notnull().sum())
+			list_dict_chunk.append({'chunk': int_chunk,
+									'n_payloads': int_n_payloads,
+									'n_rows': df_output.shape[0],
+									'n_exceptions': int_n_exceptions,
+									'filename': str_filename,
+									'sec_elapsed': time.perf_counter()-time_start})
+			# progress
+			instrumentation.count(str_name='bulk_rescore.chunks')
+			instrumentation.count(str_name='bulk_rescore.payloads', int_n=int_n_payloads)
+			instrumentation.count(str_name='bulk_rescore.rows', int_n=df_output.shape[0])
+			instrumentation.count(str_name='bulk_rescore.exceptions', int_n=int_n_exceptions)
+		try:
+			for int_chunk, df_chunk in enumerate(self.iter_chunks(payloads=payloads)):
+				# skip chunks already written
+				if self.bool_resume and os.path.exists(self.get_filename(int_chunk=int_chunk)):
+					instrumentation.count(str_name='bulk_rescore.chunks_skipped')
+					continue
+				# logic
+				if executor is None:
+					# score in this process
+					future = Future()
+					future.set_result(BULK_RESCORE_CHUNK(df_chunk, *tpl_args, cls_parse_payload=self.cls_parse_payload))
+					list_tpl_pending.append((int_chunk, df_chunk.shape[0], future))
+				else:
+					list_tpl_pending.append((int_chunk, df_chunk.shape[0], executor.submit(BULK_RESCORE_CHUNK, df_chunk, *tpl_args)))
+				# write in order once enough chunks are in flight
+				while len(list_tpl_pending) > max(self.int_n_workers, 1):
+					write_oldest()
+			# write the rest
+			while list_tpl_pending:
+				write_oldest()
+		finally:
+			if executor is not None:
+				executor.shutdown(wait=True)
+		# save to object
+		self.df_chunks = pd.DataFrame(list_dict_chunk)
+		self.flt_sec = time.perf_counter()-time_start
+		instrumentation.record(str_name='bulk_rescore.total', flt_sec=self.flt_sec)
+		# return object
+		return self
+	# define function for reading every chunk written back into one df
+	def read_output(self, list_cols=None):
+		# get part files in order
+		list_str_filename = sorted(str_filename for str_filename in os.listdir(self.str_dir_output) if str_filename.startswith('part-') and str_filename.endswith(f'.{self.str_format}'))
+		# logic
+		if self.str_format == 'parquet':
+			list_df = [pd.read_parquet(os.path.join(self.str_dir_output, str_filename), columns=list_cols) for str_filename in list_str_filename]
+		else:
+			list_df = [pd.read_csv(os.path.join(self.str_dir_output, str_filename), usecols=list_cols) for str_filename in list_str_filename]
+		# return
+		return pd.concat(list_df, axis=0, ignore_index=True)
+
+# define class for load testing the scoring api (in process or a local endpoint)
+class LoadTest:
+	# initialize
+	def __init__(self, df_payloads, cls_parse_payload=None, str_url=None, str_col_request='strZestRequest', flt_sec_per_level=10.0,
+				 int_max_workers=64, flt_timeout=30.0, int_seed=42):
+		# logic
+		if (cls_parse_payload is None) == (str_url is None):
+			raise ValueError('Pass exactly one of cls_parse_payload or str_url')
+		self.cls_parse_payload = cls_parse_payload
+		self.str_url = str_url
+		self.flt_sec_per_level = flt_sec_per_level
+		self.int_max_workers = int_max_workers
+		self.flt_timeout = flt_timeout
+		self.int_seed = int_seed
+		# decode every request once (and encode for the endpoint)
+		self.list_json_str_request = [DECODE_REQUEST(str_request) for str_request in df_payloads[str_col_request]]
+		self.list_bytes_request = [json.dumps(json_str_request).encode('utf-8') for json_str_request in self.list_json_str_request] if str_url is not None else None
+		# results
+		self.list_dict_level = []
+	# define helper for sending one request (returns True if it scored)
+	def send(self, int_idx):
+		int_idx = int_idx % len(self.list_json_str_request)
+		# logic
+		if self.str_url is None:
+			ctx = self.cls_parse_payload.score(json_str_request=self.list_json_str_request[int_idx])
+			return ctx.exception is None
+		# post to the endpoint
+		request = urllib.request.Request(self.str_url, data=self.list_bytes_request[int_idx], headers={'Content-Type': 'application/json'})
+		with urllib.request.urlopen(request, timeout=self.flt_timeout) as response:
+			response.read()
+			# return
+			return response.status == 200
+	# define helper for timing one request (latency from when it was due, so queueing counts)
+	def timed_send(self, int_idx, flt_time_due, list_tpl_result, lock):
+		try:
+			bool_ok = self.send(int_idx=int_idx)
+		except Exception:
+			bool_ok = False
+		flt_sec = time.perf_counter() - flt_time_due
+		with lock:
+			list_tpl_result.append((flt_sec, bool_ok))
+	# define function for running at a fixed concurrency (closed loop, each worker sends back to back)
+	def run_concurrency(self, int_concurrency):
+		list_tpl_result = []
+		lock = threading.Lock()
+		# shared request counter
+		list_int_next = [0]
+		flt_time_end = time.perf_counter() + self.flt_sec_per_level
+		# define worker loop
+		def worker():
+			while time.perf_counter() < flt_time_end:
+				with lock:
+					int_idx = list_int_next[0]
+					list_int_next[0] += 1
+				self.timed_send(int_idx=int_idx, flt_time_due=time.perf_counter(), list_tpl_result=list_tpl_result, lock=lock)
+		# run
+		time_start = time.perf_counter()
+		list_thread = [threading.Thread(target=worker, daemon=True) for int_worker in range(int_concurrency)]
+		for thread in list_thread:
+			thread.start()
+		for thread in list_thread:
+			thread.join()
+		# return results and seconds
+		return list_tpl_result, time.perf_counter()-time_start
+	# define function for running at a fixed arrival rate (open loop, poisson arrivals)
+	def run_rate(self, flt_rate):
+		list_tpl_result = []
+		lock = threading.Lock()
+		# arrival times
+		rng = np.random.RandomState(self.int_seed)
+		arr_flt_arrival = np.cumsum(rng.exponential(1 / flt_rate, size=max(int(flt_rate * self.flt_sec_per_level * 2), 1)))
+		arr_flt_arrival = arr_flt_arrival[arr_flt_arrival < self.flt_sec_per_level]
+		# run
+		time_start = time.perf_counter()
+		with ThreadPoolExecutor(max_workers=self.int_max_workers) as executor:
+			for int_idx, flt_arrival in enumerate(arr_flt_arrival):
+				# wait for the arrival
+				flt_time_due = time_start + flt_arrival
+				flt_sec_wait = flt_time_due - time.perf_counter()
+				if flt_sec_wait > 0:
+					time.sleep(flt_sec_wait)
+				executor.submit(self.timed_send, int_idx, flt_time_due, list_tpl_result, lock)
+		# return results and seconds
+		return list_tpl_result, time.perf_counter()-time_start
+	# define helper for summarizing a level
+	def summarize(self, str_mode, flt_level, list_tpl_result, flt_sec, dict_snapshot):
+		arr_flt_sec = np.array([flt_sec_request for flt_sec_request, bool_ok in list_tpl_result if bool_ok])
+		int_n_errors = sum(1 for flt_sec_request, bool_ok in list_tpl_result if not bool_ok)
+		dict_level = {'mode': str_mode,
+					  'level': flt_level,
+					  'n_requests': len(list_tpl_result),
+					  'n_errors': int_n_errors,
+					  'sec': flt_sec,
+					  'throughput': arr_flt_sec.shape[0] / flt_sec if flt_sec > 0 else np.nan}
+		# latency
+		for str_stat, func in [('mean', np.mean), ('p50', lambda arr: np.percentile(arr, 50)), ('p95', lambda arr: np.percentile(arr, 95)), ('p99', lambda arr: np.percentile(arr, 99)), ('max', np.max)]:
+			dict_level[f'sec_{str_stat}'] = float(func(arr_flt_sec)) if arr_flt_sec.shape[0] else np.nan
+		# per stage breakdown (in process only)
+		if dict_snapshot is not None:
+			for str_name, dict_span in dict_snapshot['spans'].items():
+				dict_level[f'{str_name}_mean'] = dict_span['mean']
+				dict_level[f'{str_name}_p95'] = dict_span['p95']
+		# return
+		return dict_level
+	# define function for running every level (concurrency levels then arrival rates)
+	def run(self, list_int_concurrency=[1, 2, 4, 8], list_flt_rate=None):
+		# iterate through levels
+		for str_mode, list_level in [('concurrency', list_int_concurrency or []), ('rate', list_flt_rate or [])]:
+			for level in list_level:
+				# stage timings for this level only (resets the instrumentation in this process)
+				if self.str_url is None:
+					GET_INSTRUMENTATION().reset()
+				# run
+				if str_mode == 'concurrency':
+					list_tpl_result, flt_sec = self.run_concurrency(int_concurrency=level)
+				else:
+					list_tpl_result, flt_sec = self.run_rate(flt_rate=level)
+				# summarize
+				dict_snapshot = GET_INSTRUMENTATION().snapshot() if self.str_url is None else None
+				dict_level = self.summarize(str_mode=str_mode, flt_level=level, list_tpl_result=list_tpl_result, flt_sec=flt_sec, dict_snapshot=dict_snapshot)
+				self.list_dict_level.append(dict_level)
+				# print message
+				print(f"{str_mode} {level}: {dict_level['throughput']:0.5} req/sec, p50 {dict_level['sec_p50']:0.5} sec, p99 {dict_level['sec_p99']:0.5} sec")
+		# save to object
+		self.df_results = pd.DataFrame(self.list_dict_level)
+		# return object
+		return self
+	# define function for saving the results as a benchmark artifact
+	def save(self, str_filename):
+		# what was tested and where
+		dict_artifact = {'timestamp': time.time(),
+						 'python': sys.version,
+						 'platform': platform.platform(),
+						 'cpu_count': os.cpu_count(),
+						 'endpoint': self.str_url if self.str_url is not None else 'in_process',
+						 'model': None if self.cls_parse_payload is None else f'{self.cls_parse_payload.response_builder.str_model_name}-{self.cls_parse_payload.response_builder.str_model_version}',
+						 'n_payloads': len(self.list_json_str_request),
+						 'sec_per_level': self.flt_sec_per_level,
+						 'results': self.df_results.replace({np.nan: None}).to_dict('records')}
+		# write
+		with open(str_filename, 'w') as file_artifact:
+			json.dump(dict_artifact, file_artifact, indent=1)
+		# return object
+		return self
+	# define function for comparing to a saved benchmark (ratio of this run to the baseline by level)
+	def compare(self, str_filename_baseline, list_cols=['throughput', 'sec_p50', 'sec_p95', 'sec_p99']):
+		# load baseline
+		with open(str_filename_baseline) as file_artifact:
+			df_baseline = pd.DataFrame(json.load(file_artifact)['results'])
+		# join on level
+		df_compare = pd.merge(self.df_results[['mode', 'level']+list_cols], df_baseline[['mode', 'level']+list_cols], on=['mode', 'level'], suffixes=('', '_baseline'))
+		for col in list_cols:
+			df_compare[f'{col}_ratio'] = df_compare[col] / df_compare[f'{col}_baseline']
+		# return
+		return df_compare
+	# define function for plotting throughput and latency as load increases
+	def create_plot(self, tpl_figsize, str_filename):
+		# ax
+		fig, ax = plt.subplots(nrows=2, ncols=1, figsize=tpl_figsize)
+		for str_mode, str_label in [('concurrency', 'Concurrency'), ('rate', 'Arrival Rate (req/sec)')]:
+			df_mode = self.df_results[self.df_results['mode']==str_mode]
+			# logic
+			if df_mode.shape[0] == 0:
+				continue
+			# throughput
+			ax[0].plot(df_mode['level'], df_mode['throughput'], marker='o', label=str_label)
+			# latency percentiles
+			for str_stat in ['sec_p50', 'sec_p95', 'sec_p99']:
+				ax[1].plot(df_mode['level'], df_mode[str_stat], marker='o', label=f'{str_label} {str_stat[4:]}')
+		ax[0].set_title('Throughput (req/sec) by Load')
+		ax[0].legend()
+		ax[1].set_title('Latency (sec) by Load')
+		ax[1].legend()
+		# fix overlap
+		plt.tight_layout()
+		# save
+		plt.savefig(str_filename, bbox_inches='tight')
+		# return object
+		return self
+
+# define function for checking the counter-offer search against the full grid (best offer of each request)
+def CHECK_COUNTER_SEARCH(cls_parse_payload, list_json_str_request, int_n_samples=100, flt_tol=1e-3):
+	# preprocess each request once
+	list_X = []
+	for json_str_request in list_json_str_request:
+		ctx = RequestContext(json_str_request=json_str_request)
+		cls_parse_payload.shared_preprocessing(json_str_request=json_str_request, ctx=ctx)
+		list_X.append(ctx.X)
+	# both modes
+	engine = cls_parse_payload.counter_offer_engine
+	list_dict_full = engine.generate_batch(list_X=list_X, int_n_samples=int_n_samples)
+	list_dict_search = engine.search_batch(list_X=list_X)
+	# best (lowest) modified ecnl of each request (None if no offers)
+	list_dict_request = []
+	for dict_full, dict_search in zip(list_dict_full, list_dict_search):
+		flt_best_full = dict_full['df_grouped_sub']['ecnl_mod'].min() if dict_full['df_grouped_sub'].shape[0] else None
+		flt_best_search = dict_search['df_grouped_sub']['ecnl_mod'].min() if dict_search['df_grouped_sub'].shape[0] else None
+		# gap (positive when the search is worse, inf when it misses every offer)
+		if flt_best_full is None:
+			flt_gap = 0.0
+		elif flt_best_search is None:
+			flt_gap = np.inf
+		else:
+			flt_gap = flt_best_search - flt_best_full
+		list_dict_request.append({'best_full': flt_best_full,
+								  'best_search': flt_best_search,
+								  'n_offers_full': dict_full['df_grouped_sub'].shape[0],
+								  'n_offers_search': dict_search['df_grouped_sub'].shape[0],
+								  'gap': flt_gap})
+	# summarize
+	flt_max_gap = max(dict_request['gap'] for dict_request in list_dict_request)
+	# return
+	return {'flt_max_gap': flt_max_gap,
+			'bool_equivalent': bool(flt_max_gap <= flt_tol),
+			'int_n_worse': sum(dict_request['gap'] > flt_tol for dict_request in list_dict_request),
+			'int_n_requests': len(list_dict_request),
+			'list_dict_request': list_dict_request}
+
+# define function for checking that prefork workers recycle under load without dropping requests
+def CHECK_PREFORK_RECYCLING(cls_parse_payload, json_str_request, int_n_workers=2, int_max_requests=3, int_n_requests=21, flt_timeout=60.0):
+	# expected output (scored in this process)
+	output_expected = cls_parse_payload.score(json_str_request=json_str_request).output_final
+	# every request queued at once so workers recycle while others are scoring
+	server = PreforkServer(cls_parse_payload=cls_parse_payload, int_n_workers=int_n_workers, int_max_requests=int_max_requests).start()
+	list_future = [server.submit(json_str_request=json_str_request) for int_request in range(int_n_requests)]
+	# iterate through futures
+	int_n_ok, int_n_mismatch, list_str_error = 0, 0, []
+	for future in list_future:
+		try:
+			output = future.result(timeout=flt_timeout)
+		except Exception as e:
+			list_str_error.append(repr(e))
+			continue
+		# logic
+		if output == output_expected:
+			int_n_ok += 1
+		else:
+			int_n_mismatch += 1
+	server.stop(flt_timeout=flt_timeout)
+	# return
+	return {'bool_passed': int_n_ok == int_n_requests,
+			'int_n_ok': int_n_ok,
+			'int_n_mismatch': int_n_mismatch,
+			'int_n_recycled': server.int_n_recycled,
+			'list_str_error': list_str_error}
@@ -0,0 +1,174 @@
+# artifact
+import os
+import io
+import json
+import time
+import pickle
+import inspect
+import numpy as np
+import catboost as cb
+
+# format of the bundle on disk (bump when the layout changes)
+INT_FORMAT_VERSION = 1
+
+# define pickler that keeps catboost models and large arrays out of the pickle
+class BundlePickler(pickle.Pickler):
+	# initialize
+	def __init__(self, file, file_arrays, str_dir, int_min_bytes):
+		super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+		self.file_arrays = file_arrays
+		self.str_dir = str_dir
+		self.int_min_bytes = int_min_bytes
+		# {id: persistent id} so shared objects are written once
+		self.dict_saved = {}
+		self.list_dict_model = []
+		self.list_dict_array = []
+	# define function for the persistent id of an object (None pickles it as usual)
+	def persistent_id(self, obj):
+		# logic
+		if id(obj) in self.dict_saved:
+			return self.dict_saved[id(obj)]
+		if isinstance(obj, cb.CatBoost):
+			# native catboost format
+			str_filename = f'model_{len(self.list_dict_model)}.cbm'
+			obj.save_model(os.path.join(self.str_dir, str_filename))
+			self.list_dict_model.append({'filename': str_filename, 'class': type(obj).__name__})
+			tpl_pid = ('model', len(self.list_dict_model)-1)
+		elif isinstance(obj, np.ndarray) and (obj.dtype != object) and (obj.nbytes >= self.int_min_bytes):
+			# raw bytes at a 64 byte aligned offset
+			int_offset = self.file_arrays.tell()
+			int_offset += (-int_offset) % 64
+			self.file_arrays.seek(int_offset)
+			self.file_arrays.write(np.ascontiguousarray(obj).tobytes())
+			self.list_dict_array.append({'offset': int_offset, 'dtype': obj.dtype.str, 'shape': list(obj.shape)})
+			tpl_pid = ('array', len(self.list_dict_array)-1)
+		else:
+			return None
+		# keep obj alive so its id is not reused while pickling
+		self.dict_saved[id(obj)] = tpl_pid
+		self.dict_saved[('obj', id(obj))] = obj
+		# return
+		return tpl_pid
+
+# define unpickler that maps arrays onto the memory-mapped file and loads models from disk
+class BundleUnpickler(pickle.Unpickler):
+	# initialize
+	def __init__(self, file, bundle):
+		super().__init__(file)
+		self.bundle = bundle
+	# define function for loading a persistent id
+	def persistent_load(self, tpl_pid):
+		str_kind, int_idx = tpl_pid
+		# logic
+		if str_kind == 'model':
+			return self.bundle.get_model(int_idx=int_idx)
+		# view into the memory-mapped file (copy on write, pages shared between processes)
+		dict_array = self.bundle.dict_manifest['arrays'][int_idx]
+		# return
+		return np.ndarray(shape=tuple(dict_array['shape']), dtype=np.dtype(dict_array['dtype']), buffer=self.bundle.get_mmap(), offset=dict_array['offset'])
+
+# define function for saving everything ParsePayload needs as one bundle
+def SAVE_ARTIFACT(str_dir, dict_args, str_model_name='prestige-GenXI', str_model_version='v2', int_min_bytes=65536, logger=None):
+	# make dir
+	os.makedirs(str_dir, exist_ok=True)
+	# constructor args (unknown args would fail at load time, so fail now)
+	from .api import ParsePayload
+	list_args = list(inspect.signature(ParsePayload.__init__).parameters)[1:]
+	list_unknown = [str_arg for str_arg in dict_args if str_arg not in list_args]
+	if list_unknown:
+		raise ValueError(f'Not ParsePayload arguments: {list_unknown}')
+	# pickle args with models and large arrays written next to it
+	time_start = time.perf_counter()
+	with open(os.path.join(str_dir, 'objects.pkl'), 'wb') as file_objects, open(os.path.join(str_dir, 'arrays.bin'), 'wb') as file_arrays:
+		pickler = BundlePickler(file=file_objects, file_arrays=file_arrays, str_dir=str_dir, int_min_bytes=int_min_bytes)
+		pickler.dump(dict_args)
+	# manifest
+	dict_manifest = {'format_version': INT_FORMAT_VERSION,
+					 'model_name': str_model_name,
+					 'model_version': str_model_version,
+					 'created': time.time(),
+					 'args': list(dict_args.keys()),
+					 'models': pickler.list_dict_model,
+					 'arrays': pickler.list_dict_array,
+					 'bytes': {str_filename: os.path.getsize(os.path.join(str_dir, str_filename)) for str_filename in ['objects.pkl', 'arrays.bin'] + [dict_model['filename'] for dict_model in pickler.list_dict_model]}}
+	with open(os.path.join(str_dir, 'manifest.json'), 'w') as file_manifest:
+		json.dump(dict_manifest, file_manifest, indent=1)
+	# if using logger
+	if logger:
+		logger.warning(f'Saved artifact {str_model_name}-{str_model_version} to {str_dir} in {time.perf_counter()-time_start:0.4} sec')
+	# return
+	return dict_manifest
+
+# define class for a bundle on disk (nothing heavy is loaded until asked for)
+class ArtifactBundle:
+	# initialize
+	def __init__(self, str_dir):
+		self.str_dir = str_dir
+		# read manifest
+		with open(os.path.join(str_dir, 'manifest.json'), 'r') as file_manifest:
+			self.dict_manifest = json.load(file_manifest)
+		# logic
+		if self.dict_manifest.get('format_version') != INT_FORMAT_VERSION:
+			raise ValueError(f"Artifact format {self.dict_manifest.get('format_version')} is not supported (expected {INT_FORMAT_VERSION})")
+		# truncated or mismatched files
+		for str_filename, int_bytes in self.dict_manifest['bytes'].items():
+			if os.path.getsize(os.path.join(str_dir, str_filename)) != int_bytes:
+				raise ValueError(f'Artifact file {str_filename} does not match the manifest')
+		self.mmap = None
+		self.dict_model = {}
+		self.dict_args = None
+		self.parse_payload = None
+	# define function for the memory-mapped arrays file
+	def get_mmap(self):
+		# logic
+		if self.mmap is None:
+			# empty files cannot be mapped
+			if self.dict_manifest['bytes']['arrays.bin'] == 0:
+				self.mmap = np.zeros(0, dtype=np.uint8)
+			else:
+				self.mmap = np.memmap(os.path.join(self.str_dir, 'arrays.bin'), dtype=np.uint8, mode='c')
+		# return
+		return self.mmap
+	# define function for loading a model (once)
+	def get_model(self, int_idx):
+		# logic
+		if int_idx not in self.dict_model:
+			dict_model = self.dict_manifest['models'][int_idx]
+			model = getattr(cb, dict_model['class'])()
+			model.load_model(os.path.join(self.str_dir, dict_model['filename']))
+			self.dict_model[int_idx] = model
+		# return
+		return self.dict_model[int_idx]
+	# define function for the ParsePayload args
+	def get_args(self):
+		# logic
+		if self.dict_args is None:
+			with open(os.path.join(self.str_dir, 'objects.pkl'), 'rb') as file_objects:
+				self.dict_args = BundleUnpickler(file=io.BytesIO(file_objects.read()), bundle=self).load()
+		# return
+		return self.dict_args
+	# define function for a ready to serve ParsePayload (built on first call)
+	def get_parse_payload(self, **kwargs):
+		# logic
+		if self.parse_payload is None:
+			from .api import ParsePayload
+			time_start = time.perf_counter()
+			# args from the bundle (kwargs win, e.g. cache size for this node)
+			parse_payload = ParsePayload(**{**self.get_args(), **kwargs})
+			parse_payload.response_builder.str_model_name = self.dict_manifest['model_name']
+			parse_payload.set_model_version(str_model_version=self.dict_manifest['model_version'])
+			# time
+			self.flt_sec_load = time.perf_counter()-time_start
+			self.parse_payload = parse_payload
+		# return
+		return self.parse_payload
+
+# define function for loading a bundle
+def LOAD_ARTIFACT(str_dir, logger=None):
+	# open
+	bundle = ArtifactBundle(str_dir=str_dir)
+	# if using logger
+	if logger:
+		logger.warning(f"Opened artifact {bundle.dict_manifest['model_name']}-{bundle.dict_manifest['model_version']} from {str_dir}")
+	# return
+	return bundle
@@ -1,7 +1,10 @@
 # custom metrics
 import numpy as np
-from scipy.special import expit
-from sklearn.metrics import confusion_matrix, average_precision_score, mean_squared_error
+from .lazy import LAZY_FROM
+
+# heavy imports (loaded on first use)
+(expit,) = LAZY_FROM(str_module='scipy.special', list_str_attrs=['expit'])
+(confusion_matrix, average_precision_score, mean_squared_error) = LAZY_FROM(str_module='sklearn.metrics', list_str_attrs=['confusion_matrix', 'average_precision_score', 'mean_squared_error'])
 
 # define custom metric for converting to logit
 class LogitContinuous:
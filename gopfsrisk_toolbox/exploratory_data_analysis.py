@@ -3,13 +3,15 @@ import pandas as pd
 import math
 from pandas.api.types import is_numeric_dtype
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
-import matplotlib.pyplot as plt
-import seaborn as sns
 import itertools
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
 import os
+from .lazy import TransformerBase, LazyModule, LAZY_FROM
+
+# heavy imports (loaded on first use)
+plt = LazyModule(str_name='matplotlib.pyplot')
+sns = LazyModule(str_name='seaborn')
+(PCA,) = LAZY_FROM(str_module='sklearn.decomposition', list_str_attrs=['PCA'])
+(KMeans,) = LAZY_FROM(str_module='sklearn.cluster', list_str_attrs=['KMeans'])
 
 # define class to make plot comparisons
 class ContinuousTargetComparison:
@@ -399,7 +401,7 @@ def CHRON_GET_TRAIN(df, flt_prop_train=0.5, logger=None):
 	return df
 
 # define class to find/drop features with 100% NaN
-class DropAllNaN(BaseEstimator, TransformerMixin):
+class DropAllNaN(TransformerBase):
 	# initialize
 	def __init__(self, list_cols, bool_low_memory=True):
 		self.list_cols = list_cols
@@ -449,7 +451,7 @@ def LOG_DF_SHAPE(df, logger=None):
 		logger.warning(f'df: {int_nrows} rows, {int_ncols} columns')
 
 # define DropNoVariance
-class DropNoVariance(BaseEstimator, TransformerMixin):
+class DropNoVariance(TransformerBase):
 	# initialize class
 	def __init__(self, list_cols, bool_low_memory=True):
 		self.list_cols = list_cols
@@ -492,7 +494,7 @@ class DropNoVariance(BaseEstimator, TransformerMixin):
 		return X
 
 # define class
-class DropRedundantFeatures(BaseEstimator, TransformerMixin):
+class DropRedundantFeatures(TransformerBase):
 	# initialize class
 	def __init__(self, list_cols, int_n_rows_check=10000):
 		self.list_cols = list_cols
@@ -535,7 +537,7 @@ class DropRedundantFeatures(BaseEstimator, TransformerMixin):
 		return X
 
 # define class for automating distribution plot analysis
-class DistributionAnalysis(BaseEstimator, TransformerMixin):
+class DistributionAnalysis(TransformerBase):
 	# initialiaze
 	def __init__(self, list_cols, int_nrows=10000, int_random_state=42, flt_thresh_upper=0.95, tpl_figsize=(10,10), 
 		         str_dirname='./output/distplots'):
@@ -790,7 +792,7 @@ def PLOT_INERTIA(df, int_n_max_clusters=20, tpl_figsize=(20,15), str_filename='.
 	return fig
 
 # class to create kmeans feature
-class CreateKMeansFeature(BaseEstimator, TransformerMixin):
+class CreateKMeansFeature(TransformerBase):
 	# initialize class
 	def __init__(self, int_n_clusters=7):
 		self.int_n_clusters = int_n_clusters
@@ -854,7 +856,7 @@ def PLOT_PCA_EXPLAINED_VARIANCE(df, int_n_components_min=1, int_n_components_max
 	return fig
 
 # class to create pca features
-class CreatePCAFeatures(BaseEstimator, TransformerMixin):
+class CreatePCAFeatures(TransformerBase):
 	# initialize class
 	def __init__(self, int_n_components=50):
 		self.int_n_components = int_n_components
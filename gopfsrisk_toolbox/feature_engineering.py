@@ -1,6 +1,7 @@
 # feature engineering
 import numpy as np
 import time
+from .instrumentation import GET_INSTRUMENTATION
 
 # create fe class
 class FeatureEngineeringAaronPDLGDLower:
@@ -67,7 +68,8 @@ class FeatureEngineeringAaronPDLGDLower:
 			X['eng_debt_to_income'] = X['fltmonthlypayment__debt_mean'] / X['fltgrossmonthly__income_sum']
 		except:
 			pass
-		print(f'Time to feature engineer: {(time.perf_counter()-time_start):0.5} sec.')
+		# record time
+		GET_INSTRUMENTATION().record(str_name='FeatureEngineeringAaronPDLGDLower.transform', flt_sec=time.perf_counter()-time_start)
 		# return
 		return X
 
@@ -136,7 +138,8 @@ class FeatureEngineeringAaronPD:
 			X['ENG_debt_to_income'] = X['fltMonthlyPayment__debt_mean'] / X['fltGrossMonthly__income_sum']
 		except:
 			pass
-		print(f'Time to feature engineer: {(time.perf_counter()-time_start):0.5} sec.')
+		# record time
+		GET_INSTRUMENTATION().record(str_name='FeatureEngineeringAaronPD.transform', flt_sec=time.perf_counter()-time_start)
 		# return
 		return X
 
@@ -205,7 +208,8 @@ class FeatureEngineeringAaronLGD:
 			X['ENG_debt_to_income'] = X['fltMonthlyPayment__debt_mean'] / X['fltGrossMonthly__income_sum']
 		except:
 			pass
-		print(f'Time to feature engineer: {(time.perf_counter()-time_start):0.5} sec.')
+		# record time
+		GET_INSTRUMENTATION().record(str_name='FeatureEngineeringAaronLGD.transform', flt_sec=time.perf_counter()-time_start)
 		# return
 		return X
 
@@ -5,9 +5,12 @@ from .algorithms import FIT_CATBOOST_MODEL
 from .general import GET_NUMERIC_AND_NONNUMERIC
 import ast
 import pickle
-from sklearn.metrics import f1_score, roc_auc_score, mean_squared_error
-from scipy.special import expit
-import matplotlib.pyplot as plt
+from .lazy import LazyModule, LAZY_FROM
+
+# heavy imports (loaded on first use)
+(f1_score, roc_auc_score, mean_squared_error) = LAZY_FROM(str_module='sklearn.metrics', list_str_attrs=['f1_score', 'roc_auc_score', 'mean_squared_error'])
+(expit,) = LAZY_FROM(str_module='scipy.special', list_str_attrs=['expit'])
+plt = LazyModule(str_name='matplotlib.pyplot')
 
 # define function for importance threshold feat select
 def ITER_IMP_THRESH_FEAT_SELECT(X_train, y_train, X_valid, y_valid, list_non_numeric,
@@ -2,9 +2,12 @@
 import pandas as pd
 from .algorithms import FIT_CATBOOST_MODEL
 import pickle
-from sklearn.metrics import f1_score, average_precision_score, precision_score, recall_score, roc_auc_score
-import matplotlib.pyplot as plt
 import numpy as np
+from .lazy import LazyModule, LAZY_FROM
+
+# heavy imports (loaded on first use)
+(f1_score, average_precision_score, precision_score, recall_score, roc_auc_score) = LAZY_FROM(str_module='sklearn.metrics', list_str_attrs=['f1_score', 'average_precision_score', 'precision_score', 'recall_score', 'roc_auc_score'])
+plt = LazyModule(str_name='matplotlib.pyplot')
 
 # define function for combining train and valid
 def COMBINE_TRAIN_AND_VALID(df_train, df_valid, logger=None):
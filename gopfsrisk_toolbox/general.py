@@ -6,8 +6,11 @@ import pandas as pd
 import pickle
 from pandas.api.types import is_numeric_dtype
 import json
-from sklearn.utils.class_weight import compute_class_weight
 import numpy as np
+from .lazy import LAZY_FROM
+
+# heavy imports (loaded on first use)
+(compute_class_weight,) = LAZY_FROM(str_module='sklearn.utils.class_weight', list_str_attrs=['compute_class_weight'])
 
 # define function for logging
 def LOG_EVENTS(str_filename='./logs/db_pull.log'):
@@ -0,0 +1,162 @@
+# instrumentation
+import json
+import math
+import time
+import threading
+from bisect import bisect_left
+
+# define class for timing one span
+class Span:
+	# initialize
+	def __init__(self, instrumentation, str_name):
+		self.instrumentation = instrumentation
+		self.str_name = str_name
+		self.flt_sec = None
+	# start timer
+	def __enter__(self):
+		self.time_start = time.perf_counter()
+		# return object
+		return self
+	# stop timer and record
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.flt_sec = time.perf_counter()-self.time_start
+		self.instrumentation.record(str_name=self.str_name, flt_sec=self.flt_sec)
+		# do not swallow errors
+		return False
+
+# define class for a latency histogram (log spaced buckets so memory is fixed)
+class Histogram:
+	# initialize
+	def __init__(self, list_flt_edges):
+		self.list_flt_edges = list_flt_edges
+		self.list_int_counts = [0] * (len(list_flt_edges)+1)
+		self.int_count = 0
+		self.flt_sum = 0.0
+		self.flt_min = float('inf')
+		self.flt_max = 0.0
+	# define function for adding one observation
+	def add(self, flt_sec):
+		self.list_int_counts[bisect_left(self.list_flt_edges, flt_sec)] += 1
+		self.int_count += 1
+		self.flt_sum += flt_sec
+		self.flt_min = min(self.flt_min, flt_sec)
+		self.flt_max = max(self.flt_max, flt_sec)
+	# define function for a percentile (upper edge of the bucket it falls in)
+	def percentile(self, flt_q):
+		# logic
+		if self.int_count == 0:
+			return None
+		# rank of the percentile
+		flt_rank = flt_q / 100 * self.int_count
+		int_cum = 0
+		for int_bucket, int_n in enumerate(self.list_int_counts):
+			int_cum += int_n
+			if int_cum >= flt_rank:
+				# bucket edge (never beyond what was seen)
+				flt_edge = self.list_flt_edges[int_bucket] if int_bucket < len(self.list_flt_edges) else self.flt_max
+				return min(max(flt_edge, self.flt_min), self.flt_max)
+		# return
+		return self.flt_max
+	# define function for summarizing
+	def summary(self):
+		# return
+		return {'count': self.int_count,
+				'sum': self.flt_sum,
+				'mean': self.flt_sum / self.int_count if self.int_count else None,
+				'min': self.flt_min if self.int_count else None,
+				'max': self.flt_max if self.int_count else None,
+				'p50': self.percentile(50),
+				'p95': self.percentile(95),
+				'p99': self.percentile(99)}
+
+# define class for span timers and counters
+class Instrumentation:
+	# initialize
+	def __init__(self, bool_enabled=True, flt_sec_min=1e-6, flt_sec_max=1e3, int_buckets_per_decade=20):
+		self.bool_enabled = bool_enabled
+		# bucket edges shared by every histogram
+		int_n_edges = int(round(math.log10(flt_sec_max / flt_sec_min) * int_buckets_per_decade)) + 1
+		self.list_flt_edges = [flt_sec_min * 10 ** (int_edge / int_buckets_per_decade) for int_edge in range(int_n_edges)]
+		self.lock = threading.Lock()
+		self.reset()
+	# define function for clearing everything recorded
+	def reset(self):
+		with self.lock:
+			self.dict_histogram = {}
+			self.dict_counter = {}
+		# return object
+		return self
+	# define function for timing a block
+	def span(self, str_name):
+		# return
+		return Span(instrumentation=self, str_name=str_name)
+	# define function for recording a duration
+	def record(self, str_name, flt_sec):
+		# logic
+		if not self.bool_enabled:
+			return self
+		with self.lock:
+			# get or make histogram
+			histogram = self.dict_histogram.get(str_name)
+			if histogram is None:
+				histogram = self.dict_histogram[str_name] = Histogram(list_flt_edges=self.list_flt_edges)
+			histogram.add(flt_sec)
+		# return object
+		return self
+	# define function for incrementing a counter
+	def count(self, str_name, int_n=1):
+		# logic
+		if not self.bool_enabled:
+			return self
+		with self.lock:
+			self.dict_counter[str_name] = self.dict_counter.get(str_name, 0) + int_n
+		# return object
+		return self
+	# define function for a snapshot of everything recorded
+	def snapshot(self):
+		with self.lock:
+			dict_snapshot = {'timestamp': time.time(),
+							 'spans': {str_name: histogram.summary() for str_name, histogram in self.dict_histogram.items()},
+							 'counters': dict(self.dict_counter)}
+		# return
+		return dict_snapshot
+	# define function for the snapshot as json
+	def to_json(self):
+		# return
+		return json.dumps(self.snapshot(), sort_keys=True)
+
+# module level instrumentation used by the api and transformers
+INSTRUMENTATION = Instrumentation()
+# instrumentation overriding the module level one on a single thread
+LOCAL = threading.local()
+
+# define function for getting the instrumentation in use (this thread's if one is set)
+def GET_INSTRUMENTATION():
+	instrumentation = getattr(LOCAL, 'instrumentation', None)
+	# return
+	return instrumentation if instrumentation is not None else INSTRUMENTATION
+
+# define function for plugging in an instrumentation (e.g. Instrumentation(bool_enabled=False) for no-op)
+def SET_INSTRUMENTATION(instrumentation):
+	global INSTRUMENTATION
+	INSTRUMENTATION = instrumentation
+	# return
+	return INSTRUMENTATION
+
+# define class for recording on the current thread only (e.g. timing a warm-up without touching what other threads record)
+class ThreadInstrumentation:
+	# initialize
+	def __init__(self, instrumentation=None):
+		self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+		self.instrumentation_previous = None
+	# plug in for this thread
+	def __enter__(self):
+		self.instrumentation_previous = getattr(LOCAL, 'instrumentation', None)
+		LOCAL.instrumentation = self.instrumentation
+		# return
+		return self.instrumentation
+	# put back
+	def __exit__(self, exc_type, exc_value, traceback):
+		LOCAL.instrumentation = self.instrumentation_previous
+		# do not swallow errors
+		return False
@@ -0,0 +1,138 @@
+# lazy
+import sys
+import json
+import inspect
+import importlib
+import subprocess
+
+# heavy packages a scoring image should not pay for at import
+LIST_STR_HEAVY = ['sklearn', 'scipy', 'statsmodels', 'matplotlib', 'seaborn']
+
+# define class for a module imported on first attribute access
+class LazyModule:
+	# initialize
+	def __init__(self, str_name, list_str_requires=None):
+		self.str_name = str_name
+		self.list_str_requires = list_str_requires if list_str_requires is not None else []
+		self.module = None
+	# define function for importing the module (once)
+	def load(self):
+		# logic
+		if self.module is None:
+			# modules that must be imported first (e.g. sklearn experimental flags)
+			for str_require in self.list_str_requires:
+				importlib.import_module(str_require)
+			self.module = importlib.import_module(self.str_name)
+		# return
+		return self.module
+	# forward attributes
+	def __getattr__(self, str_attr):
+		# not set yet (e.g. during unpickling)
+		if str_attr in ['str_name', 'list_str_requires', 'module']:
+			raise AttributeError(str_attr)
+		# return
+		return getattr(self.load(), str_attr)
+	# repr
+	def __repr__(self):
+		return f"<LazyModule '{self.str_name}' ({'loaded' if self.module is not None else 'not loaded'})>"
+
+# define class for a module attribute (function or class) imported on first use
+class LazyAttribute:
+	# initialize
+	def __init__(self, str_module, str_attr, list_str_requires=None):
+		self.lazy_module = LazyModule(str_name=str_module, list_str_requires=list_str_requires)
+		self.str_attr = str_attr
+	# define function for the real object
+	def load(self):
+		# return
+		return getattr(self.lazy_module.load(), self.str_attr)
+	# call (functions and classes alike)
+	def __call__(self, *args, **kwargs):
+		# return
+		return self.load()(*args, **kwargs)
+	# forward attributes
+	def __getattr__(self, str_attr):
+		# not set yet (e.g. during unpickling)
+		if str_attr in ['lazy_module', 'str_attr']:
+			raise AttributeError(str_attr)
+		# return
+		return getattr(self.load(), str_attr)
+	# repr
+	def __repr__(self):
+		return f"<LazyAttribute '{self.lazy_module.str_name}.{self.str_attr}'>"
+
+# define function for lazy 'from module import a, b' (returns one proxy per name)
+def LAZY_FROM(str_module, list_str_attrs, list_str_requires=None):
+	# return
+	return [LazyAttribute(str_module=str_module, str_attr=str_attr, list_str_requires=list_str_requires) for str_attr in list_str_attrs]
+
+# define base class for transformers (what the pipelines use of sklearn's BaseEstimator/TransformerMixin, without importing sklearn)
+class TransformerBase:
+	# define function for the constructor args
+	@classmethod
+	def get_param_names(cls):
+		# return
+		return sorted(str_param for str_param in inspect.signature(cls.__init__).parameters if str_param != 'self')
+	# define function for getting params (sklearn clone and grid search use this)
+	def get_params(self, deep=True):
+		# return
+		return {str_param: getattr(self, str_param, None) for str_param in self.get_param_names()}
+	# define function for setting params
+	def set_params(self, **params):
+		for str_param, val in params.items():
+			setattr(self, str_param, val)
+		# return object
+		return self
+	# fit and transform (like sklearn, y is only passed on when given since some fit methods take X alone)
+	def fit_transform(self, X, y=None, **fit_params):
+		# logic
+		if y is None:
+			return self.fit(X, **fit_params).transform(X)
+		# return
+		return self.fit(X, y, **fit_params).transform(X)
+	# repr
+	def __repr__(self):
+		return f"{type(self).__name__}({', '.join(f'{str_param}={val!r}' for str_param, val in self.get_params().items())})"
+
+# define function for timing the import of each submodule in a fresh interpreter
+def BENCHMARK_IMPORTS(list_str_modules=None, int_n_repeats=3, list_str_heavy=LIST_STR_HEAVY, str_filename=None, logger=None):
+	# default to every submodule of the package
+	if list_str_modules is None:
+		from . import LIST_SUBMODULES
+		list_str_modules = [f'{__package__}.{str_submodule}' for str_submodule in LIST_SUBMODULES]
+	# code run in the child (own sys.modules so nothing is cached between runs)
+	str_code = ('import sys, time, json\n'
+				'time_start = time.perf_counter()\n'
+				'import {str_module}\n'
+				'flt_sec = time.perf_counter()-time_start\n'
+				'print(json.dumps({{"flt_sec": flt_sec, "int_n_modules": len(sys.modules), "list_heavy": sorted(set(str_name.split(".")[0] for str_name in sys.modules) & set({list_str_heavy!r}))}}))')
+	# iterate through modules
+	list_dict_row = []
+	for str_module in list_str_modules:
+		list_flt_sec = []
+		for int_repeat in range(int_n_repeats):
+			completed = subprocess.run([sys.executable, '-c', str_code.format(str_module=str_module, list_str_heavy=list(list_str_heavy))], capture_output=True, text=True)
+			# logic
+			if completed.returncode != 0:
+				# e.g. an optional dependency missing in this image
+				dict_child = {'flt_sec': None, 'int_n_modules': None, 'list_heavy': None, 'str_error': completed.stderr.strip().split('\n')[-1]}
+				break
+			dict_child = json.loads(completed.stdout.strip().split('\n')[-1])
+			list_flt_sec.append(dict_child['flt_sec'])
+		# min over repeats (least disturbed by the rest of the box)
+		dict_row = {'module': str_module,
+					'sec_min': min(list_flt_sec) if list_flt_sec else None,
+					'sec_max': max(list_flt_sec) if list_flt_sec else None,
+					'n_modules': dict_child['int_n_modules'],
+					'heavy': dict_child['list_heavy'],
+					'error': dict_child.get('str_error')}
+		list_dict_row.append(dict_row)
+		# if using logger
+		if logger:
+			logger.warning(f"Import {str_module}: {dict_row['sec_min']} sec, heavy: {dict_row['heavy']}")
+	# save (track across releases)
+	if str_filename:
+		with open(str_filename, 'w') as file_out:
+			json.dump(list_dict_row, file_out, indent=1)
+	# return
+	return list_dict_row
@@ -2,19 +2,25 @@
 import os
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
 from ast import literal_eval
 from itertools import chain
-from sklearn.metrics import (accuracy_score, fowlkes_mallows_score, precision_score,
-                             recall_score, f1_score, roc_auc_score, average_precision_score,
-                             log_loss, brier_score_loss, precision_recall_curve, auc,
-	                         roc_curve)
-from sklearn.metrics import (explained_variance_score, mean_absolute_error, mean_squared_error)
-from scipy.stats import zscore
 from .general import GET_NUMERIC_AND_NONNUMERIC
 from .algorithms import FIT_CATBOOST_MODEL
-import statsmodels.api as sm
+from .lazy import LazyModule, LAZY_FROM
+
+# heavy imports (loaded on first use)
+sns = LazyModule(str_name='seaborn')
+plt = LazyModule(str_name='matplotlib.pyplot')
+sm = LazyModule(str_name='statsmodels.api')
+(accuracy_score, fowlkes_mallows_score, precision_score,
+ recall_score, f1_score, roc_auc_score, average_precision_score,
+ log_loss, brier_score_loss, precision_recall_curve, auc,
+ roc_curve) = LAZY_FROM(str_module='sklearn.metrics', list_str_attrs=['accuracy_score', 'fowlkes_mallows_score', 'precision_score',
+																	   'recall_score', 'f1_score', 'roc_auc_score', 'average_precision_score',
+																	   'log_loss', 'brier_score_loss', 'precision_recall_curve', 'auc',
+																	   'roc_curve'])
+(explained_variance_score, mean_absolute_error, mean_squared_error) = LAZY_FROM(str_module='sklearn.metrics', list_str_attrs=['explained_variance_score', 'mean_absolute_error', 'mean_squared_error'])
+(zscore,) = LAZY_FROM(str_module='scipy.stats', list_str_attrs=['zscore'])
 
 # define function to make QQ plot
 def QQ_PLOT(arr_yhat, ser_actual, str_filename='./output/plt_qq.png', logger=None, tpl_figsize=(10,10)):
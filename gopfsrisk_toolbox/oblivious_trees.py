@@ -0,0 +1,522 @@
+# oblivious trees
+import os
+import json
+import math
+import tempfile
+import numpy as np
+
+# define function for dumping a fitted catboost model to a dictionary
+def CATBOOST_TO_DICT(model):
+	# make temp file
+	int_fd, str_filename = tempfile.mkstemp(suffix='.json')
+	os.close(int_fd)
+	# try dumping and reading
+	try:
+		# save as json
+		model.save_model(str_filename, format='json')
+		# read
+		with open(str_filename, 'r') as file:
+			dict_model = json.load(file)
+	finally:
+		# rm temp file
+		os.remove(str_filename)
+	# return
+	return dict_model
+
+# define function for getting the flat feature indices behind each split index
+def GET_SPLIT_FEATURES(dict_model):
+	# get features info
+	dict_features_info = dict_model['features_info']
+	# float and cat feature index to flat feature index
+	dict_float_flat = {dict_feat['feature_index']: dict_feat['flat_feature_index'] for dict_feat in dict_features_info.get('float_features', [])}
+	dict_cat_flat = {dict_feat['feature_index']: dict_feat['flat_feature_index'] for dict_feat in dict_features_info.get('categorical_features', [])}
+	# split indices are numbered float borders first, then one hot values, then ctr borders
+	list_tpl_features = []
+	for dict_feat in dict_features_info.get('float_features', []):
+		list_tpl_features.extend([(dict_feat['flat_feature_index'],)] * len(dict_feat.get('borders', [])))
+	for dict_feat in dict_features_info.get('categorical_features', []):
+		list_tpl_features.extend([(dict_feat['flat_feature_index'],)] * len(dict_feat.get('values', [])))
+	for dict_ctr in dict_features_info.get('ctrs', []):
+		# features in the combination
+		list_flat = []
+		for dict_element in dict_ctr['elements']:
+			if 'cat_feature_index' in dict_element:
+				list_flat.append(dict_cat_flat[dict_element['cat_feature_index']])
+			else:
+				list_flat.append(dict_float_flat[dict_element['float_feature_index']])
+		# one per border
+		list_tpl_features.extend([tuple(sorted(set(list_flat)))] * len(dict_ctr.get('borders', [])))
+	# return
+	return list_tpl_features
+
+# define function for the shapley weight matrix of a game with int_n_players
+def GET_SHAPLEY_MATRIX(int_n_players):
+	# n coalitions
+	int_n_coalitions = 2 ** int_n_players
+	# empty matrix (players x coalitions)
+	arr_matrix = np.zeros((int_n_players, int_n_coalitions))
+	# iterate through coalitions
+	for int_coalition in range(int_n_coalitions):
+		# size of coalition
+		int_size = bin(int_coalition).count('1')
+		# weight for adding a player to a coalition of this size
+		flt_weight = math.factorial(int_size) * math.factorial(int_n_players - int_size - 1) / math.factorial(int_n_players) if int_size < int_n_players else 0
+		for int_player in range(int_n_players):
+			# logic
+			if not (int_coalition >> int_player) & 1:
+				# v(S with player) - v(S)
+				arr_matrix[int_player, int_coalition | (1 << int_player)] += flt_weight
+				arr_matrix[int_player, int_coalition] -= flt_weight
+	# return
+	return arr_matrix
+
+# define class for fast tree shap on oblivious trees
+class ObliviousTreeShap:
+	# initialize
+	def __init__(self, model, list_feats_keep=None, int_thread_count=1, int_max_cells=2**24):
+		self.int_thread_count = int_thread_count
+		# catboost shap instead when a tree needs more than int_max_cells values of v(S) (2^players * 4^depth, about 1.5 GB at depth 10)
+		bool_fallback = False
+		# get list of feats in model
+		list_x_feats = list(model.feature_names_)
+		# feats to explain (all by default)
+		set_feats_keep = set(list_x_feats if list_feats_keep is None else list_feats_keep)
+		# dump model
+		dict_model = CATBOOST_TO_DICT(model=model)
+		# features behind each split
+		list_tpl_features = GET_SPLIT_FEATURES(dict_model=dict_model)
+		# get scale
+		flt_scale = dict_model.get('scale_and_bias', [1, [0]])[0]
+		# cache of shapley matrices by n players
+		dict_shapley = {}
+		# empty lists of per-tree statistics (one entry per tree and feature)
+		list_arr_table = []
+		list_int_tree = []
+		list_int_feat = []
+		# iterate through trees
+		for int_tree, dict_tree in enumerate(dict_model['oblivious_trees']):
+			# get depth
+			int_depth = len(dict_tree['splits'])
+			# players are the distinct feature sets split on
+			list_players = []
+			list_level_player = []
+			for dict_split in dict_tree['splits']:
+				tpl_features = list_tpl_features[dict_split['split_index']]
+				if tpl_features not in list_players:
+					list_players.append(tpl_features)
+				list_level_player.append(list_players.index(tpl_features))
+			int_n_players = len(list_players)
+			# skip trees with nothing to explain
+			if not any(list_x_feats[int_flat] in set_feats_keep for tpl_features in list_players for int_flat in tpl_features):
+				continue
+			# get leaf values and weights
+			arr_values = np.array(dict_tree['leaf_values'], dtype=float) * flt_scale
+			arr_w = np.array(dict_tree['leaf_weights'], dtype=float)
+			# v(S) for every coalition S, every leaf x falls into, and every leaf
+			int_n_coalitions = 2 ** int_n_players
+			int_n_leaves = 2 ** int_depth
+			# logic (too deep to tabulate)
+			if int_n_coalitions * int_n_leaves * int_n_leaves > int_max_cells:
+				bool_fallback = True
+				list_arr_table, list_int_tree, list_int_feat = [], [], []
+				break
+			arr_coalition = np.arange(int_n_coalitions)
+			arr_leaf_x = np.arange(int_n_leaves)
+			arr_v = np.broadcast_to(arr_values, (int_n_coalitions, int_n_leaves, int_n_leaves))
+			# catboost roots the tree at the last split, so collapse from the first split (lowest bit of the leaf index) up
+			for int_level in range(int_depth):
+				# split children on this level (lowest remaining bit)
+				arr_v = arr_v.reshape(int_n_coalitions, int_n_leaves, -1, 2)
+				arr_w = arr_w.reshape(-1, 2)
+				# follow x when the player is in the coalition
+				arr_bool_in = ((arr_coalition >> list_level_player[int_level]) & 1).astype(bool)
+				arr_bit_x = (arr_leaf_x >> int_level) & 1
+				arr_follow = np.where(arr_bit_x[None, :, None] == 1, arr_v[:, :, :, 1], arr_v[:, :, :, 0])
+				# otherwise weight by cover
+				arr_w_node = arr_w.sum(axis=1)
+				arr_cover = np.divide(arr_w, arr_w_node[:, None], out=np.full(arr_w.shape, 0.5), where=arr_w_node[:, None] > 0)
+				arr_average = arr_v[:, :, :, 0] * arr_cover[:, 0] + arr_v[:, :, :, 1] * arr_cover[:, 1]
+				# combine
+				arr_v = np.where(arr_bool_in[:, None, None], arr_follow, arr_average)
+				arr_w = arr_w_node
+			# get shapley matrix
+			if int_n_players not in dict_shapley:
+				dict_shapley[int_n_players] = GET_SHAPLEY_MATRIX(int_n_players=int_n_players)
+			# contributions of each player for each leaf x falls into
+			arr_table = dict_shapley[int_n_players] @ arr_v.reshape(int_n_coalitions, int_n_leaves)
+			# spread each player over its features (combinations are split equally)
+			for int_player, tpl_features in enumerate(list_players):
+				for int_flat in tpl_features:
+					# logic
+					if list_x_feats[int_flat] in set_feats_keep:
+						list_arr_table.append(arr_table[int_player] / len(tpl_features))
+						list_int_tree.append(int_tree)
+						list_int_feat.append(int_flat)
+		# flatten tables with an offset for each entry
+		arr_offset = np.cumsum([0] + [len(arr_table) for arr_table in list_arr_table])[:-1]
+		# save to object
+		self.model = model
+		self.bool_fallback = bool_fallback
+		self.list_x_feats = list_x_feats
+		self.arr_bool_keep = np.array([col in set_feats_keep for col in list_x_feats])
+		self.arr_table = np.concatenate(list_arr_table) if list_arr_table else np.zeros(0)
+		self.arr_offset = np.array(arr_offset, dtype=int)
+		self.arr_tree = np.array(list_int_tree, dtype=int)
+		self.arr_feat = np.array(list_int_feat, dtype=int)
+	# define function for getting shap values
+	def shap_values(self, data):
+		# get n feats
+		int_n_feats = len(self.list_x_feats)
+		# logic
+		if getattr(self, 'bool_fallback', False):
+			# catboost shap (drop the bias column), feats not kept are 0 as in the tables
+			arr_shap = self.model.get_feature_importance(data=data, type='ShapValues', prettified=False, thread_count=self.int_thread_count, verbose=False)[:, :-1]
+			arr_shap[:, ~self.arr_bool_keep] = 0.0
+			# return
+			return arr_shap
+		# leaf each row falls into for each tree
+		arr_leaf = self.model.calc_leaf_indexes(data=data, thread_count=self.int_thread_count)
+		# look up every contribution
+		arr_contrib = self.arr_table[self.arr_offset[None, :] + arr_leaf[:, self.arr_tree]]
+		# sum by feature
+		arr_shap = np.array([np.bincount(self.arr_feat, weights=arr_contrib_row, minlength=int_n_feats) for arr_contrib_row in arr_contrib]).reshape(-1, int_n_feats)
+		# return
+		return arr_shap
+
+# constants for cityhash (v1.0, the version catboost hashes categorical values with)
+INT_MASK_64 = 0xFFFFFFFFFFFFFFFF
+INT_K0 = 0xc3a5c85c97cb3127
+INT_K1 = 0xb492b66fbe98f273
+INT_K2 = 0x9ae16a3b2f90404f
+INT_K3 = 0xc949d7c7509e6557
+
+# define helper for rotating a 64 bit int
+def ROTATE_64(int_val, int_shift):
+	# return
+	return int_val if int_shift == 0 else ((int_val >> int_shift) | (int_val << (64 - int_shift))) & INT_MASK_64
+
+# define helper for hashing two 64 bit ints into one
+def HASH_LEN_16(int_u, int_v):
+	int_mul = 0x9ddfea08eb382d69
+	int_a = ((int_u ^ int_v) * int_mul) & INT_MASK_64
+	int_a ^= int_a >> 47
+	int_b = ((int_v ^ int_a) * int_mul) & INT_MASK_64
+	int_b ^= int_b >> 47
+	# return
+	return (int_b * int_mul) & INT_MASK_64
+
+# define helper for 32 bytes of state (weak hash with seeds)
+def WEAK_HASH_LEN_32(bytes_s, int_pos, int_a, int_b):
+	# get words
+	int_w, int_x, int_y, int_z = [int.from_bytes(bytes_s[int_pos+int_off:int_pos+int_off+8], 'little') for int_off in [0, 8, 16, 24]]
+	int_a = (int_a + int_w) & INT_MASK_64
+	int_b = ROTATE_64((int_b + int_a + int_z) & INT_MASK_64, 21)
+	int_c = int_a
+	int_a = (int_a + int_x + int_y) & INT_MASK_64
+	int_b = (int_b + ROTATE_64(int_a, 44)) & INT_MASK_64
+	# return
+	return (int_a + int_z) & INT_MASK_64, (int_b + int_c) & INT_MASK_64
+
+# define function for cityhash64
+def CITYHASH_64(bytes_s):
+	# define helpers for fetching words and mixing
+	def fetch_64(int_pos):
+		return int.from_bytes(bytes_s[int_pos:int_pos+8], 'little')
+	def fetch_32(int_pos):
+		return int.from_bytes(bytes_s[int_pos:int_pos+4], 'little')
+	def shift_mix(int_val):
+		return int_val ^ (int_val >> 47)
+	# get length
+	int_n = len(bytes_s)
+	# 0 to 16 bytes
+	if int_n > 8 and int_n <= 16:
+		int_b = fetch_64(int_n-8)
+		return HASH_LEN_16(fetch_64(0), ROTATE_64((int_b + int_n) & INT_MASK_64, int_n)) ^ int_b
+	if int_n >= 4 and int_n <= 8:
+		return HASH_LEN_16((int_n + (fetch_32(0) << 3)) & INT_MASK_64, fetch_32(int_n-4))
+	if int_n > 0 and int_n < 4:
+		int_y = (bytes_s[0] + (bytes_s[int_n >> 1] << 8)) & 0xFFFFFFFF
+		int_z = (int_n + (bytes_s[int_n-1] << 2)) & 0xFFFFFFFF
+		return (shift_mix(((int_y * INT_K2) ^ (int_z * INT_K3)) & INT_MASK_64) * INT_K2) & INT_MASK_64
+	if int_n == 0:
+		return INT_K2
+	# 17 to 32 bytes
+	if int_n <= 32:
+		int_a = (fetch_64(0) * INT_K1) & INT_MASK_64
+		int_b = fetch_64(8)
+		int_c = (fetch_64(int_n-8) * INT_K2) & INT_MASK_64
+		int_d = (fetch_64(int_n-16) * INT_K0) & INT_MASK_64
+		return HASH_LEN_16((ROTATE_64((int_a - int_b) & INT_MASK_64, 43) + ROTATE_64(int_c, 30) + int_d) & INT_MASK_64,
+						   (int_a + ROTATE_64(int_b ^ INT_K3, 20) - int_c + int_n) & INT_MASK_64)
+	# 33 to 64 bytes
+	if int_n <= 64:
+		int_z = fetch_64(24)
+		int_a = (fetch_64(0) + (int_n + fetch_64(int_n-16)) * INT_K0) & INT_MASK_64
+		int_b = ROTATE_64((int_a + int_z) & INT_MASK_64, 52)
+		int_c = ROTATE_64(int_a, 37)
+		int_a = (int_a + fetch_64(8)) & INT_MASK_64
+		int_c = (int_c + ROTATE_64(int_a, 7)) & INT_MASK_64
+		int_a = (int_a + fetch_64(16)) & INT_MASK_64
+		int_vf = (int_a + int_z) & INT_MASK_64
+		int_vs = (int_b + ROTATE_64(int_a, 31) + int_c) & INT_MASK_64
+		int_a = (fetch_64(16) + fetch_64(int_n-32)) & INT_MASK_64
+		int_z = fetch_64(int_n-8)
+		int_b = ROTATE_64((int_a + int_z) & INT_MASK_64, 52)
+		int_c = ROTATE_64(int_a, 37)
+		int_a = (int_a + fetch_64(int_n-24)) & INT_MASK_64
+		int_c = (int_c + ROTATE_64(int_a, 7)) & INT_MASK_64
+		int_a = (int_a + fetch_64(int_n-16)) & INT_MASK_64
+		int_wf = (int_a + int_z) & INT_MASK_64
+		int_ws = (int_b + ROTATE_64(int_a, 31) + int_c) & INT_MASK_64
+		int_r = shift_mix(((int_vf + int_ws) * INT_K2 + (int_wf + int_vs) * INT_K0) & INT_MASK_64)
+		return (shift_mix((int_r * INT_K0 + int_vs) & INT_MASK_64) * INT_K2) & INT_MASK_64
+	# over 64 bytes (hash the end first, then loop over 64 byte chunks)
+	int_x = fetch_64(0)
+	int_y = fetch_64(int_n-16) ^ INT_K1
+	int_z = fetch_64(int_n-56) ^ INT_K0
+	tpl_v = WEAK_HASH_LEN_32(bytes_s, int_n-64, int_n, int_y)
+	tpl_w = WEAK_HASH_LEN_32(bytes_s, int_n-32, (int_n * INT_K1) & INT_MASK_64, INT_K0)
+	int_z = (int_z + shift_mix(tpl_v[1]) * INT_K1) & INT_MASK_64
+	int_x = (ROTATE_64((int_z + int_x) & INT_MASK_64, 39) * INT_K1) & INT_MASK_64
+	int_y = (ROTATE_64(int_y, 33) * INT_K1) & INT_MASK_64
+	for int_pos in range(0, (int_n - 1) & ~63, 64):
+		int_x = (ROTATE_64((int_x + int_y + tpl_v[0] + fetch_64(int_pos+16)) & INT_MASK_64, 37) * INT_K1) & INT_MASK_64
+		int_y = (ROTATE_64((int_y + tpl_v[1] + fetch_64(int_pos+48)) & INT_MASK_64, 42) * INT_K1) & INT_MASK_64
+		int_x ^= tpl_w[1]
+		int_y ^= tpl_v[0]
+		int_z = ROTATE_64(int_z ^ tpl_w[0], 33)
+		tpl_v = WEAK_HASH_LEN_32(bytes_s, int_pos, (tpl_v[1] * INT_K1) & INT_MASK_64, (int_x + tpl_w[0]) & INT_MASK_64)
+		tpl_w = WEAK_HASH_LEN_32(bytes_s, int_pos+32, (int_z + tpl_w[1]) & INT_MASK_64, int_y)
+		int_z, int_x = int_x, int_z
+	# return
+	return HASH_LEN_16((HASH_LEN_16(tpl_v[0], tpl_w[0]) + shift_mix(int_y) * INT_K1 + int_z) & INT_MASK_64,
+					   (HASH_LEN_16(tpl_v[1], tpl_w[1]) + int_x) & INT_MASK_64)
+
+# define function for the catboost hash of a categorical value (signed 32 bit)
+def CAT_FEATURE_HASH(value):
+	# low 32 bits of cityhash64 of the string
+	int_hash = CITYHASH_64(str(value).encode('utf-8')) & 0xFFFFFFFF
+	# return
+	return int_hash - (1 << 32) if int_hash >= (1 << 31) else int_hash
+
+# define function for combining hashes (vectorized, wraps at 64 bits like catboost)
+def CALC_HASH(arr_a, arr_b):
+	# magic multiplier
+	int_mult = np.uint64(0x4906ba494954cb65)
+	# return
+	with np.errstate(over='ignore'):
+		return int_mult * (arr_a + int_mult * arr_b)
+
+# define class for evaluating a catboost model from flat numpy arrays
+class ObliviousTreeEvaluator:
+	# initialize (export the model to flat arrays)
+	def __init__(self, model):
+		# dump model
+		dict_model = CATBOOST_TO_DICT(model=model)
+		dict_features_info = dict_model['features_info']
+		# get list of feats in model
+		self.list_x_feats = list(model.feature_names_)
+		# float feats (flat index, nan treatment)
+		list_dict_float = dict_features_info.get('float_features', [])
+		self.arr_float_flat = np.array([dict_feat['flat_feature_index'] for dict_feat in list_dict_float], dtype=int)
+		dict_float_pos = {dict_feat['feature_index']: int_pos for int_pos, dict_feat in enumerate(list_dict_float)}
+		# cat feats (flat index)
+		list_dict_cat = dict_features_info.get('categorical_features', [])
+		self.arr_cat_flat = np.array([dict_feat['flat_feature_index'] for dict_feat in list_dict_cat], dtype=int)
+		dict_cat_pos = {dict_feat['feature_index']: int_pos for int_pos, dict_feat in enumerate(list_dict_cat)}
+		# empty lists for every split index (float borders, then one hot values, then ctr borders)
+		list_split_type, list_split_col, list_split_value, list_split_nan = [], [], [], []
+		for dict_feat in list_dict_float:
+			for flt_border in dict_feat.get('borders', []):
+				list_split_type.append(0)
+				list_split_col.append(dict_float_pos[dict_feat['feature_index']])
+				list_split_value.append(flt_border)
+				list_split_nan.append(dict_feat.get('nan_value_treatment') == 'AsTrue')
+		for dict_feat in list_dict_cat:
+			for int_value in dict_feat.get('values', []):
+				list_split_type.append(1)
+				list_split_col.append(dict_cat_pos[dict_feat['feature_index']])
+				list_split_value.append(int_value)
+				list_split_nan.append(False)
+		# ctrs (projection, type, priors, and a sorted hash table for each)
+		self.list_dict_ctr = []
+		dict_ctr_data = dict_model.get('ctr_data', {})
+		for int_ctr, dict_ctr in enumerate(dict_features_info.get('ctrs', [])):
+			# cat feats first, then binarized float and one hot feats
+			list_tpl_element = [('cat', dict_cat_pos[dict_element['cat_feature_index']], None) for dict_element in dict_ctr['elements'] if dict_element['combination_element'] == 'cat_feature_value']
+			for dict_element in dict_ctr['elements']:
+				if dict_element['combination_element'] == 'float_feature':
+					list_tpl_element.append(('float', dict_float_pos[dict_element['float_feature_index']], dict_element['border']))
+				elif dict_element['combination_element'] == 'cat_feature_exact_value':
+					list_tpl_element.append(('onehot', dict_cat_pos[dict_element['cat_feature_index']], dict_element['value']))
+			# hash table (hash followed by hash_stride-1 counts)
+			dict_data = dict_ctr_data[dict_ctr['identifier']]
+			int_stride = dict_data.get('hash_stride', 2)
+			list_hash_map = dict_data['hash_map']
+			arr_hash = np.array([int(val) for val in list_hash_map[0::int_stride]], dtype=np.uint64)
+			arr_counts = np.array([list_hash_map[int_pos+1:int_pos+int_stride] for int_pos in range(0, len(list_hash_map), int_stride)], dtype=float).reshape(len(arr_hash), int_stride-1)
+			arr_sort = np.argsort(arr_hash)
+			self.list_dict_ctr.append({'list_tpl_element': list_tpl_element,
+									   'str_type': dict_ctr['ctr_type'],
+									   'int_target_border_idx': dict_ctr.get('target_border_idx', 0),
+									   'flt_prior_num': dict_ctr.get('prior_numerator', 0),
+									   'flt_prior_denom': dict_ctr.get('prior_denomerator', 1),
+									   'flt_shift': dict_ctr.get('shift', 0),
+									   'flt_scale': dict_ctr.get('scale', 1),
+									   'arr_hash': arr_hash[arr_sort],
+									   'arr_counts': arr_counts[arr_sort],
+									   'flt_counter_denominator': dict_data.get('counter_denominator', 0)})
+			for flt_border in dict_ctr.get('borders', []):
+				list_split_type.append(2)
+				list_split_col.append(int_ctr)
+				list_split_value.append(flt_border)
+				list_split_nan.append(False)
+		# split arrays
+		self.arr_split_type = np.array(list_split_type, dtype=int)
+		self.arr_split_col = np.array(list_split_col, dtype=int)
+		self.arr_split_border = np.array([val if int_type != 1 else 0 for int_type, val in zip(list_split_type, list_split_value)], dtype=np.float32)
+		self.arr_split_hash = np.array([val if int_type == 1 else 0 for int_type, val in zip(list_split_type, list_split_value)], dtype=np.int64)
+		self.arr_split_nan = np.array(list_split_nan, dtype=bool)
+		# trees (padded to the max depth with an always false split at the end)
+		list_dict_tree = dict_model['oblivious_trees']
+		for dict_tree in list_dict_tree:
+			# trees with no splits are exported with splits as None
+			dict_tree['splits'] = dict_tree.get('splits') or []
+		int_depth = max([len(dict_tree['splits']) for dict_tree in list_dict_tree] + [0])
+		int_false = len(list_split_type)
+		self.arr_tree_split = np.full((len(list_dict_tree), int_depth), int_false, dtype=int)
+		list_arr_leaf = []
+		for int_tree, dict_tree in enumerate(list_dict_tree):
+			# logic
+			if len(dict_tree['leaf_values']) != 2 ** len(dict_tree['splits']):
+				raise ValueError('Only single dimension models are supported')
+			self.arr_tree_split[int_tree, :len(dict_tree['splits'])] = [dict_split['split_index'] for dict_split in dict_tree['splits']]
+			# repeat leaves so the padded (false) bits land on the same values
+			list_arr_leaf.append(np.tile(np.array(dict_tree['leaf_values'], dtype=float), 2 ** (int_depth - len(dict_tree['splits']))))
+		self.arr_leaf_values = np.concatenate(list_arr_leaf) if list_arr_leaf else np.zeros(0)
+		self.arr_tree_offset = np.arange(len(list_dict_tree)) * (2 ** int_depth)
+		self.arr_bit_weight = 1 << np.arange(int_depth)
+		# scale and bias
+		flt_scale, list_bias = dict_model.get('scale_and_bias', [1, [0]])
+		self.flt_scale = flt_scale
+		self.flt_bias = list_bias[0] if list_bias else 0
+		# cache of categorical value hashes
+		self.dict_cat_hash = {}
+	# define helper for hashing a categorical col
+	def hash_cat(self, arr_values):
+		# hash each distinct value once
+		arr_unique, arr_inverse = np.unique(np.asarray(arr_values).astype(str), return_inverse=True)
+		arr_hash_unique = np.empty(len(arr_unique), dtype=np.int64)
+		for int_idx, str_value in enumerate(arr_unique):
+			if str_value not in self.dict_cat_hash:
+				self.dict_cat_hash[str_value] = CAT_FEATURE_HASH(str_value)
+			arr_hash_unique[int_idx] = self.dict_cat_hash[str_value]
+		# return
+		return arr_hash_unique[arr_inverse.ravel()]
+	# define helper for getting the float and hashed cat blocks from data
+	def get_blocks(self, data):
+		# logic
+		if isinstance(data, np.ndarray):
+			list_arr_cols = [data[:, int_flat] for int_flat in range(data.shape[1])]
+		else:
+			list_arr_cols = [data[col].values for col in self.list_x_feats]
+		# get n rows
+		int_n_rows = len(list_arr_cols[0]) if list_arr_cols else 0
+		# float block (catboost compares in float32)
+		arr_float = np.empty((int_n_rows, len(self.arr_float_flat)), dtype=np.float32)
+		for int_col, int_flat in enumerate(self.arr_float_flat):
+			arr_float[:, int_col] = np.asarray(list_arr_cols[int_flat], dtype=float)
+		# hashed cat block
+		arr_cat = np.empty((int_n_rows, len(self.arr_cat_flat)), dtype=np.int64)
+		for int_col, int_flat in enumerate(self.arr_cat_flat):
+			arr_cat[:, int_col] = self.hash_cat(arr_values=list_arr_cols[int_flat])
+		# return
+		return arr_float, arr_cat
+	# define helper for computing every ctr
+	def calc_ctrs(self, arr_float, arr_cat):
+		# empty block
+		arr_ctr = np.empty((arr_float.shape[0], len(self.list_dict_ctr)), dtype=np.float32)
+		for int_ctr, dict_ctr in enumerate(self.list_dict_ctr):
+			# hash of the projection
+			arr_hash = np.zeros(arr_float.shape[0], dtype=np.uint64)
+			for str_element, int_col, value in dict_ctr['list_tpl_element']:
+				# logic
+				if str_element == 'cat':
+					arr_b = arr_cat[:, int_col].astype(np.uint64)
+				elif str_element == 'float':
+					arr_b = (arr_float[:, int_col] > np.float32(value)).astype(np.uint64)
+				else:
+					arr_b = (arr_cat[:, int_col] == value).astype(np.uint64)
+				arr_hash = CALC_HASH(arr_hash, arr_b)
+			# look up bucket
+			arr_pos = np.minimum(np.searchsorted(dict_ctr['arr_hash'], arr_hash), max(len(dict_ctr['arr_hash'])-1, 0))
+			arr_bool_found = (dict_ctr['arr_hash'][arr_pos] == arr_hash) if len(dict_ctr['arr_hash']) else np.zeros(len(arr_hash), dtype=bool)
+			arr_counts = dict_ctr['arr_counts'][arr_pos] if len(dict_ctr['arr_hash']) else np.zeros((len(arr_hash), 1))
+			# count in class and total count by ctr type
+			if dict_ctr['str_type'] in ['Counter', 'FeatureFreq']:
+				arr_good = arr_counts[:, 0]
+				arr_total = np.full(len(arr_hash), dict_ctr['flt_counter_denominator'], dtype=float)
+			elif dict_ctr['str_type'] == 'Buckets':
+				arr_good = arr_counts[:, dict_ctr['int_target_border_idx']]
+				arr_total = arr_counts.sum(axis=1)
+			elif arr_counts.shape[1] > 2:
+				arr_good = arr_counts[:, dict_ctr['int_target_border_idx']+1:].sum(axis=1)
+				arr_total = arr_counts.sum(axis=1)
+			else:
+				arr_good = arr_counts[:, 1]
+				arr_total = arr_counts[:, 0] + arr_counts[:, 1]
+			# unseen hashes count as zero
+			arr_good = np.where(arr_bool_found, arr_good, 0)
+			arr_total = np.where(arr_bool_found, arr_total, 0)
+			# ctr
+			arr_value = ((arr_good + dict_ctr['flt_prior_num']) / (arr_total + dict_ctr['flt_prior_denom'])).astype(np.float32)
+			arr_ctr[:, int_ctr] = (arr_value + np.float32(dict_ctr['flt_shift'])) * np.float32(dict_ctr['flt_scale'])
+		# return
+		return arr_ctr
+	# define function for the raw score
+	def predict_raw(self, data):
+		# get blocks
+		arr_float, arr_cat = self.get_blocks(data=data)
+		arr_ctr = self.calc_ctrs(arr_float=arr_float, arr_cat=arr_cat)
+		# every split for every row (one extra always false col for padding)
+		int_n_rows = arr_float.shape[0]
+		arr_bits = np.zeros((int_n_rows, len(self.arr_split_type)+1), dtype=bool)
+		for int_type, arr_block in [(0, arr_float), (2, arr_ctr)]:
+			arr_bool_type = self.arr_split_type == int_type
+			if arr_bool_type.any():
+				arr_block_split = arr_block[:, self.arr_split_col[arr_bool_type]]
+				arr_bits[:, np.flatnonzero(arr_bool_type)] = np.where(np.isnan(arr_block_split), self.arr_split_nan[arr_bool_type], arr_block_split > self.arr_split_border[arr_bool_type])
+		arr_bool_type = self.arr_split_type == 1
+		if arr_bool_type.any():
+			arr_bits[:, np.flatnonzero(arr_bool_type)] = arr_cat[:, self.arr_split_col[arr_bool_type]] == self.arr_split_hash[arr_bool_type]
+		# pack the bits of each tree into its leaf index
+		arr_leaf = arr_bits[:, self.arr_tree_split] @ self.arr_bit_weight
+		# sum leaf values
+		arr_raw = self.arr_leaf_values[self.arr_tree_offset + arr_leaf].sum(axis=1)
+		# return
+		return self.flt_scale * arr_raw + self.flt_bias
+	# define function for predictions (raw score, like predict of a regressor)
+	def predict(self, data):
+		# return
+		return self.predict_raw(data=data)
+	# define function for probabilities (like predict_proba of a binary classifier)
+	def predict_proba(self, data):
+		# sigmoid
+		arr_p = 1 / (1 + np.exp(-self.predict_raw(data=data)))
+		# return
+		return np.column_stack([1 - arr_p, arr_p])
+
+# define function for checking an evaluator against catboost
+def CHECK_EVALUATOR(model, data, evaluator=None, flt_tol=1e-6):
+	# export model if not given an evaluator
+	if evaluator is None:
+		evaluator = ObliviousTreeEvaluator(model=model)
+	# raw scores from both
+	arr_raw_catboost = np.array(model.predict(data, prediction_type='RawFormulaVal'))
+	arr_raw_numpy = evaluator.predict_raw(data=data)
+	# max abs difference
+	flt_max_diff = float(np.max(np.abs(arr_raw_catboost - arr_raw_numpy))) if len(arr_raw_numpy) else 0.0
+	# return
+	return {'flt_max_diff': flt_max_diff,
+			'bool_equivalent': flt_max_diff <= flt_tol,
+			'int_n_rows': len(arr_raw_numpy)}
@@ -1,11 +1,12 @@
 # optimal learning rate
-from sklearn.metrics import precision_score
 import numpy as np
-import matplotlib.pyplot as plt
 from .algorithms import FIT_CATBOOST_MODEL
 import pickle
-from sklearn.metrics import precision_score, roc_auc_score, mean_squared_error, confusion_matrix
-import numpy as np
+from .lazy import LazyModule, LAZY_FROM
+
+# heavy imports (loaded on first use)
+plt = LazyModule(str_name='matplotlib.pyplot')
+(precision_score, roc_auc_score, mean_squared_error, confusion_matrix) = LAZY_FROM(str_module='sklearn.metrics', list_str_attrs=['precision_score', 'roc_auc_score', 'mean_squared_error', 'confusion_matrix'])
 
 # define function to tune lr
 def TUNE_LEARNING_RATE(X_train, y_train, X_valid, y_valid, list_non_numeric,
@@ -5,23 +5,30 @@ import pandas as pd
 import math
 import time
 import numpy as np
-from sklearn.base import BaseEstimator, TransformerMixin
 from pandas.api.types import is_numeric_dtype
 import pickle
 import math
-from sklearn.preprocessing import OneHotEncoder, MinMaxScaler
-from sklearn.experimental import enable_iterative_imputer
-from sklearn.impute import IterativeImputer
-from sklearn.linear_model import BayesianRidge
+from .instrumentation import GET_INSTRUMENTATION
+from .lazy import TransformerBase, LAZY_FROM
+
+# heavy imports (loaded on first use)
+(OneHotEncoder, MinMaxScaler) = LAZY_FROM(str_module='sklearn.preprocessing', list_str_attrs=['OneHotEncoder', 'MinMaxScaler'])
+(IterativeImputer,) = LAZY_FROM(str_module='sklearn.impute', list_str_attrs=['IterativeImputer'], list_str_requires=['sklearn.experimental.enable_iterative_imputer'])
+(BayesianRidge,) = LAZY_FROM(str_module='sklearn.linear_model', list_str_attrs=['BayesianRidge'])
 
 # rounding binner
-class RoundBinning(BaseEstimator, TransformerMixin):
+class RoundBinning(TransformerBase):
 	# initialize
 	def __init__(self, dict_round):
 		self.dict_round = dict_round
 	# fit
 	def fit(self, X):
 		return self
+	# define function for the rounding as ops a plan can fuse
+	def get_ops(self, list_cols):
+		set_cols = set(list_cols)
+		# return
+		return [(key, 'round', val) for key, val in self.dict_round.items() if key in set_cols]
 	# transform
 	def transform(self, X):
 		time_start = time.perf_counter()
@@ -38,12 +45,13 @@ class RoundBinning(BaseEstimator, TransformerMixin):
 		# iterate through dictionary
 		for key, val in dict_round.items():
 			X[key] = val * round(pd.to_numeric(X[key]) / val)
-		print(f'Time to bin: {time.perf_counter()-time_start:0.5} sec.')
+		# record time
+		GET_INSTRUMENTATION().record(str_name='RoundBinning.transform', flt_sec=time.perf_counter()-time_start)
 		# return X
 		return X
 
 # define class for quantile binning
-class QuantileBinning(BaseEstimator, TransformerMixin):
+class QuantileBinning(TransformerBase):
 	# initialize
 	def __init__(self, list_cols, int_n_bins=10):
 		self.list_cols = list_cols
@@ -91,18 +99,27 @@ class QuantileBinning(BaseEstimator, TransformerMixin):
 			dict_bin_name, list_bins = self.dict_quantiles[col]
 			# convert column to bin
 			X[col] = np.vectorize(dict_bin_name.get)(np.digitize(X[col], list_bins))
-		print(f'Time to bin: {time.perf_counter()-time_start:0.5} sec.')
+		# record time
+		GET_INSTRUMENTATION().record(str_name='QuantileBinning.transform', flt_sec=time.perf_counter()-time_start)
 		# return
 		return X
 
 # define feature mapper class
-class FeatureValueReplacer(BaseEstimator, TransformerMixin):
+class FeatureValueReplacer(TransformerBase):
 	# initialize
 	def __init__(self, dict_value_replace):
 		self.dict_value_replace = dict_value_replace
 	# fit
 	def fit(self, X, y=None):
 		return self
+	# define function for the replacements as ops a plan can fuse (None if not by col)
+	def get_ops(self, list_cols):
+		# logic
+		if not all(isinstance(val, dict) for val in self.dict_value_replace.values()):
+			return None
+		set_cols = set(list_cols)
+		# return
+		return [(col, 'replace', dict_replace) for col, dict_replace in self.dict_value_replace.items() if (col in set_cols) and dict_replace]
 	# transform
 	def transform(self, X):
 		X.replace(self.dict_value_replace, inplace=True)
@@ -110,7 +127,7 @@ class FeatureValueReplacer(BaseEstimator, TransformerMixin):
 		return X
 
 # define cyclic FE class
-class CyclicFeatures(BaseEstimator, TransformerMixin):
+class CyclicFeatures(TransformerBase):
 	# initialize
 	def __init__(self, str_datecol, bool_drop_datecol=True):
 		self.str_datecol = str_datecol
@@ -176,7 +193,7 @@ class CyclicFeatures(BaseEstimator, TransformerMixin):
 		return X
 
 # define string converter
-class StringConverter(BaseEstimator, TransformerMixin):
+class StringConverter(TransformerBase):
 	# initialize
 	def __init__(self, list_cols):
 		self.list_cols = list_cols
@@ -216,7 +233,7 @@ def CHRON_TRAIN_VALID_TEST_SPLIT(df, flt_prop_train=0.5, flt_prop_valid=0.25, lo
 	return df_train, df_valid, df_test
 
 # class for converting boolean to binary
-class BooleanToBinary(BaseEstimator, TransformerMixin):
+class BooleanToBinary(TransformerBase):
 	# initialize
 	def __init__(self, str_datecol=None):
 		self.str_datecol = str_datecol
@@ -265,7 +282,7 @@ def GET_LIST_THRESHOLD_NAN(df, flt_threshold=0.5, logger=None, bool_low_memory=T
 	return list_columns
 
 # define Binaritizer
-class Binaritizer(BaseEstimator, TransformerMixin):
+class Binaritizer(TransformerBase):
 	# initialize class
 	def __init__(self, list_cols):
 		self.list_cols = list_cols
@@ -302,7 +319,7 @@ def GET_NONNUMERIC_RVLR_COLS(df, logger=None):
 	return list_columns
 
 # define class to make proportion R, T, and I from rvlr cols
-class ProportionRTIConverter(BaseEstimator, TransformerMixin):
+class ProportionRTIConverter(TransformerBase):
 	# initialize
 	def __init__(self, list_cols):
 		self.list_cols = list_cols
@@ -345,17 +362,17 @@ class ProportionRTIConverter(BaseEstimator, TransformerMixin):
 		return X
 
 # define class for iterative imputing
-class IterativeImputerNumeric(BaseEstimator, TransformerMixin):
+class IterativeImputerNumeric(TransformerBase):
 	# initialize class
-	def __init__(self, list_cols, cls_estimator=BayesianRidge()):
+	def __init__(self, list_cols, cls_estimator=None):
 		self.list_cols = list_cols
 		self.cls_estimator = cls_estimator
 	# fit
 	def fit(self, X, y=None):
-		# instantiate class
+		# instantiate class (BayesianRidge if no estimator)
 		cls_iterative_imputer = IterativeImputer(max_iter=10, 
 			                                     random_state=42,
-			                                     estimator=self.cls_estimator)
+			                                     estimator=self.cls_estimator if self.cls_estimator is not None else BayesianRidge())
 		# fit
 		cls_iterative_imputer.fit(X[self.list_cols])
 		# save to object
@@ -374,7 +391,7 @@ class IterativeImputerNumeric(BaseEstimator, TransformerMixin):
 		return X
 
 # create median imputer
-class ImputerNumeric(BaseEstimator, TransformerMixin):
+class ImputerNumeric(TransformerBase):
 	# initialize class
 	def __init__(self, list_cols, metric='median', bool_ignore_neg=True):
 		self.list_cols = list_cols
@@ -406,7 +423,7 @@ class ImputerNumeric(BaseEstimator, TransformerMixin):
 		return X
 
 # create string imputer
-class ImputerStringNonNumeric(BaseEstimator, TransformerMixin):
+class ImputerStringNonNumeric(TransformerBase):
 	# initialize
 	def __init__(self, list_cols, str_impute='MISSING'):
 		self.list_cols = list_cols
@@ -424,7 +441,7 @@ class ImputerStringNonNumeric(BaseEstimator, TransformerMixin):
 		return X
 
 # create mode imputer
-class ImputerMode(BaseEstimator, TransformerMixin):
+class ImputerMode(TransformerBase):
 	# initialize class
 	def __init__(self, list_cols):
 		self.list_cols = list_cols
@@ -447,7 +464,7 @@ class ImputerMode(BaseEstimator, TransformerMixin):
 		return X
 
 # class for one-hot encoding
-class MyOneHotEncoder(BaseEstimator, TransformerMixin):
+class MyOneHotEncoder(TransformerBase):
 	# initialize class
 	def __init__(self, list_cols):
 		self.list_cols = list_cols
@@ -475,7 +492,7 @@ class MyOneHotEncoder(BaseEstimator, TransformerMixin):
 		return X
 
 # class for min max scaling
-class MyMinMaxScaler(BaseEstimator, TransformerMixin):
+class MyMinMaxScaler(TransformerBase):
 	# initialize class
 	def __init__(self):
 		self.cls_minmaxscaler = MinMaxScaler()